@@ -7,18 +7,71 @@ export TEMP="$HEMTT_TEMP"
 export TMP="$HEMTT_TEMP"
 mkdir -p "$HEMTT_TEMP"
 
+# Stage tracing: release.py sets UKSFTA_TRACE_EVENTS to collect per-stage timings
+trace_stage() {
+    # trace_stage <name> <start_ns> [measured_path]
+    if [ -n "$UKSFTA_TRACE_EVENTS" ] && [ -f "tools/build_trace.py" ]; then
+        python3 tools/build_trace.py record "$UKSFTA_TRACE_EVENTS" "$1" "$2" "$(date +%s%N)" "$3"
+    fi
+}
+
+# Python tool runner: wraps the tool in cProfile when release.py --profile sets UKSFTA_PROFILE_DIR
+py_tool() {
+    # py_tool <tool_name> [args...]
+    local name="$1"; shift
+    if [ -n "$UKSFTA_PROFILE_DIR" ]; then
+        mkdir -p "$UKSFTA_PROFILE_DIR"
+        python3 -m cProfile -o "$UKSFTA_PROFILE_DIR/$name.prof" "tools/$name.py" "$@"
+    else
+        python3 "tools/$name.py" "$@"
+    fi
+}
+
+# --incremental: rebuild only the addons that changed since the last build (build/dev only)
+INCREMENTAL=false
+BUILD_ARGS=()
+for arg in "$@"; do
+    if [ "$arg" = "--incremental" ]; then INCREMENTAL=true; else BUILD_ARGS+=("$arg"); fi
+done
+set -- "${BUILD_ARGS[@]}"
+if [ "$INCREMENTAL" = true ] && [[ " $* " == *" release "* ]]; then
+    echo "ℹ️  --incremental is not available for releases. Running a full release build."
+    INCREMENTAL=false
+fi
+
 # Detect if this is a HEMTT project
 IS_MOD_PROJECT=false
 if [ -d ".hemtt" ] && [ -f ".hemtt/project.toml" ]; then
     IS_MOD_PROJECT=true
 fi
 
+# Optional VFS path repair before anything reads the sources. Files already recorded
+# as clean are skipped, so this is cheap on repeat builds. Enable with UKSFTA_VFS_SANITIZE=1.
+if [ "$IS_MOD_PROJECT" = true ] && [ -n "$UKSFTA_VFS_SANITIZE" ] && [ -f "tools/vfs_sanitizer.py" ]; then
+    T_START=$(date +%s%N)
+    py_tool vfs_sanitizer addons
+    trace_stage "vfs_sanitizer" "$T_START" "addons"
+fi
+
+# 0. Input Fingerprint
+# Skip the audit and HEMTT when addons/, include/, .hemtt/ and mod.cpp are unchanged
+# since the last successful build of the same kind. UKSFTA_FORCE_BUILD=1 disables this.
+INPUTS_UNCHANGED=false
+if [ "$IS_MOD_PROJECT" = true ] && [ "$INCREMENTAL" = false ] && [ -f "tools/build_cache.py" ] && [ -z "$UKSFTA_FORCE_BUILD" ]; then
+    if python3 tools/build_cache.py check . "$@"; then
+        INPUTS_UNCHANGED=true
+    fi
+fi
+
 # 1. Forensic Audit (UKSFTA Diamond Standard)
 # We run this BEFORE hemtt to ensure the build environment is clean.
-if [ "$IS_MOD_PROJECT" = true ] && [ -f "tools/asset_auditor.py" ]; then
+# In incremental mode the audit is scoped to the changed addons by build_cache.py instead.
+if [ "$IS_MOD_PROJECT" = true ] && [ "$INPUTS_UNCHANGED" = false ] && [ "$INCREMENTAL" = false ] && [ -f "tools/asset_auditor.py" ]; then
     echo "🛡️  UKSFTA Forensic Audit: Executing deep-scan..."
-    python3 tools/asset_auditor.py .
+    T_START=$(date +%s%N)
+    py_tool asset_auditor .
     AUDIT_STATUS=$?
+    trace_stage "asset_auditor" "$T_START" "addons"
     
     if [ $AUDIT_STATUS -ne 0 ]; then
         echo "❌ FAIL: Forensic Audit detected critical defects. Building halted."
@@ -28,18 +81,40 @@ if [ "$IS_MOD_PROJECT" = true ] && [ -f "tools/asset_auditor.py" ]; then
 fi
 
 # 2. Build Logic
-if [ "$IS_MOD_PROJECT" = true ]; then
+T_START=$(date +%s%N)
+if [ "$IS_MOD_PROJECT" = true ] && [ "$INPUTS_UNCHANGED" = true ]; then
+    echo "HEMTT: Skipped (inputs unchanged)."
+    STATUS=0
+    if [[ " $* " == *" release "* ]]; then
+        IS_RELEASE=true
+    else
+        IS_RELEASE=false
+    fi
+elif [ "$IS_MOD_PROJECT" = true ] && [ "$INCREMENTAL" = true ]; then
+    echo "HEMTT: Running incremental '$@'..."
+    py_tool build_cache incremental . "$@"
+    STATUS=$?
+    IS_RELEASE=false
+    trace_stage "hemtt incremental" "$T_START" ".hemttout/build"
+elif [ "$IS_MOD_PROJECT" = true ]; then
     if [[ " $* " == *" release "* ]]; then
         CLEAN_ARGS=$(echo "$@" | sed 's/release//g')
         echo "HEMTT: Running unsigned release (no-archive) $CLEAN_ARGS..."
         hemtt release --no-archive --no-sign $CLEAN_ARGS
+        STATUS=$?
         IS_RELEASE=true
+        trace_stage "hemtt release" "$T_START" ".hemttout/release"
     else
         echo "HEMTT: Running '$@'..."
         hemtt "$@"
+        STATUS=$?
         IS_RELEASE=false
+        trace_stage "hemtt build" "$T_START" ".hemttout/build"
+    fi
+    # Remember the inputs of this good build for the next fingerprint check
+    if [ $STATUS -eq 0 ] && [ -f "tools/build_cache.py" ]; then
+        python3 tools/build_cache.py record . "$@"
     fi
-    STATUS=$?
 else
     echo "ℹ️  UKSFTA-Tools: Tool-only project detected. Skipping HEMTT."
     STATUS=0
@@ -55,12 +130,15 @@ if [ $STATUS -eq 0 ]; then
     if [ "$IS_MOD_PROJECT" = true ] && [ -f "tools/fix_timestamps.py" ]; then
         PROJECT_NAME=$(grep 'name =' mod.cpp | head -n 1 | cut -d'"' -f2)
         WORKSHOP_ID=$(grep "workshop_id =" .hemtt/project.toml | head -n 1 | sed -E 's/workshop_id = "(.*)"/\1/' | xargs)
-        python3 tools/fix_timestamps.py .hemttout "$PROJECT_NAME" "$WORKSHOP_ID"
+        T_START=$(date +%s%N)
+        py_tool fix_timestamps .hemttout "$PROJECT_NAME" "$WORKSHOP_ID"
+        trace_stage "fix_timestamps" "$T_START" ".hemttout"
     fi
 
     # 4. Manual Packaging for releases
     if [ "$IS_RELEASE" = true ]; then
         echo "📦 Packaging Release ZIP..."
+        T_START=$(date +%s%N)
         mkdir -p releases
         
         VERSION="0.0.0"
@@ -85,6 +163,7 @@ if [ $STATUS -eq 0 ]; then
             rsync -aq --exclude=".git" --exclude=".hemttout" --exclude="releases" --exclude="all_releases" ./ "$STAGING_DIR/$PROJECT_ID/"
             (cd "$STAGING_DIR" && zip -q -1 -r "$PROJECT_ROOT/releases/$ZIP_NAME" "$PROJECT_ID")
         fi
+        trace_stage "zip packaging" "$T_START" "$PROJECT_ROOT/releases/$ZIP_NAME"
         
         # Consolidate to Unit Hub
         CENTRAL_HUB=""
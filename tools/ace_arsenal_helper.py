@@ -4,10 +4,7 @@ import os
 import re
 import sys
 from pathlib import Path
-
-# --- CONFIGURATION ---
-# Flexible regex to find class definitions
-CLASS_PATTERN = re.compile(r'class\s+([a-zA-Z0-9_]+)\s*:\s*([a-zA-Z0-9_]+)', re.IGNORECASE)
+from config_parser import load_config
 
 def generate_ace_config(config_path):
     path = Path(config_path)
@@ -15,22 +12,19 @@ def generate_ace_config(config_path):
         print(f"❌ File not found: {config_path}")
         return
 
-    header = "
-🎒 [ACE Arsenal Helper] Processing: " + path.name
+    header = "\n🎒 [ACE Arsenal Helper] Processing: " + path.name
     separator = " ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
     print(header); print(separator)
 
-    try:
-        content = path.read_text(errors='ignore')
-    except Exception as e:
-        print(f"❌ Error reading file: {e}"); return
+    tree = load_config(path)
+    if tree is None:
+        print(f"❌ Error reading file: {config_path}"); return
 
-    matches = CLASS_PATTERN.findall(content)
-    hierarchy = {} 
-    
-    for child, parent in matches:
-        if parent not in hierarchy: hierarchy[parent] = []
-        hierarchy[parent].append(child)
+    hierarchy = {}
+    for _, cls in tree.walk():
+        if not cls.parent or cls.extern: continue
+        if cls.parent not in hierarchy: hierarchy[cls.parent] = []
+        hierarchy[cls.parent].append(cls.name)
 
     IGNORE_BASES = {"Vest_Camo_Base", "H_HelmetB", "B_Soldier_F", "Uniform_Base", "ItemCore", "VestItem"}
     ace_groups = []
@@ -43,19 +37,16 @@ def generate_ace_config(config_path):
     if not ace_groups:
         print("  ℹ️  No variant groups detected."); return
 
-    output = ["
-class ACE_Arsenal_Config {"]
+    output = ["\nclass ACE_Arsenal_Config {"]
     for g in ace_groups:
         output.append("    class " + g['name'] + " {")
         output.append('        base = "' + g["base"] + '";')
         variants_str = ", ".join(['"' + v + '"' for v in g["variants"]])
         output.append("        variants[] = {" + variants_str + "};")
         output.append("    };")
-    output.append("};
-")
+    output.append("};\n")
 
-    print("
-".join(output))
+    print("\n".join(output))
     print(separator)
     print(f"✨ ACE Extended Arsenal config generated for {len(ace_groups)} groups.")
 
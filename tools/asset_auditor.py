@@ -4,12 +4,16 @@ import os
 import sys
 import subprocess
 import re
+import argparse
 from pathlib import Path
+from changed_files import add_file_arguments, selected_files
 
 # --- CONFIGURATION ---
 TOOLS_ROOT = Path(__file__).parent.parent
 DEBINARIZER = TOOLS_ROOT / "bin" / "linux-x64" / "debinarizer"
 UNIT_PREFIX = r"z\uksfta\addons"
+ASSET_EXTS = {".paa", ".p3d", ".wav", ".ogg", ".ogv", ".wrp", ".rtm"}
+CODE_EXTS = {".cpp", ".hpp", ".sqf", ".xml", ".rvmat"}
 
 def normalize_vfs(path):
     """Normalizes any path to Arma VFS standard (lowercase, backslashes)."""
@@ -95,14 +99,20 @@ def validate_vfs_links(textures, project_addons):
                 
     return leaks, missing
 
-def audit_project_assets(project_path):
+def audit_project_assets(project_path, only_addons=None):
+    """
+    Audits a project's assets. If only_addons is given, only assets and code inside
+    those addons/<name> folders are checked; references are still collected project-wide.
+    """
     project_path = Path(project_path).resolve()
     print(f"\n🛡️  [Assurance Engine] Auditing: {project_path.name}")
+    if only_addons:
+        print(f"  ℹ️  Scope: {', '.join(sorted(only_addons))}")
     print(" ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
     
     project_addons = get_addons_in_project(project_path)
-    asset_exts = {".paa", ".p3d", ".wav", ".ogg", ".ogv", ".wrp", ".rtm"}
-    code_exts = {".cpp", ".hpp", ".sqf", ".xml", ".rvmat"}
+    asset_exts = ASSET_EXTS
+    code_exts = CODE_EXTS
     
     all_files = []
     for root, _, files in os.walk(project_path):
@@ -112,10 +122,20 @@ def audit_project_assets(project_path):
 
     assets = [f for f in all_files if f.suffix.lower() in asset_exts]
     code_files = [f for f in all_files if f.suffix.lower() in code_exts]
+    # Code references are gathered from the whole project; only the checks are scoped
+    all_code_files = code_files
+    if only_addons:
+        scope = [project_path / "addons" / a for a in only_addons]
+        in_scope = lambda f: any(s in f.parents for s in scope)
+        assets = [f for f in assets if in_scope(f)]
+        code_files = [f for f in code_files if in_scope(f)]
     
-    if not assets:
+    if not assets and not (only_addons and code_files):
         print("  ℹ️  No binary assets found.")
         return True # Pass
+    if not assets:
+        # Scoped code-only change: the orphan and P3D checks have nothing to do, the code VFS check still runs
+        print("  ℹ️  No binary assets in scope; checking code paths only.")
 
     # 1. REFERENCE AUDIT (ORPHAN DETECTION)
     code_refs = set()
@@ -123,7 +143,7 @@ def audit_project_assets(project_path):
     # Added '%' to support Arma format strings
     path_regex = re.compile(r'([a-zA-Z0-9_%\\./-]+\.(paa|rvmat|p3d|ogg|wss|rtm|wrp))', re.IGNORECASE)
     
-    for c in code_files:
+    for c in (all_code_files if assets else []):
         try:
             content = c.read_text(errors='ignore')
             matches = path_regex.findall(content)
@@ -195,9 +215,27 @@ def audit_project_assets(project_path):
         
     return success
 
+def addons_of(project_path, files):
+    """Names of the addons/<name> folders the given files live in."""
+    addons_dir = Path(project_path).resolve() / "addons"
+    names = set()
+    for f in files:
+        try:
+            names.add(Path(f).resolve().relative_to(addons_dir).parts[0])
+        except (ValueError, IndexError):
+            pass
+    return names
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: asset_auditor.py <project_path>")
-        sys.exit(1)
-    if not audit_project_assets(sys.argv[1]):
+    parser = argparse.ArgumentParser(description="UKSFTA Assurance Engine")
+    parser.add_argument("project_path")
+    add_file_arguments(parser)
+    args = parser.parse_args()
+    files = selected_files(args, tuple(ASSET_EXTS | CODE_EXTS))
+    # The audit works per addon: a file list scopes it to the addons those files belong to
+    only_addons = addons_of(args.project_path, files) if files is not None else None
+    if only_addons is not None and not only_addons:
+        print("  ℹ️  No selected files inside addons/; nothing to audit.")
+        sys.exit(0)
+    if not audit_project_assets(args.project_path, only_addons):
         sys.exit(1)
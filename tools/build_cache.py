@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import re
+import sys
+import shutil
+import hashlib
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from cache_utils import StatCache, load_json, save_json
+
+# UKSFTA Build Cache
+# Fingerprints the build inputs so build.sh can skip the forensic audit and HEMTT
+# when nothing changed since the last successful build.
+#
+# Tracked files reuse the blob IDs git already keeps in its index; modified and
+# untracked files are hashed the same way (git blob IDs) through a stat-keyed cache,
+# so a warm check only stats the files git reports as dirty.
+#
+# The 'incremental' mode goes one step further: it hashes every addon folder,
+# audits and rebuilds only the addons that changed (hemtt --just) and carries the
+# unchanged PBOs over from the previous output.
+
+BUILD_INPUTS = ("addons", "include", ".hemtt", "mod.cpp")
+FINGERPRINT_FILE = "build_fingerprint.json"
+STAT_CACHE_FILE = "build_stat_cache.json"
+# HEMTT command -> output folder inside .hemttout
+OUTPUT_DIRS = {"build": "build", "release": "release", "dev": "dev"}
+# HEMTT commands that accept --just <addon>
+SELECTIVE_COMMANDS = {"build", "dev"}
+STASH_DIR = "incremental_stash"
+
+def _git_lines(root, args):
+    res = subprocess.run(["git", "-C", str(root)] + args, capture_output=True)
+    if res.returncode != 0: return None
+    return [l for l in res.stdout.decode("utf-8", errors="surrogateescape").split("\0") if l]
+
+def _walk_inputs(root):
+    for name in BUILD_INPUTS:
+        base = root / name
+        if base.is_file():
+            yield name
+        elif base.is_dir():
+            for dirpath, _, files in os.walk(base):
+                for f in files:
+                    yield (Path(dirpath) / f).relative_to(root).as_posix()
+
+def collect_inputs(root, stat_cache):
+    """Returns {relative_path: digest} for every build input file."""
+    root = Path(root)
+    staged = _git_lines(root, ["ls-files", "-s", "-z", "--"] + list(BUILD_INPUTS))
+    if staged is None:
+        # Not a git checkout: hash everything through the stat cache
+        return {rel: stat_cache.digest(root / rel, rel) for rel in _walk_inputs(root)}
+
+    inputs = {}
+    for line in staged:
+        meta, rel = line.split("\t", 1)
+        inputs[rel] = meta.split()[1]
+    # Worktree changes against the index (and untracked/ignored files) go through the stat cache
+    dirty = _git_lines(root, ["diff-files", "--name-only", "-z", "--"] + list(BUILD_INPUTS)) or []
+    untracked = _git_lines(root, ["ls-files", "-o", "-z", "--"] + list(BUILD_INPUTS)) or []
+    for rel in dirty + untracked:
+        digest = stat_cache.digest(root / rel, rel)
+        if digest is None: inputs.pop(rel, None)
+        else: inputs[rel] = digest
+    return inputs
+
+def fingerprint(inputs, build_key=""):
+    h = hashlib.sha1(build_key.encode("utf-8"))
+    for rel in sorted(inputs):
+        h.update(f"{rel}\0{inputs[rel]}\n".encode("utf-8", errors="surrogateescape"))
+    return h.hexdigest()
+
+def addon_hashes(inputs):
+    """Groups input digests per addons/<name> folder into one hash per addon."""
+    grouped = {}
+    for rel, digest in inputs.items():
+        parts = rel.split("/")
+        if len(parts) > 2 and parts[0] == "addons":
+            grouped.setdefault(parts[1], {})["/".join(parts[2:])] = digest
+    return {name: fingerprint(files) for name, files in grouped.items()}
+
+def shared_hash(inputs):
+    """Hash of everything outside addons/<name>/ (.hemtt, include, mod.cpp, loose files)."""
+    return fingerprint({rel: d for rel, d in inputs.items() if not (rel.startswith("addons/") and rel.count("/") > 1)})
+
+def build_key(hemtt_args):
+    """Identifies the build flavour; thread counts do not change the output."""
+    args = []; skip = False
+    for a in hemtt_args:
+        if skip: skip = False; continue
+        if a in ("--threads", "-t"): skip = True; continue
+        args.append(a)
+    return " ".join(args)
+
+def output_dir(root, hemtt_args):
+    cmd = hemtt_args[0] if hemtt_args else "build"
+    sub = OUTPUT_DIRS.get(cmd)
+    return Path(root) / ".hemttout" / sub if sub else None
+
+def _state(root):
+    hemttout = Path(root) / ".hemttout"
+    stat_cache = StatCache(hemttout / STAT_CACHE_FILE, git_blob=True)
+    inputs = collect_inputs(root, stat_cache)
+    stat_cache.prune(inputs)
+    return inputs, stat_cache, load_json(hemttout / FINGERPRINT_FILE, {}) or {}
+
+def check(root, hemtt_args):
+    """True when the recorded fingerprint for this build flavour still matches the inputs."""
+    out = output_dir(root, hemtt_args)
+    if out is None or not out.exists() or not any(out.iterdir()): return False
+    key = build_key(hemtt_args)
+    inputs, stat_cache, records = _state(root)
+    stat_cache.save()
+    current = fingerprint(inputs, key)
+    last = records.get(key)
+    if not last or last.get("fingerprint") != current: return False
+    print(f"⏩ Build inputs unchanged since the last successful '{key}' ({last.get('time', '?')}, {len(inputs)} files, fingerprint {current[:12]}).")
+    print(f"   Reusing {out.relative_to(Path(root))}. Set UKSFTA_FORCE_BUILD=1 to rebuild anyway.")
+    return True
+
+def record(root, hemtt_args):
+    """Stores the fingerprint (and per-addon hashes) of a successful build."""
+    key = build_key(hemtt_args)
+    inputs, stat_cache, records = _state(root)
+    records[key] = {
+        "fingerprint": fingerprint(inputs, key),
+        "addons": addon_hashes(inputs),
+        "shared": shared_hash(inputs),
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    save_json(Path(root) / ".hemttout" / FINGERPRINT_FILE, records)
+    stat_cache.save()
+
+def get_pbo_prefix(root):
+    """The project prefix HEMTT puts in front of PBO names ({prefix}_{addon}.pbo)."""
+    toml = Path(root) / ".hemtt" / "project.toml"
+    if toml.exists():
+        m = re.search(r'^prefix\s*=\s*"([^"]+)"', toml.read_text(errors="ignore"), re.MULTILINE)
+        if m: return m.group(1)
+    return None
+
+def addon_outputs(out_addons, prefix, addon):
+    """PBO (and signature) files in an output addons/ folder that belong to one addon."""
+    names = [f"{prefix}_{addon}.pbo"] if prefix else []
+    names.append(f"{addon}.pbo")
+    found = []
+    for n in names:
+        pbo = out_addons / n
+        if pbo.exists():
+            found.append(pbo)
+            found.extend(out_addons.glob(n + "*.bisign"))
+            break
+    return found
+
+def plan_incremental(root, hemtt_args):
+    """
+    Returns (changed, removed, unchanged) addon name lists, or None when a full build is required
+    (unsupported command, no previous record/output, or shared inputs changed).
+    """
+    cmd = hemtt_args[0] if hemtt_args else "build"
+    out = output_dir(root, hemtt_args)
+    if cmd not in SELECTIVE_COMMANDS or out is None or not (out / "addons").exists(): return None
+    inputs, stat_cache, records = _state(root)
+    stat_cache.save()
+    last = records.get(build_key(hemtt_args))
+    if not last or "addons" not in last or last.get("shared") != shared_hash(inputs): return None
+    current = addon_hashes(inputs)
+    changed = sorted(a for a, h in current.items() if last["addons"].get(a) != h)
+    removed = sorted(a for a in last["addons"] if a not in current)
+    unchanged = sorted(a for a in current if a not in changed)
+    return changed, removed, unchanged
+
+def run_full(root, hemtt_args):
+    from asset_auditor import audit_project_assets
+    if not audit_project_assets(root):
+        print("❌ FAIL: Forensic Audit detected critical defects. Building halted.")
+        return 1
+    status = subprocess.run(["hemtt"] + hemtt_args, cwd=root).returncode
+    if status == 0: record(root, hemtt_args)
+    return status
+
+def incremental(root, hemtt_args):
+    """Audits and rebuilds only changed addons, reusing the previous PBOs for the rest."""
+    plan = plan_incremental(root, hemtt_args)
+    if plan is None:
+        print("ℹ️  Incremental: no reusable previous output for this build. Running a full build...")
+        return run_full(root, hemtt_args)
+    changed, removed, unchanged = plan
+    out_addons = output_dir(root, hemtt_args) / "addons"
+    prefix = get_pbo_prefix(root)
+
+    for addon in removed:
+        for f in addon_outputs(out_addons, prefix, addon):
+            f.unlink(); print(f"  🗑️  Removed stale output: {f.name}")
+    if not changed:
+        print(f"⏩ Incremental: all {len(unchanged)} addons unchanged. Nothing to build.")
+        if removed: record(root, hemtt_args)
+        return 0
+
+    # Every reused addon needs its previous PBO; otherwise it has to be rebuilt too
+    reused = {a: addon_outputs(out_addons, prefix, a) for a in unchanged}
+    missing = [a for a, files in reused.items() if not files]
+    changed = sorted(changed + missing)
+    reused = {a: files for a, files in reused.items() if files}
+    print(f"🔁 Incremental: rebuilding {len(changed)} addon(s), reusing {len(reused)} PBO(s).")
+    for a in changed: print(f"   - {a}")
+
+    from asset_auditor import audit_project_assets
+    if not audit_project_assets(root, only_addons=changed):
+        print("❌ FAIL: Forensic Audit detected critical defects. Building halted.")
+        return 1
+
+    # HEMTT may clean its output folder, so park the reused PBOs outside of it
+    stash = Path(root) / ".hemttout" / STASH_DIR
+    if stash.exists(): shutil.rmtree(stash)
+    stash.mkdir(parents=True)
+    for files in reused.values():
+        for f in files: os.replace(f, stash / f.name)
+
+    cmd = ["hemtt", hemtt_args[0]] + [x for a in changed for x in ("--just", a)] + hemtt_args[1:]
+    try:
+        status = subprocess.run(cmd, cwd=root).returncode
+    finally:
+        out_addons.mkdir(parents=True, exist_ok=True)
+        for f in stash.iterdir():
+            target = out_addons / f.name
+            if not target.exists(): os.replace(f, target)
+        shutil.rmtree(stash, ignore_errors=True)
+    if status == 0:
+        record(root, hemtt_args)
+        print(f"✅ Incremental build complete: {len(changed)} rebuilt, {len(reused)} carried over.")
+    return status
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("check", "record", "incremental"):
+        print("Usage: build_cache.py <check|record|incremental> <project_path> [hemtt args...]")
+        sys.exit(2)
+    action, root, hemtt_args = sys.argv[1], Path(sys.argv[2]).resolve(), sys.argv[3:]
+    if action == "check":
+        sys.exit(0 if check(root, hemtt_args) else 1)
+    if action == "incremental":
+        sys.exit(incremental(root, hemtt_args))
+    record(root, hemtt_args)
+
+if __name__ == "__main__":
+    main()
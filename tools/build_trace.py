@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+# UKSFTA Build Trace
+# Records per-stage timings of the build/release pipeline as Chrome trace-event JSON.
+# Open the resulting file in chrome://tracing or https://ui.perfetto.dev
+
+def tree_stats(path):
+    """Returns (files, bytes) for a file or directory tree. Missing paths count as empty."""
+    if not path or not os.path.exists(path): return 0, 0
+    if os.path.isfile(path): return 1, os.path.getsize(path)
+    files = 0; total = 0
+    for root, _, names in os.walk(path):
+        for n in names:
+            try:
+                total += os.path.getsize(os.path.join(root, n)); files += 1
+            except OSError: pass
+    return files, total
+
+class Tracer:
+    """Collects complete ('X') trace events, one per pipeline stage."""
+
+    def __init__(self, output_path, process_name="release"):
+        self.output_path = output_path
+        self.pid = os.getpid()
+        self.events = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": process_name}}]
+
+    def add_event(self, name, start_ns, end_ns, tid=0, **args):
+        self.events.append({
+            "name": name, "cat": "stage", "ph": "X", "pid": self.pid, "tid": tid,
+            "ts": start_ns // 1000, "dur": max(0, end_ns - start_ns) // 1000, "args": args
+        })
+
+    @contextmanager
+    def stage(self, name, path=None, **args):
+        """
+        Times the enclosed block as one stage.
+        Yields a dict the caller can fill with extra args (e.g. 'files', 'bytes').
+        If 'path' is given, files/bytes are measured from it when the stage ends.
+        """
+        extra = dict(args)
+        start = time.time_ns()
+        try:
+            yield extra
+        finally:
+            end = time.time_ns()
+            if path is not None and "files" not in extra:
+                extra["files"], extra["bytes"] = tree_stats(path)
+            self.add_event(name, start, end, **extra)
+
+    def import_events(self, events_path, tid=1):
+        """Merges stage records appended by build.sh (one JSON object per line)."""
+        if not os.path.exists(events_path): return 0
+        count = 0
+        with open(events_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line: continue
+                try: rec = json.loads(line)
+                except ValueError: continue
+                args = {k: v for k, v in rec.items() if k not in ("name", "start_ns", "end_ns")}
+                self.add_event(rec["name"], rec["start_ns"], rec["end_ns"], tid=tid, **args)
+                count += 1
+        return count
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        with open(self.output_path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, indent=1)
+        return self.output_path
+
+    def summary(self):
+        stages = sorted((e for e in self.events if e["ph"] == "X"), key=lambda e: e["ts"])
+        lines = []
+        for e in stages:
+            a = e["args"]
+            size = f"{a['bytes'] / (1024 * 1024):.1f} MB" if "bytes" in a else "-"
+            files = str(a["files"]) if "files" in a else "-"
+            indent = "    " if e["tid"] else "  "
+            lines.append(f"{indent}{e['name']:<24} {e['dur'] / 1e6:>8.2f}s  {files:>7} files  {size:>10}")
+        return "\n".join(lines)
+
+def record_stage(events_path, name, start_ns, end_ns, path=None):
+    """Appends a single stage record; used by build.sh through the CLI below."""
+    rec = {"name": name, "start_ns": int(start_ns), "end_ns": int(end_ns)}
+    if path: rec["files"], rec["bytes"] = tree_stats(path)
+    os.makedirs(os.path.dirname(os.path.abspath(events_path)), exist_ok=True)
+    with open(events_path, "a") as f:
+        f.write(json.dumps(rec) + "\n")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 6 or sys.argv[1] != "record":
+        print("Usage: build_trace.py record <events.jsonl> <stage> <start_ns> <end_ns> [measured_path]")
+        sys.exit(1)
+    record_stage(sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[5], sys.argv[6] if len(sys.argv) > 6 else None)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# UKSFTA Cache Utilities
+# Shared helpers for the incremental tools: file signatures, a stat-keyed digest cache
+# and atomic JSON persistence.
+
+CACHE_DIR = Path(__file__).parent.parent / ".uksf_cache"
+
+def cache_path(name):
+    """Location of a named cache file inside the project's .uksf_cache folder."""
+    return CACHE_DIR / name
+
+def file_signature(path):
+    """Cheap change detector: (size, mtime_ns). None if the file is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def hash_file(path, git_blob=False, chunk_size=1024 * 1024):
+    """
+    SHA-1 of a file's content, read in chunks so large binaries stay out of memory.
+    With git_blob=True the digest equals the object ID git stores for the file.
+    """
+    h = hashlib.sha1()
+    if git_blob: h.update(b"blob %d\0" % os.path.getsize(path))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+@contextmanager
+def atomic_writer(path):
+    """
+    Binary file object whose content replaces 'path' only when the block completes;
+    for output streamed in pieces. The target's permissions are kept.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        if path.exists(): os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def atomic_write(path, data, encoding="utf-8"):
+    """Writes via a temp file in the same folder and renames it over the target."""
+    if isinstance(data, str): data = data.encode(encoding)
+    with atomic_writer(path) as f:
+        f.write(data)
+
+def load_json(path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path, data):
+    atomic_write(path, json.dumps(data, indent=1, sort_keys=True))
+
+class StatCache:
+    """
+    Remembers the content digest of files keyed by (size, mtime_ns).
+    A file is only re-hashed when its signature changes.
+    """
+
+    def __init__(self, path, git_blob=False):
+        self.path = Path(path)
+        self.git_blob = git_blob
+        self.entries = load_json(self.path, {}) or {}
+        self.dirty = False
+
+    def digest(self, file_path, key=None):
+        key = key or str(file_path)
+        sig = file_signature(file_path)
+        if sig is None: return None
+        cached = self.entries.get(key)
+        if cached and cached[:2] == sig: return cached[2]
+        digest = hash_file(file_path, self.git_blob)
+        self.entries[key] = sig + [digest]
+        self.dirty = True
+        return digest
+
+    def prune(self, keep):
+        """Drops entries for files no longer part of the input set."""
+        stale = set(self.entries) - set(keep)
+        for k in stale: del self.entries[k]
+        if stale: self.dirty = True
+
+    def save(self):
+        if self.dirty:
+            save_json(self.path, self.entries)
+            self.dirty = False
@@ -6,59 +6,110 @@ import json
 import sys
 from pathlib import Path
 from datetime import datetime
-
-# --- CONFIGURATION ---
-CLASS_PATTERN = re.compile(r'class\s+([a-zA-Z0-9_]+)\s*:\s*([a-zA-Z0-9_]+)', re.IGNORECASE)
-DISPLAY_NAME_PATTERN = re.compile(r'displayName\s*=\s*"([^"]+)"', re.IGNORECASE)
-SCOPE_PATTERN = re.compile(r'scope\s*=\s*(\d)', re.IGNORECASE)
-AUTHOR_PATTERN = re.compile(r'author\s*=\s*"([^"]+)"', re.IGNORECASE)
+from concurrent.futures import ProcessPoolExecutor
+from config_parser import load_config, iter_configs
+from cache_utils import cache_path, file_signature, load_json, save_json, atomic_write
 
 def get_projects():
     parent_dir = Path(__file__).parent.parent.parent.resolve()
     return sorted([d for d in parent_dir.iterdir() if d.is_dir() and d.name.startswith("UKSFTA-")])
 
-def parse_config(config_path):
-    try: content = config_path.read_text(errors='ignore')
-    except: return []
-    assets = []; blocks = re.split(r'class\s+', content)
-    for block in blocks[1:]:
-        full_block = "class " + block
-        header_match = CLASS_PATTERN.search(full_block)
-        if not header_match: continue
-        classname = header_match.group(1); parent = header_match.group(2)
-        scope_match = SCOPE_PATTERN.search(full_block)
-        scope = int(scope_match.group(1)) if scope_match else 0
-        if scope != 2: continue
-        display_name_match = DISPLAY_NAME_PATTERN.search(full_block)
-        display_name = display_name_match.group(1) if display_name_match else classname
-        author_match = AUTHOR_PATTERN.search(full_block)
-        author = author_match.group(1) if author_match else "UKSFTA"
-        assets.append({"className": classname, "displayName": display_name, "parent": parent, "author": author, "project": config_path.parent.parent.parent.name})
+CACHE_FILE = "catalog_assets.json"
+OUTPUT_DIR = Path(__file__).parent.parent
+CATALOG_HEADER = "*Generated on: "
+
+def extract_assets(tree, project_name):
+    assets = []
+    for _, cls in tree.walk():
+        # Public (scope = 2) classes that inherit from something; properties are the class's own
+        if not cls.parent or cls.get("scope") != 2: continue
+        display_name = cls.get("displayName")
+        author = cls.get("author")
+        assets.append({
+            "className": cls.name,
+            "displayName": display_name if isinstance(display_name, str) and display_name else cls.name,
+            "parent": cls.parent,
+            "author": author if isinstance(author, str) and author else "UKSFTA",
+            "project": project_name
+        })
     return assets
 
+def _parse_stale(config_paths):
+    """Worker: parses a batch of configs through the shared tree cache, returns {path: assets}."""
+    results = {}
+    for path in config_paths:
+        tree = load_config(path)
+        results[path] = extract_assets(tree, Path(path).parent.parent.parent.name) if tree is not None else []
+    return results
+
+def find_configs(project):
+    return sorted(str(c) for c in iter_configs(project))
+
+def write_if_changed(path, text, ignore_prefix=None):
+    """Writes only if the content differs (optionally ignoring lines starting with ignore_prefix)."""
+    path = Path(path)
+    if path.exists():
+        old = path.read_text(encoding='utf-8', errors='ignore')
+        strip = lambda t: [l for l in t.splitlines() if not (ignore_prefix and l.startswith(ignore_prefix))]
+        if strip(old) == strip(text): return False
+    atomic_write(path, text)
+    return True
+
 def generate_catalog():
     projects = get_projects(); all_assets = []
     header = "\n🛡️  [Virtual Armory] Indexing Unit Assets..."
     separator = " ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
     print(header); print(separator)
-    for p in projects:
-        configs = list(p.rglob("config.cpp"))
-        for cfg in configs:
-            if ".hemttout" in str(cfg): continue
-            found = parse_config(cfg)
-            if found:
-                print("  ✅ " + p.name + ": Found " + str(len(found)) + " assets.")
-                all_assets.extend(found)
+
+    # 1. Reuse cached results for configs whose signature is unchanged
+    cache = load_json(cache_path(CACHE_FILE), {}) or {}
+    project_configs = {p: find_configs(p) for p in projects}
+    stale = {}
+    for p, configs in project_configs.items():
+        # Signatures are taken before parsing: an edit made mid-run is picked up next time
+        sigs = {c: file_signature(c) for c in configs}
+        todo = {c: sig for c, sig in sigs.items() if c not in cache or cache[c]["sig"] != sig}
+        if todo: stale[p] = todo
+
+    # 2. Parse stale configs, one task per project across a process pool
+    if stale:
+        batches = [list(todo) for todo in stale.values()]
+        if len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(batches), os.cpu_count() or 1)) as pool:
+                parsed = {}
+                for res in pool.map(_parse_stale, batches): parsed.update(res)
+        else:
+            parsed = _parse_stale(batches[0])
+        sigs = {c: sig for todo in stale.values() for c, sig in todo.items()}
+        for path, assets in parsed.items():
+            cache[path] = {"sig": sigs[path], "assets": assets}
+
+    live = set()
+    for p, configs in project_configs.items():
+        found = []
+        for c in configs:
+            live.add(c); found.extend(cache[c]["assets"])
+        if found:
+            reparsed = len(stale.get(p, []))
+            print("  ✅ " + p.name + ": Found " + str(len(found)) + " assets. (" + str(reparsed) + "/" + str(len(configs)) + " configs re-parsed)")
+            all_assets.extend(found)
+    removed = [c for c in cache if c not in live]
+    for path in removed: del cache[path]
+    if stale or removed: save_json(cache_path(CACHE_FILE), cache)
+
     if not all_assets: print("  ❌ No assets found in workspace."); return
-    output_json = Path(__file__).parent.parent / "unit_assets.json"
-    with open(output_json, 'w') as f: json.dump(all_assets, f, indent=2)
-    output_md = Path(__file__).parent.parent / "ASSET_CATALOG.md"
+
+    # 3. Only touch outputs whose content changed, so git diffs stay quiet
+    output_json = OUTPUT_DIR / "unit_assets.json"
+    json_changed = write_if_changed(output_json, json.dumps(all_assets, indent=2))
+    output_md = OUTPUT_DIR / "ASSET_CATALOG.md"
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    md_lines = ["# 🛡️ UKSFTA Virtual Armory", "\n*Generated on: " + now + "*", "\n| Display Name | Class Name | Author | Project |", "| :--- | :--- | :--- | :--- |"]
+    md_lines = ["# 🛡️ UKSFTA Virtual Armory", "\n" + CATALOG_HEADER + now + "*", "\n| Display Name | Class Name | Author | Project |", "| :--- | :--- | :--- | :--- |"]
     for a in sorted(all_assets, key=lambda x: (x['project'], x['displayName'])):
         md_lines.append("| " + a['displayName'] + " | `" + a['className'] + "` | " + a['author'] + " | " + a['project'] + " |")
-    output_md.write_text("\n".join(md_lines))
+    md_changed = write_if_changed(output_md, "\n".join(md_lines), ignore_prefix=CATALOG_HEADER)
     print(separator)
-    print("✨ Catalog Complete: " + str(len(all_assets)) + " assets indexed.")
+    status = "updated" if (json_changed or md_changed) else "unchanged"
+    print("✨ Catalog Complete: " + str(len(all_assets)) + " assets indexed (outputs " + status + ").")
 
 if __name__ == "__main__": generate_catalog()
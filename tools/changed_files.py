@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import re
+import sys
+import argparse
+import subprocess
+from cache_utils import cache_path, file_signature, load_json, save_json
+
+# UKSFTA Changed-Files Selector
+# Turns "what is staged" into the file list the lint/audit tools should look at: the
+# staged files plus everything that #includes them, transitively. The include graph
+# is cached per file by size/mtime, so a pre-commit run only re-reads edited files.
+
+GRAPH_VERSION = 1
+GRAPH_FILE = "include_graph.json"
+INCLUDE_EXTS = (".cpp", ".hpp", ".sqf", ".ext", ".inc", ".h")
+SKIP_DIRS = {".git", ".hemttout", ".uksf_tools", ".uksf_cache", "node_modules"}
+_INCLUDE_RE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*[<"]([^">\r\n]+)[">]', re.MULTILINE)
+
+def git_root(path="."):
+    res = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=path, capture_output=True, text=True)
+    return res.stdout.strip() if res.returncode == 0 else None
+
+def staged_files(repo="."):
+    """Absolute paths of files added/modified in the index (deleted files are left out)."""
+    root = git_root(repo)
+    if not root: return []
+    out = subprocess.run(["git", "diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR"],
+                         cwd=root, capture_output=True, check=True).stdout
+    return [os.path.join(root, p) for p in out.decode("utf-8", errors="replace").split("\0") if p]
+
+def read_includes(path):
+    try:
+        with open(path, "rb") as f: data = f.read()
+    except OSError:
+        return []
+    return [m.group(1).decode("utf-8", errors="replace").strip() for m in _INCLUDE_RE.finditer(data)]
+
+class IncludeGraph:
+    """Raw #include targets per file (cached), resolved against the current file set on demand."""
+
+    def __init__(self, roots, path=None):
+        self.path = path or cache_path(GRAPH_FILE)
+        data = load_json(self.path, {}) or {}
+        self.entries = data.get("files", {}) if data.get("version") == GRAPH_VERSION else {}
+        self.files = []
+        for root in roots:
+            for dirpath, dirs, names in os.walk(root):
+                dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                self.files.extend(os.path.join(dirpath, n) for n in names if n.lower().endswith(INCLUDE_EXTS))
+        dirty = False
+        for f in self.files:
+            sig = file_signature(f)
+            entry = self.entries.get(f)
+            if not entry or entry["sig"] != sig:
+                self.entries[f] = {"sig": sig, "includes": read_includes(f)}; dirty = True
+        for f in [f for f in self.entries if not os.path.exists(f)]:
+            del self.entries[f]; dirty = True
+        if dirty: save_json(self.path, {"version": GRAPH_VERSION, "files": self.entries})
+        self._by_tail = None
+
+    def _tail_lookup(self):
+        # "addons/main/script_component.hpp" style suffixes -> files, for PBOPREFIX paths
+        if self._by_tail is None:
+            self._by_tail = {}
+            for f in self.files:
+                parts = f.replace("\\", "/").lower().split("/")
+                for i in range(max(0, len(parts) - 4), len(parts)):
+                    self._by_tail.setdefault("/".join(parts[i:]), []).append(f)
+        return self._by_tail
+
+    def resolve(self, includer, target):
+        """Files an include may refer to. Relative paths first, then the longest matching path suffix."""
+        target = target.replace("\\", "/")
+        if not target.startswith("/"):
+            local = os.path.normpath(os.path.join(os.path.dirname(includer), target))
+            if os.path.exists(local): return [local]
+        parts = [p for p in target.lower().split("/") if p]
+        lookup = self._tail_lookup()
+        for i in range(max(0, len(parts) - 4), len(parts)):
+            hits = lookup.get("/".join(parts[i:]))
+            if hits: return hits
+        return []
+
+    def dependants(self, changed):
+        """Every file that includes one of 'changed', directly or through other headers."""
+        reverse = {}
+        for f in self.files:
+            for target in self.entries[f]["includes"]:
+                for dep in self.resolve(f, target):
+                    reverse.setdefault(os.path.normcase(dep), set()).add(f)
+        seen = set(); queue = [os.path.normcase(os.path.abspath(c)) for c in changed]
+        while queue:
+            for f in reverse.get(queue.pop(), ()):
+                if f not in seen:
+                    seen.add(f); queue.append(os.path.normcase(f))
+        return seen - {os.path.abspath(c) for c in changed}
+
+def select_changed(repo=".", dependants=True):
+    """Staged files plus their transitive #include dependants, sorted."""
+    staged = staged_files(repo)
+    if not staged or not dependants: return sorted(staged)
+    headers = [f for f in staged if f.lower().endswith(INCLUDE_EXTS)]
+    extra = IncludeGraph([git_root(repo)]).dependants(headers) if headers else set()
+    return sorted(set(staged) | extra)
+
+def add_file_arguments(parser):
+    """Adds the shared --files / --changed selectors to a tool's argparse parser."""
+    parser.add_argument("--files", nargs="+", metavar="FILE", help="Only check these files")
+    parser.add_argument("--changed", action="store_true", help="Only check files staged for commit and the files that #include them")
+
+def selected_files(args, extensions):
+    """The explicit file list for a tool (filtered to 'extensions'), or None to scan as usual."""
+    if getattr(args, "changed", False): files = select_changed()
+    elif getattr(args, "files", None): files = [os.path.abspath(f) for f in args.files]
+    else: return None
+    return [f for f in files if f.lower().endswith(extensions) and os.path.isfile(f)]
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Changed-Files Selector")
+    parser.add_argument("repo", nargs="?", default=".", help="Repository to inspect")
+    parser.add_argument("--no-dependants", action="store_true", help="Only list the staged files")
+    args = parser.parse_args()
+    for f in select_changed(args.repo, not args.no_dependants):
+        print(f)
+
+if __name__ == "__main__":
+    main()
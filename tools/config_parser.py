@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import re
+import sys
+import time
+import atexit
+import pickle
+import hashlib
+from pathlib import Path
+from cache_utils import cache_path, file_signature, atomic_write
+
+# UKSFTA Config Parser
+# Streaming tokenizer and lenient parser for Arma config syntax (config.cpp / .hpp / .ext).
+# Produces a compact class tree; parsed trees are cached per file by signature and content hash.
+#
+# Supported: classes with inheritance, forward declarations, 'delete', scalar properties,
+# arrays (nested, '[] =' and '[] +='), strings with doubled quotes and macro calls as values.
+# Preprocessor lines are skipped; #include files are not followed.
+
+PARSER_VERSION = 2
+CACHE_FILE = "config_trees.pickle"
+
+_TOKEN_RE = re.compile(r'''
+    (?P<pre>(?:^|(?<=\n))[ \t]*\#(?:\\\r?\n|\\.|[^\\\n])*)
+  | (?P<nl>\n)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<lcomment>//[^\n]*)
+  | (?P<bcomment>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<str>"(?:[^"]|"")*"?|'(?:[^']|'')*'?)
+  | (?P<op>\+=)
+  | (?P<punct>[{}()\[\];:=,])
+  | (?P<word>(?:[^\s{}()\[\];:=,"'/]|/(?![/*]))+)
+  | (?P<other>.)
+''', re.VERBOSE)
+
+_NUMBER_RE = re.compile(r'^[+-]?(?:0x[0-9a-fA-F]+|\d+\.?\d*(?:e[+-]?\d+)?|\.\d+(?:e[+-]?\d+)?)$', re.IGNORECASE)
+
+def _to_number(val):
+    low = val.lower()
+    try:
+        if "0x" in low: return int(low, 16)
+        if "." in low or "e" in low: return float(low)
+        return int(low)
+    except ValueError:
+        return val
+
+def tokenize(text):
+    """Yields (kind, value, line). kind is 'str', 'word', '+=', 'eof' or the punctuation char."""
+    line = 1
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "nl":
+            line += 1
+        elif kind == "ws":
+            continue
+        elif kind in ("lcomment", "bcomment", "pre"):
+            line += m.group().count("\n")
+        elif kind == "str":
+            raw = m.group()
+            q = raw[0]
+            body = raw[1:-1] if len(raw) > 1 and raw[-1] == q else raw[1:]
+            yield "str", body.replace(q + q, q), line
+            line += raw.count("\n")
+        elif kind == "word":
+            yield "word", m.group(), line
+        elif kind == "other":
+            yield "word", m.group(), line
+        else:
+            v = m.group()
+            yield v, v, line
+    yield "eof", "", line
+
+class ConfigArray(list):
+    """Array property value; 'append' is True for 'name[] += {...}'."""
+    __slots__ = ("append",)
+
+    def __init__(self, items=(), append=False):
+        super().__init__(items)
+        self.append = append
+
+    def __reduce__(self):
+        return (ConfigArray, (list(self), self.append))
+
+class ConfigClass:
+    """One class node: name, parent, properties and child classes (keyed by lowercase name)."""
+    __slots__ = ("name", "parent", "properties", "classes", "deleted", "extern", "line")
+
+    def __init__(self, name, parent=None, line=0, extern=False):
+        self.name = name
+        self.parent = parent
+        self.properties = {}
+        self.classes = {}
+        self.deleted = []
+        self.extern = extern
+        self.line = line
+
+    def __repr__(self):
+        return f"<ConfigClass {self.name}{' : ' + self.parent if self.parent else ''}>"
+
+    def get(self, key, default=None):
+        """Own property lookup, case-insensitive like the engine."""
+        if key in self.properties: return self.properties[key]
+        low = key.lower()
+        for k, v in self.properties.items():
+            if k.lower() == low: return v
+        return default
+
+    def child(self, name):
+        return self.classes.get(name.lower())
+
+    def find(self, *path):
+        """Descends through child classes: root.find("CfgPatches", "my_addon")."""
+        node = self
+        for name in path:
+            node = node.classes.get(name.lower())
+            if node is None: return None
+        return node
+
+    def walk(self, _path=()):
+        """Depth-first iteration yielding (ancestor_names, class) for every class below this one."""
+        for c in self.classes.values():
+            yield _path, c
+            if c.classes: yield from c.walk(_path + (c.name,))
+
+    def _add_class(self, cls):
+        key = cls.name.lower()
+        existing = self.classes.get(key)
+        # A forward declaration never replaces a real definition
+        if cls.extern and existing is not None: return existing
+        self.classes[key] = cls
+        return cls
+
+class _Parser:
+    def __init__(self, tokens):
+        self._next = iter(tokens).__next__
+        self._back = []
+
+    def next(self):
+        return self._back.pop() if self._back else self._next()
+
+    def push(self, tok):
+        self._back.append(tok)
+
+    def read_name(self, first):
+        """A name token, optionally followed by a macro argument list: GVAR(foo)."""
+        parts = [first[1]]
+        tok = self.next()
+        if tok[0] == "(":
+            parts.append(self._collect_group())
+        else:
+            self.push(tok)
+        return "".join(parts)
+
+    def _collect_group(self):
+        """Raw text of a balanced (...) group; the opening paren was already read."""
+        depth = 1; parts = ["("]
+        while depth:
+            kind, val, _ = self.next()
+            if kind == "eof": break
+            if kind == "(": depth += 1
+            elif kind == ")": depth -= 1
+            parts.append('"%s"' % val.replace('"', '""') if kind == "str" else val)
+        return "".join(parts)
+
+    def skip_statement(self):
+        while True:
+            kind = self.next()[0]
+            if kind in (";", "eof"): return
+            if kind == "}": self.push((kind, kind, 0)); return
+
+    def parse_body(self, node):
+        while True:
+            tok = self.next()
+            kind, val, line = tok
+            if kind == "eof": return
+            if kind == "}":
+                nxt = self.next()
+                if nxt[0] != ";": self.push(nxt)
+                return
+            if kind in (";", ","): continue
+            if kind not in ("word", "str"):
+                continue
+            low = val.lower() if kind == "word" else ""
+            if low == "class":
+                self.parse_class(node)
+            elif low == "delete":
+                name_tok = self.next()
+                if name_tok[0] in ("word", "str"): node.deleted.append(self.read_name(name_tok))
+                self.skip_statement()
+            else:
+                self.parse_property(node, tok)
+
+    def parse_class(self, node):
+        name_tok = self.next()
+        if name_tok[0] not in ("word", "str"):
+            self.push(name_tok); return
+        name = self.read_name(name_tok)
+        parent = None
+        tok = self.next()
+        if tok[0] == ":":
+            p_tok = self.next()
+            if p_tok[0] in ("word", "str"): parent = self.read_name(p_tok)
+            tok = self.next()
+        if tok[0] == "{":
+            cls = node._add_class(ConfigClass(name, parent, name_tok[2]))
+            self.parse_body(cls)
+        elif tok[0] == ";":
+            node._add_class(ConfigClass(name, parent, name_tok[2], extern=True))
+        else:
+            self.push(tok); self.skip_statement()
+
+    def parse_property(self, node, first):
+        name = self.read_name(first)
+        tok = self.next()
+        is_array = False
+        if tok[0] == "[":
+            close = self.next()
+            if close[0] != "]": self.push(close)
+            is_array = True
+            tok = self.next()
+        if tok[0] not in ("=", "+="):
+            # Bare macro statement (e.g. 'MACRO(x)' without a semicolon): leave the next token alone
+            self.push(tok)
+            return
+        append = tok[0] == "+="
+        if is_array or append:
+            nxt = self.next()
+            if nxt[0] == "{":
+                value = ConfigArray(self.parse_array(), append)
+                end = self.next()
+                if end[0] != ";": self.push(end)
+            else:
+                self.push(nxt)
+                value = self.parse_scalar(stops=(";",))
+        else:
+            value = self.parse_scalar(stops=(";",))
+        node.properties[name] = value
+
+    def parse_array(self):
+        items = []
+        while True:
+            tok = self.next()
+            kind = tok[0]
+            if kind in ("}", "eof"): return items
+            if kind == ",": continue
+            if kind == "{":
+                items.append(ConfigArray(self.parse_array()))
+                continue
+            self.push(tok)
+            items.append(self.parse_scalar(stops=(",",)))
+
+    def parse_scalar(self, stops):
+        """Collects a value up to a stop token (consumed) or a closing brace (left in place)."""
+        parts = []; depth = 0
+        while True:
+            tok = self.next()
+            kind, val, _ = tok
+            if kind == "eof": break
+            if depth == 0 and kind in stops: break
+            if depth == 0 and kind == "}":
+                self.push(tok); break
+            if kind == "(": depth += 1
+            elif kind == ")": depth = max(0, depth - 1)
+            parts.append(tok)
+        if len(parts) == 1:
+            kind, val, _ = parts[0]
+            if kind == "str": return val
+            return _to_number(val) if _NUMBER_RE.match(val) else val
+        out = []; prev_word = False
+        for kind, val, _ in parts:
+            is_word = kind in ("word", "str")
+            if is_word and prev_word: out.append(" ")
+            out.append('"%s"' % val.replace('"', '""') if kind == "str" else val)
+            prev_word = is_word
+        return "".join(out)
+
+def parse(text):
+    """Parses config text into a root ConfigClass (name '')."""
+    root = ConfigClass("")
+    _Parser(tokenize(text)).parse_body(root)
+    return root
+
+# --- CACHE ---
+_cache = None
+_cache_dirty = False
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        _cache = {}
+        try:
+            with open(cache_path(CACHE_FILE), "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == PARSER_VERSION: _cache = data["files"]
+        except Exception:
+            pass
+        atexit.register(save_cache)
+    return _cache
+
+def save_cache():
+    """Persists parsed trees so the next process starts warm. Called automatically at exit."""
+    global _cache_dirty
+    if not _cache_dirty or _cache is None: return
+    # Forget files that no longer exist
+    for p in [p for p in _cache if not os.path.exists(p)]: del _cache[p]
+    try:
+        atomic_write(cache_path(CACHE_FILE), pickle.dumps({"version": PARSER_VERSION, "files": _cache}, protocol=pickle.HIGHEST_PROTOCOL))
+        _cache_dirty = False
+    except OSError:
+        pass
+
+def load_config(path):
+    """
+    Returns the parsed class tree of a config file, using the cache when the file's
+    size/mtime (or, failing that, its content hash) is unchanged. None if unreadable.
+    """
+    global _cache_dirty
+    cache = _load_cache()
+    key = os.path.abspath(path)
+    sig = file_signature(key)
+    if sig is None: return None
+    entry = cache.get(key)
+    if entry and entry[0] == sig: return entry[2]
+    try:
+        with open(key, "rb") as f: data = f.read()
+    except OSError:
+        return None
+    digest = hashlib.sha1(data).hexdigest()
+    if entry and entry[1] == digest:
+        tree = entry[2]
+    else:
+        tree = parse(data.decode("utf-8", errors="ignore"))
+    cache[key] = (sig, digest, tree)
+    _cache_dirty = True
+    return tree
+
+def iter_configs(root, name="config.cpp"):
+    """Yields config files below root, skipping build output and tool folders."""
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in (".git", ".hemttout", ".uksf_tools", ".uksf_cache")]
+        for f in files:
+            if f.lower() == name: yield Path(dirpath) / f
+
+if __name__ == "__main__":
+    # Parse every config below the given path and report timing (cold vs warm cache)
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+    start = time.perf_counter(); count = 0; classes = 0
+    for cfg in iter_configs(target):
+        tree = load_config(cfg)
+        if tree is None: continue
+        count += 1
+        classes += sum(1 for _ in tree.walk())
+    print(f"Parsed {count} configs ({classes} classes) in {time.perf_counter() - start:.3f}s")
@@ -2,106 +2,210 @@
 # -*- coding: utf-8 -*-
 import fnmatch
 import os
+import re
+import time
+import random
 import sys
 import argparse
 from pathlib import Path
+from changed_files import add_file_arguments, selected_files
+
+# Diagnostic messages; per-line ones get " at <file> Line number: <n>", file-level ones " in file <file>"
+MISSING_ROUND = "Possible missing round bracket ')' detected"
+MISSING_SQUARE = "Possible missing square bracket ']' detected"
+MISSING_CURLY = "Possible missing curly brace '}' detected"
+UNBALANCED_SQUARE = "A possible missing square bracket [ or ]"
+UNBALANCED_ROUND = "A possible missing round bracket ( or )"
+UNBALANCED_CURLY = "A possible missing curly brace { or }"
+
+def scan_config_style_reference(content):
+    """Original char-by-char scanner; kept as the oracle for scan_config_style and its benchmark."""
+    diagnostics = []
+    brackets_list = []
+    isInCommentBlock = False
+    checkIfInComment = False
+    ignoreTillEndOfLine = False
+    checkIfNextIsClosingBlock = False
+    isInString = False
+    inStringType = ''
+    lastIsCurlyBrace = False
+    lineNumber = 1
+
+    for c in content:
+        if (lastIsCurlyBrace): lastIsCurlyBrace = False
+        if c == '\n': lineNumber += 1
+        if (isInString):
+            if (c == inStringType): isInString = False
+        elif (isInCommentBlock == False):
+            if (checkIfInComment):
+                checkIfInComment = False
+                if c == '*': isInCommentBlock = True
+                elif (c == '/'): ignoreTillEndOfLine = True
+            if (isInCommentBlock == False):
+                if (ignoreTillEndOfLine):
+                    if (c == '\n'): ignoreTillEndOfLine = False
+                else:
+                    if (c == '"' or c == "'"):
+                        isInString = True
+                        inStringType = c
+                    elif (c == '/'): checkIfInComment = True
+                    elif (c == '('): brackets_list.append('(')
+                    elif (c == ')'):
+                        if (len(brackets_list) > 0 and brackets_list[-1] in ['{', '[']):
+                            diagnostics.append((lineNumber, MISSING_ROUND))
+                        brackets_list.append(')')
+                    elif (c == '['): brackets_list.append('[')
+                    elif (c == ']'):
+                        if (len(brackets_list) > 0 and brackets_list[-1] in ['{', '(']):
+                            diagnostics.append((lineNumber, MISSING_SQUARE))
+                        brackets_list.append(']')
+                    elif (c == '{'): brackets_list.append('{')
+                    elif (c == '}'):
+                        lastIsCurlyBrace = True
+                        if (len(brackets_list) > 0 and brackets_list[-1] in ['(', '[']):
+                            diagnostics.append((lineNumber, MISSING_CURLY))
+                        brackets_list.append('}')
+        else:
+            if (c == '*'): checkIfNextIsClosingBlock = True
+            elif (checkIfNextIsClosingBlock):
+                if (c == '/'): isInCommentBlock = False
+                elif (c != '*'): checkIfNextIsClosingBlock = False
+
+    if brackets_list.count('[') != brackets_list.count(']'):
+        diagnostics.append((None, UNBALANCED_SQUARE))
+    if brackets_list.count('(') != brackets_list.count(')'):
+        diagnostics.append((None, UNBALANCED_ROUND))
+    if brackets_list.count('{') != brackets_list.count('}'):
+        diagnostics.append((None, UNBALANCED_CURLY))
+    return diagnostics
+
+# Only strings, comments and brackets matter; everything else is skipped by the regex engine
+_SIGNIFICANT_RE = re.compile(r'"[^"]*"?|\'[^\']*\'?|//[^\n]*|/\*|[()\[\]{}]')
+# Last bracket seen -> closers that are reported after it
+_SUSPECT = {")": ("{", "[", MISSING_ROUND), "]": ("{", "(", MISSING_SQUARE), "}": ("(", "[", MISSING_CURLY)}
+
+def scan_config_style(content):
+    """
+    Returns (line_number, message) diagnostics; line_number is None for file-level findings.
+    Same results as scan_config_style_reference, but the regex engine skips the uninteresting text.
+    """
+    diagnostics = []
+    counts = dict.fromkeys("()[]{}", 0)
+    last = None
+    line = 1; line_pos = 0
+    # The original scanner never resets its 'closing' flag after a '*/', so every later
+    # block comment opened as '/*/' ends right there. Mirror that to stay identical.
+    closed_block = False
+    pos = 0
+    while True:
+        # finditer runs until a block comment; scanning then resumes behind the comment
+        for m in _SIGNIFICANT_RE.finditer(content, pos):
+            tok = m.group()
+            if tok in counts:
+                counts[tok] += 1
+                rule = _SUSPECT.get(tok)
+                if rule is not None and (last == rule[0] or last == rule[1]):
+                    start = m.start()
+                    line += content.count("\n", line_pos, start); line_pos = start
+                    diagnostics.append((line, rule[2]))
+                last = tok
+            elif tok == "/*":
+                start = m.end()
+                if closed_block and content.startswith("/", start):
+                    pos = start + 1
+                else:
+                    close = content.find("*/", start)
+                    pos = close + 2 if close >= 0 else len(content)
+                closed_block = True
+                break
+        else:
+            break
+    if counts["["] != counts["]"]: diagnostics.append((None, UNBALANCED_SQUARE))
+    if counts["("] != counts[")"]: diagnostics.append((None, UNBALANCED_ROUND))
+    if counts["{"] != counts["}"]: diagnostics.append((None, UNBALANCED_CURLY))
+    return diagnostics
+
+def format_diagnostic(filepath, line, message):
+    if line is None: return f"ERROR: {message} in file {filepath}"
+    return f"ERROR: {message} at {filepath} Line number: {line}"
 
 def check_config_style(filepath):
     bad_count_file = 0
     try:
         with open(filepath, 'r', encoding='utf-8', errors='ignore') as file:
             content = file.read()
-            brackets_list = []
-            isInCommentBlock = False
-            checkIfInComment = False
-            ignoreTillEndOfLine = False
-            checkIfNextIsClosingBlock = False
-            isInString = False
-            inStringType = ''
-            lastIsCurlyBrace = False
-            lineNumber = 1
-
-            for c in content:
-                if (lastIsCurlyBrace): lastIsCurlyBrace = False
-                if c == '\n': lineNumber += 1
-                if (isInString):
-                    if (c == inStringType): isInString = False
-                elif (isInCommentBlock == False):
-                    if (checkIfInComment):
-                        checkIfInComment = False
-                        if c == '*': isInCommentBlock = True
-                        elif (c == '/'): ignoreTillEndOfLine = True
-                    if (isInCommentBlock == False):
-                        if (ignoreTillEndOfLine):
-                            if (c == '\n'): ignoreTillEndOfLine = False
-                        else:
-                            if (c == '"' or c == "'"):
-                                isInString = True
-                                inStringType = c
-                            elif (c == '/'): checkIfInComment = True
-                            elif (c == '('): brackets_list.append('(')
-                            elif (c == ')'):
-                                if (len(brackets_list) > 0 and brackets_list[-1] in ['{', '[']):
-                                    print(f"ERROR: Possible missing round bracket ')' detected at {filepath} Line number: {lineNumber}")
-                                    bad_count_file += 1
-                                brackets_list.append(')')
-                            elif (c == '['): brackets_list.append('[')
-                            elif (c == ']'):
-                                if (len(brackets_list) > 0 and brackets_list[-1] in ['{', '(']):
-                                    print(f"ERROR: Possible missing square bracket ']' detected at {filepath} Line number: {lineNumber}")
-                                    bad_count_file += 1
-                                brackets_list.append(']')
-                            elif (c == '{'): brackets_list.append('{')
-                            elif (c == '}'):
-                                lastIsCurlyBrace = True
-                                if (len(brackets_list) > 0 and brackets_list[-1] in ['(', '[']):
-                                    print(f"ERROR: Possible missing curly brace '}}' detected at {filepath} Line number: {lineNumber}")
-                                    bad_count_file += 1
-                                brackets_list.append('}')
-                else:
-                    if (c == '*'): checkIfNextIsClosingBlock = True
-                    elif (checkIfNextIsClosingBlock):
-                        if (c == '/'): isInCommentBlock = False
-                        elif (c != '*'): checkIfNextIsClosingBlock = False
-
-            if brackets_list.count('[') != brackets_list.count(']'):
-                print(f"ERROR: A possible missing square bracket [ or ] in file {filepath}")
-                bad_count_file += 1
-            if brackets_list.count('(') != brackets_list.count(')'):
-                print(f"ERROR: A possible missing round bracket ( or ) in file {filepath}")
-                bad_count_file += 1
-            if brackets_list.count('{') != brackets_list.count('}'):
-                print(f"ERROR: A possible missing curly brace {{ or }} in file {filepath}")
-                bad_count_file += 1
+        for line, message in scan_config_style(content):
+            print(format_diagnostic(filepath, line, message))
+            bad_count_file += 1
     except: pass
     return bad_count_file
 
+def lint_check(lint_file):
+    """Lint engine entry point: (line, col, message) diagnostics for one file."""
+    return [(line or 0, 0, message) for line, message in scan_config_style(lint_file.text)]
+
+# Picked up by lint_engine.py
+LINT_CHECKER = {"name": "config-style", "version": 1, "extensions": (".cpp", ".hpp"), "roots": ("addons",), "check": lint_check}
+
+def generate_benchmark_config(size_mb=10, seed=0):
+    """Synthetic config.cpp text of roughly size_mb megabytes with classes, arrays, strings and comments."""
+    rng = random.Random(seed)
+    parts = []; total = 0; i = 0
+    while total < size_mb * 1024 * 1024:
+        block = (
+            f"/* Vest variant {i} */\n"
+            f"class UKSFTA_Vest_{i} : Vest_Camo_Base {{\n"
+            f"    scope = 2; // public\n"
+            f"    displayName = \"Plate Carrier ({i}) [MTP]\";\n"
+            f"    hiddenSelectionsTextures[] = {{\"\\z\\uksfta\\addons\\gear\\data\\vest_{i}_co.paa\"}};\n"
+            f"    class ItemInfo : VestItem {{ containerClass = QUOTE(Supply{rng.randint(40, 200)}); mass = {rng.randint(20, 120)}; }};\n"
+            f"}};\n"
+        )
+        parts.append(block); total += len(block); i += 1
+    return "".join(parts)
+
+def run_benchmark(size_mb=10):
+    content = generate_benchmark_config(size_mb)
+    # Sprinkle a few defects so both scanners have something to report
+    content = content.replace("mass = 50; };", "mass = (50; };")
+    print(f"Benchmark: {len(content) / (1024 * 1024):.1f} MB generated config")
+    start = time.perf_counter(); old = scan_config_style_reference(content); t_old = time.perf_counter() - start
+    start = time.perf_counter(); new = scan_config_style(content); t_new = time.perf_counter() - start
+    print(f"  char-by-char scanner: {t_old:8.3f}s")
+    print(f"  regex scanner:        {t_new:8.3f}s  ({t_old / max(t_new, 1e-9):.1f}x)")
+    print(f"  diagnostics: {len(new)} ({'identical' if old == new else 'DIFFERENT'})")
+    return 0 if old == new else 1
+
 def main():
     print("Validating Config Style")
     parser = argparse.ArgumentParser()
     parser.add_argument('-m','--module', help='only search specified module addon folder', required=False, default="")
     parser.add_argument('path', nargs='?', default=".", help="Project path to scan")
+    parser.add_argument('--benchmark', type=float, metavar="MB", nargs='?', const=10, help="Compare against the original scanner on a generated config")
+    add_file_arguments(parser)
     args = parser.parse_args()
+    if args.benchmark: return run_benchmark(args.benchmark)
 
     bad_count = 0
-    sqf_list = []
-    
-    scan_root = Path(args.path)
-    addons_dir = scan_root / "addons"
-    target_dir = addons_dir if addons_dir.exists() else scan_root
-    
-    if args.module:
-        target_dir = target_dir / args.module
-
-    if not target_dir.exists():
-        print(f"  [!] Target directory not found: {target_dir}")
-        return 0
-
-    for root, _, filenames in os.walk(target_dir):
-        if ".hemttout" in root or ".uksf_tools" in root: continue
-        for filename in filenames:
-            if filename.lower().endswith(('.cpp', '.hpp')):
-                sqf_list.append(os.path.join(root, filename))
+    sqf_list = selected_files(args, ('.cpp', '.hpp'))
+    if sqf_list is None:
+        sqf_list = []
+        scan_root = Path(args.path)
+        addons_dir = scan_root / "addons"
+        target_dir = addons_dir if addons_dir.exists() else scan_root
+
+        if args.module:
+            target_dir = target_dir / args.module
+
+        if not target_dir.exists():
+            print(f"  [!] Target directory not found: {target_dir}")
+            return 0
+
+        for root, _, filenames in os.walk(target_dir):
+            if ".hemttout" in root or ".uksf_tools" in root: continue
+            for filename in filenames:
+                if filename.lower().endswith(('.cpp', '.hpp')):
+                    sqf_list.append(os.path.join(root, filename))
 
     for filename in sqf_list:
         bad_count += check_config_style(filename)
@@ -4,6 +4,9 @@ import os
 import re
 import sys
 from pathlib import Path
+import argparse
+from config_parser import load_config
+from cache_utils import save_json, atomic_write
 
 # Soft-import rich for high-fidelity CLI output
 try:
@@ -18,55 +21,154 @@ def get_projects():
     parent_dir = Path(__file__).parent.parent.parent
     return [d for d in parent_dir.iterdir() if d.is_dir() and d.name.startswith("UKSFTA-") and (d / ".hemtt" / "project.toml").exists()]
 
-def analyze_dependencies():
-    projects = get_projects()
-    graph = {} # Project Name -> List of unit dependencies
-    all_unit_patches = {} # Patch Name -> Project Name
+def get_patch_classes(config_path):
+    """CfgPatches entries of a config.cpp (parsed once, served from the config cache)."""
+    tree = load_config(config_path)
+    patches = tree.find("CfgPatches") if tree else None
+    return [c for c in patches.classes.values() if not c.extern] if patches else []
 
-    # 1. Map all internal unit patches
+def collect_patches(projects):
+    """
+    Single pass over every config.cpp: {patch name (lowercase): {"name", "project", "requires"}}.
+    This is the CfgPatches-level build graph; project edges are derived from it.
+    """
+    patches = {}
     for p in projects:
-        project_patches = []
         for config in p.rglob("config.cpp"):
-            if ".hemttout" in str(config): continue
-            with open(config, 'r', errors='ignore') as f:
-                content = f.read()
-                matches = re.findall(r'class\s+CfgPatches\s*\{[^}]*class\s+([a-zA-Z0-9_]+)', content, re.MULTILINE | re.DOTALL)
-                for m in matches:
-                    all_unit_patches[m] = p.name
-                    project_patches.append(m)
-        graph[p.name] = {"patches": project_patches, "deps": set()}
-
-    # 2. Identify internal requirements
-    for p in projects:
-        for config in p.rglob("config.cpp"):
-            if ".hemttout" in str(config): continue
-            with open(config, 'r', errors='ignore') as f:
-                content = f.read()
-                rm = re.search(r'requiredAddons\[\]\s*=\s*\{([^}]*)\}', content, re.MULTILINE | re.DOTALL)
-                if rm:
-                    reqs = [r.strip().replace('"', '').replace("'", "") for r in rm.group(1).split(',') if r.strip()]
-                    for r in reqs:
-                        if r in all_unit_patches:
-                            target_project = all_unit_patches[r]
-                            if target_project != p.name:
-                                graph[p.name]["deps"].add(target_project)
+            if ".hemttout" in str(config) or ".uksf_tools" in str(config): continue
+            for patch in get_patch_classes(config):
+                requires = [r for r in (patch.get("requiredAddons") or []) if isinstance(r, str)]
+                patches[patch.name.lower()] = {"name": patch.name, "project": p.name, "requires": requires}
+    return patches
+
+def patch_graph(patches):
+    """Adjacency of unit patches to the unit patches they require (external addons dropped)."""
+    return {info["name"]: {patches[r.lower()]["name"] for r in info["requires"] if r.lower() in patches}
+            for info in patches.values()}
+
+def analyze_dependencies(projects=None):
+    projects = get_projects() if projects is None else projects
+    graph = {p.name: {"patches": [], "deps": set()} for p in projects} # Project Name -> unit dependencies
+    patches = collect_patches(projects)
+
+    for info in patches.values():
+        graph[info["project"]]["patches"].append(info["name"])
+    # Project edges: any patch requiring a patch owned by another project
+    for info in patches.values():
+        for r in info["requires"]:
+            target = patches.get(r.lower())
+            if target and target["project"] != info["project"]:
+                graph[info["project"]]["deps"].add(target["project"])
 
     return graph
 
+def topological_waves(adjacency):
+    """
+    Kahn's algorithm in levels. adjacency maps node -> prerequisites.
+    Returns (waves, blocked): every node of a wave only needs nodes of earlier waves;
+    'blocked' holds nodes that sit on (or behind) a cycle and cannot be ordered.
+    """
+    pending = {n: {d for d in deps if d in adjacency and d != n} for n, deps in adjacency.items()}
+    self_loops = {n for n, deps in adjacency.items() if n in deps}
+    dependants = {}
+    for n, deps in pending.items():
+        for d in deps: dependants.setdefault(d, []).append(n)
+    current = sorted(n for n, deps in pending.items() if not deps and n not in self_loops)
+    waves = []; placed = set()
+    while current:
+        waves.append(current); placed.update(current)
+        nxt = []
+        for n in current:
+            for m in dependants.get(n, ()):
+                pending[m].discard(n)
+                if not pending[m] and m not in placed and m not in self_loops: nxt.append(m)
+        current = sorted(set(nxt))
+    blocked = sorted(n for n in adjacency if n not in placed)
+    return waves, blocked
+
+def strongly_connected_components(adjacency):
+    """
+    Iterative Tarjan: O(V+E). adjacency maps node -> iterable of successors
+    (successors missing from the map are treated as leaves). Returns a list of SCCs.
+    """
+    index = {}; low = {}; on_stack = set(); stack = []; result = []; counter = 0
+    for root in adjacency:
+        if root in index: continue
+        work = [(root, iter(adjacency.get(root, ())))]
+        index[root] = low[root] = counter; counter += 1
+        stack.append(root); on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for nxt in successors:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter; counter += 1
+                    stack.append(nxt); on_stack.add(nxt)
+                    work.append((nxt, iter(adjacency.get(nxt, ()))))
+                    advanced = True
+                    break
+                if nxt in on_stack: low[node] = min(low[node], index[nxt])
+            if advanced: continue
+            work.pop()
+            if work: low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop(); on_stack.discard(member); component.append(member)
+                    if member == node: break
+                result.append(component)
+    return result
+
+def shortest_cycle(adjacency, members):
+    """Shortest cycle through the smallest member of an SCC, as [a, ..., a] (BFS inside the SCC)."""
+    members = set(members)
+    start = min(members)
+    prev = {start: None}; queue = [start]
+    for node in queue:
+        for nxt in sorted(adjacency.get(node, ())):
+            if nxt not in members: continue
+            if nxt == start:
+                path = [node]
+                while prev[path[-1]] is not None: path.append(prev[path[-1]])
+                return list(reversed(path)) + [start]
+            if nxt not in prev:
+                prev[nxt] = node; queue.append(nxt)
+    return [start, start]
+
+def find_cycles(adjacency):
+    """One minimal cycle per cyclic SCC (self-loops included), each reported exactly once."""
+    cycles = []
+    for component in strongly_connected_components(adjacency):
+        if len(component) == 1 and component[0] not in adjacency.get(component[0], ()): continue
+        cycles.append(shortest_cycle(adjacency, component))
+    return sorted(cycles)
+
 def find_circular_dependencies(graph):
-    circular = []
-    for start_node in graph:
-        visited = set()
-        stack = [(start_node, [start_node])]
-        while stack:
-            (node, path) = stack.pop()
-            for neighbor in graph[node]["deps"]:
-                if neighbor == start_node:
-                    circular.append(path + [neighbor])
-                elif neighbor not in visited:
-                    visited.add(neighbor)
-                    stack.append((neighbor, path + [neighbor]))
-    return circular
+    return find_cycles({name: data["deps"] for name, data in graph.items()})
+
+def export_graph(graph, circular, path):
+    """Writes the project graph as JSON (.json) or Graphviz DOT (anything else)."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        waves, blocked = topological_waves({n: d["deps"] for n, d in graph.items()})
+        data = {
+            "projects": {n: {"patches": sorted(d["patches"]), "deps": sorted(d["deps"])} for n, d in sorted(graph.items())},
+            "waves": waves,
+            "blocked": blocked,
+            "cycles": circular
+        }
+        save_json(path, data)
+    else:
+        cyclic = {(c[i], c[i + 1]) for c in circular for i in range(len(c) - 1)}
+        lines = ["digraph uksfta_dependencies {", "    rankdir=LR;", "    node [shape=box];"]
+        for name, data in sorted(graph.items()):
+            lines.append(f'    "{name}";')
+            for dep in sorted(data["deps"]):
+                style = ' [color=red]' if (name, dep) in cyclic else ""
+                lines.append(f'    "{name}" -> "{dep}"{style};')
+        lines.append("}")
+        atomic_write(path, "\n".join(lines) + "\n")
+    print(f"  📤 Graph exported: {path}")
 
 def print_report(graph, circular):
     header = "\n🕸️  [Strategic Intelligence] Unit Dependency Map"
@@ -88,6 +190,13 @@ def print_report(graph, circular):
             deps = ", ".join(list(data["deps"])) or "None"
             print(f"  {proj:<20} -> {deps}")
 
+    waves, blocked = topological_waves({n: d["deps"] for n, d in graph.items()})
+    print("\n  [Build Waves]")
+    for i, wave in enumerate(waves):
+        print(f"    {i + 1}. {', '.join(wave)}")
+    if blocked:
+        print(f"    ⚠️  Unordered (cyclic): {', '.join(blocked)}")
+
     if circular:
         print("\n  [🚨 CIRCULAR DEPENDENCY ALERT]")
         for path in circular:
@@ -98,6 +207,22 @@ def print_report(graph, circular):
     print(separator + "\n")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UKSFTA Unit Dependency Map")
+    parser.add_argument("path", nargs="?", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="Export the graph as JSON")
+    parser.add_argument("--dot", help="Export the graph as Graphviz DOT")
+    parser.add_argument("--patches", action="store_true", help="Also report the CfgPatches-level build order")
+    args = parser.parse_args()
     g = analyze_dependencies()
     c = find_circular_dependencies(g)
     print_report(g, c)
+    if args.patches:
+        pg = patch_graph(collect_patches(get_projects()))
+        waves, blocked = topological_waves(pg)
+        print(f"  [CfgPatches Build Order] {len(pg)} patches in {len(waves)} waves")
+        for i, wave in enumerate(waves):
+            print(f"    {i + 1}. {', '.join(wave)}")
+        for cycle in find_cycles(pg):
+            print(f"    ❌ {' -> '.join(cycle)}")
+    if args.json: export_graph(g, c, args.json)
+    if args.dot: export_graph(g, c, args.dot)
@@ -9,23 +9,36 @@ from pathlib import Path
 
 HOOK_CONTENT = """#!/usr/bin/env bash
 # UKSFTA Quality Guard (Pre-Commit)
+# Only the staged files (plus configs that #include them) are checked.
+# UKSFTA_HOOK_BUDGET caps each step in seconds (default 60).
+
+BUDGET="${UKSFTA_HOOK_BUDGET:-60}"
+run_step() {
+    if command -v timeout >/dev/null 2>&1; then timeout "$BUDGET" "$@"; else "$@"; fi
+}
 
 echo "🛡️  UKSFTA Quality Guard: Executing pre-commit audit..."
 
-# 1. Run full linting suite
-./tools/workspace_manager.py lint --fix
+# 1. Lint the staged changes
+run_step ./tools/workspace_manager.py lint --changed --fix
 LINT_STATUS=$?
 
-if [ $LINT_STATUS -ne 0 ]; then
+if [ $LINT_STATUS -eq 124 ]; then
+    echo "❌ FAIL: Linting exceeded the ${BUDGET}s budget. Run './tools/workspace_manager.py lint' manually or raise UKSFTA_HOOK_BUDGET."
+    exit 1
+elif [ $LINT_STATUS -ne 0 ]; then
     echo "❌ FAIL: Linting errors detected. Please fix the issues above before committing."
     exit 1
 fi
 
-# 2. Run Master Audit (targeted security & health)
-./tools/workspace_manager.py audit-security
+# 2. Scan the staged changes for leaked secrets
+run_step ./tools/workspace_manager.py audit-security --changed
 SECURITY_STATUS=$?
 
-if [ $SECURITY_STATUS -ne 0 ]; then
+if [ $SECURITY_STATUS -eq 124 ]; then
+    echo "❌ FAIL: Security scan exceeded the ${BUDGET}s budget. Raise UKSFTA_HOOK_BUDGET to allow it to finish."
+    exit 1
+elif [ $SECURITY_STATUS -ne 0 ]; then
     echo "❌ FAIL: Security vulnerabilities detected (leaked tokens/keys). Blocking commit."
     exit 1
 fi
@@ -88,6 +88,8 @@ def generate_config_boilerplate(directory, addon_name, vfs_project):
         elif category == "Uniform":
             v_vehicles.append(f'    class UKSFTA_{vfs_project}_{name}_Soldier: UKSFTA_{vfs_project}_{addon_name}_Uniform_Base {{ scope = 2; displayName = "UKSFTA {addon_name} {name}"; model = "{vfs_path}"; }};')
 
+    weapons_str = "\n".join(v_weapons)
+    vehicles_str = "\n".join(v_vehicles)
     config = f"""class CfgPatches {{
     class UKSFTA_{vfs_project}_{addon_name} {{
         units[] = {{}};
@@ -101,12 +103,12 @@ def generate_config_boilerplate(directory, addon_name, vfs_project):
 class CfgWeapons {{
     class Vest_Camo_Base;
     class H_HelmetB;
-{"\n".join(v_weapons)}
+{weapons_str}
 }};
 
 class CfgVehicles {{
     class B_Soldier_F;
-{"\n".join(v_vehicles)}
+{vehicles_str}
 }};
 """
     (Path(directory) / "config.cpp").write_text(config.strip() + "\n")
@@ -2,50 +2,357 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
+import time
+import heapq
+import random
+import argparse
+import itertools
+import threading
 import requests
 import json
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from cache_utils import atomic_write, cache_path, load_json, save_json
+from tile_dedup import dedupe_tiles
 
-def download_tile(url, dest):
-    """Downloads a single map tile."""
-    if dest.exists(): return
+# UKSFTA Intel Mirror
+# Archives community COP tiles locally. A theatre is crawled as a quadtree: z0 is probed on
+# each source in turn and only the children of tiles that exist are requested, so absent
+# theatres cost one request per source instead of a full z0-z5 grid. Progress is kept in
+# a .mirror.json manifest in the theatre folder, so an interrupted mirror resumes.
+# All theatres of a run share one scheduler with global and per-host connection limits,
+# a bytes/s cap and retries with backoff.
+
+SOURCES = [
+    "https://tiles.plan-ops.fr/tiles/{theatre}",
+    "https://jetelain.github.io/Arma3Map/tiles/{theatre}",
+]
+MANIFEST_FILE = ".mirror.json"
+MANIFEST_VERSION = 1
+PROGRESS_FILE = "intel_mirror.json"
+# A theatre no source had is probed again after this many days
+RECHECK_DAYS = 7
+WORKERS = 20
+PER_HOST = 8
+RETRIES = 4
+# Seconds before the first retry of a failed tile; doubles with every attempt
+BACKOFF = 1.0
+TIMEOUT = 5
+# Seconds between manifest checkpoints during a crawl
+SAVE_INTERVAL = 10
+
+def make_session(per_host=PER_HOST):
+    """One keep-alive session for all downloads, keeping up to 'per_host' connections open to each source."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=len(SOURCES), pool_maxsize=per_host)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_tile(session, url, dest):
+    """
+    Downloads a single map tile. Returns (status, bytes) with status 'ok', 'missing' (the
+    source does not have it) or 'error' (timeouts, server errors: worth asking again later).
+    """
     try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            dest.write_bytes(response.content)
-            return True
-    except: pass
-    return False
-
-def mirror_theatre(theatre_name, web_root, max_zoom=5):
-    """Downloads all tiles for a specific theatre."""
+        response = session.get(url, timeout=TIMEOUT)
+    except requests.RequestException:
+        return "error", 0
+    if response.status_code == 200:
+        atomic_write(dest, response.content)
+        return "ok", len(response.content)
+    if response.status_code in (404, 410): return "missing", 0
+    return "error", 0
+
+class TheatreCrawl:
+    """
+    Quadtree walk of one theatre. Tiles already on disk are not requested again but their
+    children are still visited; tiles the source reported missing are remembered in the
+    manifest and skipped on the next run.
+    """
+
+    def __init__(self, theatre_name, web_root, max_zoom=5, refresh=False):
+        self.name = theatre_name
+        self.local_dir = Path(web_root) / "static" / "theatre" / theatre_name
+        self.max_zoom = max_zoom
+        manifest = {} if refresh else (load_json(self.local_dir / MANIFEST_FILE, {}) or {})
+        if manifest.get("version") != MANIFEST_VERSION: manifest = {}
+        candidates = [s.format(theatre=theatre_name) for s in SOURCES]
+        known = manifest.get("source")
+        self.sources = [known] if known in candidates else candidates
+        self.missing = set(manifest.get("missing", [])) if known in candidates else set()
+        self.finished = bool(manifest.get("complete")) and manifest.get("max_zoom", -1) >= max_zoom
+        self.present = self.downloaded = self.bytes = self.errors = 0
+        # Sources whose z0 probe failed with an error rather than a clean 404
+        self.unreachable = 0
+
+    @property
+    def source(self):
+        return self.sources[0] if self.sources else None
+
+    def url(self, z, x, y):
+        return f"{self.source}/{z}/{x}/{y}.png"
+
+    def dest(self, z, x, y):
+        return self.local_dir / str(z) / str(x) / f"{y}.png"
+
+    def children(self, z, x, y):
+        if z >= self.max_zoom: return []
+        return [(z + 1, 2 * x + dx, 2 * y + dy) for dx in (0, 1) for dy in (0, 1)]
+
+    def expand(self, tiles):
+        """The tiles among 'tiles', and below those already on disk, that have to be downloaded."""
+        todo = []; stack = list(tiles)
+        while stack:
+            z, x, y = stack.pop()
+            if f"{z}/{x}/{y}" in self.missing: continue
+            if self.dest(z, x, y).exists():
+                self.present += 1
+                stack.extend(self.children(z, x, y))
+            else:
+                todo.append((z, x, y))
+        return todo
+
+    def roots(self):
+        return [] if self.finished or not self.sources else self.expand([(0, 0, 0)])
+
+    def result(self, tile, status, size):
+        """Records one download and returns the tiles to request next."""
+        z, x, y = tile
+        if status == "ok":
+            self.present += 1; self.downloaded += 1; self.bytes += size
+            return self.expand(self.children(z, x, y))
+        if z == 0:
+            # This source does not have the theatre (or is down): probe the next one
+            self.sources.pop(0)
+            if status == "error": self.unreachable += 1
+            return [tile] if self.sources else []
+        if status == "missing": self.missing.add(f"{z}/{x}/{y}")
+        else: self.errors += 1
+        return []
+
+    def save(self, complete=False):
+        # Nothing to resume for a theatre no source has; do not leave an empty folder behind
+        if not self.local_dir.exists(): return
+        save_json(self.local_dir / MANIFEST_FILE, {
+            "version": MANIFEST_VERSION, "source": self.source, "max_zoom": self.max_zoom,
+            "complete": complete and not self.errors, "missing": sorted(self.missing),
+        })
+
+def parse_rate(text):
+    """'500K', '20M', '1.5G' or plain bytes per second."""
+    text = str(text).strip().upper().replace("/S", "").rstrip("B")
+    scale = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+class TokenBucket:
+    """Shared bytes/s budget. Each download pays for what it received and sleeps off any overdraft."""
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self.tokens = rate or 0
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, size):
+        if not self.rate or not size: return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate) - size
+            self.last = now
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay: time.sleep(delay)
+
+class MirrorProgress:
+    """
+    Outcome of every theatre across runs (.uksf_cache/intel_mirror.json), keyed by its folder.
+    Theatres no source had are not probed again for RECHECK_DAYS; finished ones are skipped
+    through their own manifest.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path(PROGRESS_FILE)
+        self.entries = load_json(self.path, {}) or {}
+
+    def _key(self, crawl):
+        return str(crawl.local_dir.resolve())
+
+    def unavailable(self, crawl):
+        entry = self.entries.get(self._key(crawl))
+        return bool(entry) and entry["status"] == "unavailable" and time.time() - entry["checked"] < RECHECK_DAYS * 86400
+
+    def record(self, crawl, status):
+        self.entries[self._key(crawl)] = {"status": status, "source": crawl.source, "tiles": crawl.present, "checked": int(time.time())}
+
+    def save(self):
+        save_json(self.path, self.entries)
+
+class MirrorScheduler:
+    """
+    Runs the crawls of many theatres on one worker pool. At most 'workers' downloads run at
+    once and at most 'per_host' against any one source, all under one bytes/s cap. Failed
+    tiles are retried with exponential backoff before they count as errors. Earlier theatres
+    are served first, so theatres complete one after another while the probes for later ones
+    fill idle connections.
+    """
+
+    def __init__(self, workers=WORKERS, per_host=PER_HOST, max_rate=None, retries=RETRIES):
+        self.workers = workers
+        self.per_host = per_host
+        self.retries = retries
+        self.bucket = TokenBucket(max_rate)
+        self.session = make_session(per_host)
+        self.queues = {}        # host -> heap of (rank, seq, crawl, tile, attempt)
+        self.active = {}        # host -> downloads running
+        self.delayed = []       # heap of (ready_at, seq, crawl, tile, attempt) waiting out a backoff
+        self.outstanding = {}   # crawl -> tiles queued, running or delayed
+        self.seq = itertools.count()
+
+    def _fetch(self, url, dest):
+        status, size = fetch_tile(self.session, url, dest)
+        self.bucket.consume(size)
+        return status, size
+
+    def _queue(self, crawl, tiles, attempt=0):
+        host = urlparse(crawl.source).netloc
+        queue = self.queues.setdefault(host, [])
+        for tile in tiles:
+            heapq.heappush(queue, (crawl.rank, next(self.seq), crawl, tile, attempt))
+        self.outstanding[crawl] += len(tiles)
+
+    def _dispatch(self, executor, running):
+        # Round-robin over the hosts so one slow source does not hold the pool
+        progress = True
+        while progress and len(running) < self.workers:
+            progress = False
+            for host, queue in self.queues.items():
+                if not queue or self.active.get(host, 0) >= self.per_host or len(running) >= self.workers: continue
+                _, _, crawl, tile, attempt = heapq.heappop(queue)
+                running[executor.submit(self._fetch, crawl.url(*tile), crawl.dest(*tile))] = (crawl, tile, attempt, host)
+                self.active[host] = self.active.get(host, 0) + 1
+                progress = True
+
+    def run(self, crawls, on_finish, checkpoint=None):
+        """Crawls every theatre. on_finish(crawl) is called as each one completes, checkpoint() periodically."""
+        for rank, crawl in enumerate(crawls):
+            crawl.rank = rank; crawl.started = time.monotonic()
+            roots = crawl.roots()
+            if not roots:
+                # Nothing left to fetch (e.g. already fully on disk): it never becomes outstanding
+                on_finish(crawl); continue
+            self.outstanding[crawl] = 0
+            self._queue(crawl, roots)
+
+        last_save = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+            while running or self.delayed or any(self.queues.values()):
+                now = time.monotonic()
+                while self.delayed and self.delayed[0][0] <= now:
+                    _, _, crawl, tile, attempt = heapq.heappop(self.delayed)
+                    self.outstanding[crawl] -= 1
+                    self._queue(crawl, [tile], attempt)
+                self._dispatch(executor, running)
+                timeout = max(0.0, self.delayed[0][0] - now) if self.delayed else None
+                if not running:
+                    time.sleep(timeout or 0); continue
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for f in done:
+                    crawl, tile, attempt, host = running.pop(f)
+                    self.active[host] -= 1
+                    status, size = f.result()
+                    self.outstanding[crawl] -= 1
+                    if status == "error" and attempt < self.retries:
+                        delay = BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+                        heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.seq), crawl, tile, attempt + 1))
+                        self.outstanding[crawl] += 1
+                    else:
+                        tiles = crawl.result(tile, status, size)
+                        if tiles: self._queue(crawl, tiles)
+                    if not self.outstanding[crawl]:
+                        del self.outstanding[crawl]
+                        on_finish(crawl)
+                if checkpoint and time.monotonic() - last_save > SAVE_INTERVAL:
+                    checkpoint(); last_save = time.monotonic()
+
+    def unfinished(self):
+        return list(self.outstanding)
+
+def report(crawl, elapsed):
+    rate = crawl.downloaded / elapsed if elapsed > 0 else 0.0
+    print(f"  ✅ Source found for {crawl.name}: {crawl.present} tiles ({crawl.downloaded} new, "
+          f"{crawl.bytes / (1024 * 1024):.1f} MB) in {elapsed:.1f}s, {rate:.1f} tiles/s")
+    if crawl.errors:
+        print(f"  ⚠️  {crawl.errors} tiles failed; run again to resume")
+
+def mirror_theatres(theatre_names, web_root, max_zoom=5, refresh=False, workers=WORKERS,
+                    per_host=PER_HOST, max_rate=None, retries=RETRIES, quiet_skips=False):
+    """
+    Mirrors several theatres on one scheduler. Returns {name: status} with status 'done',
+    'partial' (failed tiles or interrupted), 'unavailable' or 'skipped' (finished earlier).
+    """
+    progress = MirrorProgress()
+    results = {}; crawls = []
+    for name in theatre_names:
+        crawl = TheatreCrawl(name, web_root, max_zoom, refresh)
+        if crawl.finished or (not refresh and progress.unavailable(crawl)):
+            results[name] = "skipped"
+            if not quiet_skips:
+                print(f"  ⏭️  {name}: {'already mirrored' if crawl.finished else 'no source had it at the last check'}")
+            continue
+        crawls.append(crawl)
+
+    def finish(crawl):
+        crawl.save(complete=True)
+        if crawl.present:
+            report(crawl, time.monotonic() - crawl.started)
+            if crawl.downloaded: dedupe_tiles(crawl.local_dir)
+            status = "partial" if crawl.errors else "done"
+        elif crawl.errors or crawl.unreachable:
+            # A source that was down may still have it: do not cache this as unavailable
+            print(f"  ⚠️  No source reachable for {crawl.name}; run again to retry")
+            status = "partial"
+        else:
+            print(f"  ❌ No source has {crawl.name}")
+            status = "unavailable"
+        results[crawl.name] = status
+        progress.record(crawl, status)
+
+    def checkpoint():
+        for crawl in scheduler.unfinished(): crawl.save()
+        progress.save()
+        tiles = sum(c.downloaded for c in crawls); size = sum(c.bytes for c in crawls)
+        elapsed = time.monotonic() - start
+        print(f"  📶 {len(results)}/{len(theatre_names)} theatres, {tiles} tiles, "
+              f"{tiles / elapsed:.1f} tiles/s, {size / (1024 * 1024) / elapsed:.2f} MB/s")
+
+    scheduler = MirrorScheduler(workers, per_host, max_rate, retries)
+    start = time.monotonic()
+    try:
+        scheduler.run(crawls, finish, checkpoint)
+    finally:
+        for crawl in scheduler.unfinished():
+            crawl.save()
+            results[crawl.name] = "partial"
+            progress.record(crawl, "partial")
+        progress.save()
+
+    tiles = sum(c.downloaded for c in crawls); size = sum(c.bytes for c in crawls)
+    elapsed = time.monotonic() - start
+    if crawls:
+        print(f"  📦 {tiles} tiles ({size / (1024 * 1024):.1f} MB) in {elapsed:.1f}s, "
+              f"{tiles / elapsed if elapsed > 0 else 0.0:.1f} tiles/s")
+    return results
+
+def mirror_theatre(theatre_name, web_root, max_zoom=5, refresh=False, **limits):
+    """Downloads every tile a source has for a theatre. Returns True if a source has it."""
     print(f"📡 [Intel Mirror] Archiving: {theatre_name}")
-    base_urls = [
-        f"https://tiles.plan-ops.fr/tiles/{theatre_name}",
-        f"https://jetelain.github.io/Arma3Map/tiles/{theatre_name}"
-    ]
-    local_dir = Path(web_root) / "static" / "theatre" / theatre_name
-    
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        for base_url in base_urls:
-            futures = []
-            for z in range(max_zoom + 1):
-                grid_size = 2 ** z
-                for x in range(grid_size):
-                    for y in range(grid_size):
-                        url = f"{base_url}/{z}/{x}/{y}.png"
-                        dest = local_dir / str(z) / str(x) / f"{y}.png"
-                        futures.append(executor.submit(download_tile, url, dest))
-            
-            if any(f.result() for f in futures):
-                print(f"  ✅ Source found for {theatre_name}")
-                return True
-    return False
-
-def mirror_all(web_root):
-    """Iterates through all known maps and archives them."""
+    status = mirror_theatres([theatre_name], web_root, max_zoom, refresh, **limits)[theatre_name]
+    return status != "unavailable"
+
+def mirror_all(web_root, max_zoom=5, refresh=False, **limits):
+    """Archives every map in the registry on one scheduler."""
     registry_path = Path(web_root) / "static" / "community" / "maps" / "all.json"
     if not registry_path.exists():
         print("❌ Error: Map registry (all.json) not found. Run intel_sync first.")
@@ -53,24 +360,39 @@ def mirror_all(web_root):
 
     with open(registry_path, 'r') as f:
         maps = json.load(f)
-    
+
     total = len(maps)
     print(f"🌍 [Mass Archive] Preparing to mirror {total} terrains...")
-    
-    for i, world_name in enumerate(maps.keys()):
-        print(f"[{i+1}/{total}] Processing {world_name}...")
-        mirror_theatre(world_name.lower(), web_root)
+    results = mirror_theatres([name.lower() for name in maps], web_root, max_zoom, refresh, quiet_skips=True, **limits)
+    counts = {}
+    for status in results.values(): counts[status] = counts.get(status, 0) + 1
+    print(f"🌍 [Mass Archive] {counts.get('done', 0)} mirrored, {counts.get('skipped', 0)} skipped, "
+          f"{counts.get('unavailable', 0)} unavailable, {counts.get('partial', 0)} incomplete")
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Intel Mirror")
+    parser.add_argument("theatre", nargs="?", help="Theatre name")
+    parser.add_argument("--all", action="store_true", help="Mirror every map in the registry")
+    parser.add_argument("--max-zoom", type=int, default=5)
+    parser.add_argument("-j", "--workers", type=int, default=WORKERS, help=f"Concurrent downloads in total (default: {WORKERS})")
+    parser.add_argument("--per-host", type=int, default=PER_HOST, help=f"Concurrent downloads per source (default: {PER_HOST})")
+    parser.add_argument("--max-rate", type=parse_rate, help="Bandwidth cap in bytes/s, e.g. 500K or 20M (default: none)")
+    parser.add_argument("--retries", type=int, default=RETRIES, help=f"Attempts per failed tile after the first (default: {RETRIES})")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the resume manifests and probe every source again")
+    args = parser.parse_args()
+    if not args.theatre and not args.all:
+        parser.print_usage()
+        sys.exit(1)
 
-if __name__ == "__main__":
     web_dir = Path("web")
     if not web_dir.exists() and Path("../web").exists():
         web_dir = Path("../web")
 
-    if len(sys.argv) < 2:
-        print("Usage: intel_mirror.py <theatre_name|--all>")
-        sys.exit(1)
-        
-    if sys.argv[1] == "--all":
-        mirror_all(web_dir)
+    limits = {"workers": args.workers, "per_host": args.per_host, "max_rate": args.max_rate, "retries": args.retries}
+    if args.all:
+        mirror_all(web_dir, args.max_zoom, args.refresh, **limits)
     else:
-        mirror_theatre(sys.argv[1], web_dir)
+        mirror_theatre(args.theatre, web_dir, args.max_zoom, args.refresh, **limits)
+
+if __name__ == "__main__":
+    main()
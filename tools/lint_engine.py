@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import hashlib
+import argparse
+import importlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from cache_utils import cache_path, file_signature, load_json, save_json
+from changed_files import add_file_arguments, selected_files
+
+# UKSFTA Lint Engine
+# Runs the Python checkers in-process as plugins. Files are fanned out over a process
+# pool and each file's diagnostics are cached by (content hash, checker version), so a
+# relint only touches files that changed since the last run.
+#
+# A checker module exposes LINT_CHECKER = {"name", "version", "extensions", "roots", "check"}.
+# check(lint_file) returns (line, col, message) tuples; line 0 means the whole file.
+
+ENGINE_VERSION = 1
+CACHE_FILE = "lint_cache.json"
+CHECKER_MODULES = ["sqf_validator", "search_unused_privates", "config_style_checker"]
+SKIP_DIRS = {".git", ".hemttout", ".uksf_tools", ".uksf_cache", "node_modules", "__pycache__"}
+# Below this many stale files a pool costs more than it saves
+POOL_THRESHOLD = 16
+
+class LintFile:
+    """One file as seen by the checkers; the SQF token stream is built once and shared."""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.text = data.decode("utf-8", errors="ignore")
+        self._tokens = None
+
+    @property
+    def sqf_tokens(self):
+        if self._tokens is None:
+            from sqf_lexer import tokenize
+            self._tokens = list(tokenize(self.text))
+        return self._tokens
+
+_checkers = None
+
+def load_checkers():
+    """{name: checker} from every module in CHECKER_MODULES."""
+    global _checkers
+    if _checkers is None:
+        _checkers = {}
+        for module in CHECKER_MODULES:
+            checker = getattr(importlib.import_module(module), "LINT_CHECKER", None)
+            if checker: _checkers[checker["name"]] = checker
+    return _checkers
+
+def _version(checker):
+    return f"{ENGINE_VERSION}.{checker['version']}"
+
+def _selected(path, roots):
+    parts = Path(path).parts
+    return not SKIP_DIRS.intersection(parts) and any(Path(path).is_relative_to(r) for r in roots)
+
+def collect_files(projects, checkers, only=None):
+    """{path: [checker names]} for every file a checker applies to; 'only' limits it to an explicit file list."""
+    files = {}
+    for project in projects:
+        project = Path(project).resolve()
+        for checker in checkers.values():
+            roots = [project / r for r in checker.get("roots", (".",)) if (project / r).is_dir()] or [project]
+            if only is not None:
+                for path in only:
+                    if path.lower().endswith(checker["extensions"]) and _selected(path, roots):
+                        names_for = files.setdefault(path, [])
+                        if checker["name"] not in names_for: names_for.append(checker["name"])
+                continue
+            for root in roots:
+                for dirpath, dirs, names in os.walk(root):
+                    dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                    for n in names:
+                        if n.lower().endswith(checker["extensions"]):
+                            names_for = files.setdefault(os.path.join(dirpath, n), [])
+                            if checker["name"] not in names_for: names_for.append(checker["name"])
+    return files
+
+def _lint_task(task):
+    """Worker: hash the file, reuse results for unchanged content, run the remaining checkers."""
+    path, names, cached_sha, cached_ok = task
+    checkers = load_checkers()
+    sig = file_signature(path)
+    try:
+        with open(path, "rb") as f: data = f.read()
+    except OSError as e:
+        return path, sig, None, {n: [_version(checkers[n]), [(0, 0, f"Failed to read: {e}")]] for n in names}
+    sha = hashlib.sha1(data).hexdigest()
+    todo = [n for n in names if n not in cached_ok] if sha == cached_sha else names
+    results = {}
+    if todo:
+        lint_file = LintFile(path, data)
+        for n in todo:
+            try:
+                diags = [list(d) for d in checkers[n]["check"](lint_file)]
+            except Exception as e:
+                diags = [[0, 0, f"Checker crashed: {e}"]]
+            results[n] = [_version(checkers[n]), diags]
+    return path, sig, sha, results
+
+def run_lint(projects, jobs=None, use_cache=True, quiet=False, only=None):
+    """Lints all projects, or only the listed files inside them. Returns ({path: {checker: diagnostics}}, stats)."""
+    start = time.perf_counter()
+    checkers = load_checkers()
+    if only is not None: only = [str(Path(p).resolve()) for p in only]
+    files = collect_files(projects, checkers, only)
+    cache_file = cache_path(CACHE_FILE)
+    cache = (load_json(cache_file, {}) or {}) if use_cache else {}
+    entries = cache.get("files", {}) if cache.get("version") == ENGINE_VERSION else {}
+
+    tasks = []; fresh = 0
+    for path, names in files.items():
+        entry = entries.get(path)
+        ok = [n for n in names if entry and entry["results"].get(n, [None])[0] == _version(checkers[n])]
+        if entry and entry["sig"] == file_signature(path) and len(ok) == len(names):
+            fresh += 1; continue
+        tasks.append((path, names, entry["sha"] if entry else None, ok))
+
+    if len(tasks) >= POOL_THRESHOLD and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            done = list(pool.map(_lint_task, tasks, chunksize=max(1, len(tasks) // ((jobs or os.cpu_count() or 1) * 4))))
+    else:
+        done = [_lint_task(t) for t in tasks]
+
+    for path, sig, sha, results in done:
+        entry = entries.get(path) if sha and entries.get(path, {}).get("sha") == sha else None
+        merged = dict(entry["results"]) if entry else {}
+        merged.update(results)
+        entries[path] = {"sig": sig, "sha": sha, "results": merged}
+    # Forget files that are gone; keep other projects' entries so per-project runs share one cache
+    for path in [p for p in entries if p not in files and not os.path.exists(p)]: del entries[path]
+    if use_cache and (done or len(entries) != len(cache.get("files", {}))):
+        save_json(cache_file, {"version": ENGINE_VERSION, "files": entries})
+
+    report = {}
+    for path, names in files.items():
+        found = {n: entries[path]["results"][n][1] for n in names if entries[path]["results"].get(n, [None, []])[1]}
+        if found: report[path] = found
+    stats = {"files": len(files), "cached": fresh, "linted": len(tasks), "seconds": time.perf_counter() - start}
+    if not quiet: print_report(report, stats)
+    return report, stats
+
+def print_report(report, stats):
+    errors = 0
+    for path in sorted(report):
+        for name, diags in sorted(report[path].items()):
+            for line, col, message in sorted(diags, key=lambda d: (d[0], d[1])):
+                rel = os.path.relpath(path)
+                loc = f"{rel}:{line}:{col}" if line else rel
+                print(f"ERROR: {loc}: [{name}] {message}")
+                errors += 1
+    print(f"------\nChecked {stats['files']} files ({stats['linted']} linted, {stats['cached']} cached) in {stats['seconds']:.2f}s")
+    print(f"Errors detected: {errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Lint Engine")
+    parser.add_argument("paths", nargs="*", default=["."], help="Project folders to lint")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the result cache")
+    add_file_arguments(parser)
+    args = parser.parse_args()
+    only = selected_files(args, tuple(e for c in load_checkers().values() for e in c["extensions"]))
+    report, _ = run_lint(args.paths, args.jobs, use_cache=not args.no_cache, only=only)
+    sys.exit(1 if report else 0)
+
+if __name__ == "__main__":
+    main()
@@ -2,68 +2,23 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
-import math
-from PIL import Image
+from tile_pyramid import build_from_image
 
-def generate_tiles(image_path, output_dir, tile_size=256, max_zoom=5):
+def generate_tiles(image_path, output_dir, tile_size=256, max_zoom=5, jobs=None, dedupe="link"):
     """
     Slices a large Arma 3 map export into a web-standard tile structure.
     Output: {output_dir}/{z}/{x}/{y}.png
+    The original is treated as the MAX zoom; each lower zoom halves the one above.
+    The image is streamed in strips, so memory stays bounded for 30k satmaps.
+    Identical tiles are stored once (dedupe="link" hardlinks, "manifest" writes manifest.json).
     """
     print(f"🗺️  [Map Tiler] Processing: {image_path}")
-    
-    img = Image.open(image_path)
-    width, height = img.size
-    
-    # Square the image to the nearest power of 2 for optimal tiling if needed
-    # But for Arma Simple CRS, we can just slice the original
-    
-    for zoom in range(max_zoom + 1):
-        # Scale factor for this zoom level
-        # Zoom 0 is 1:1, higher zoom is smaller? 
-        # Actually for Leaflet Simple, we usually zoom OUT from the original.
-        # We'll treat the original as the MAX zoom.
-        
-        current_zoom = max_zoom - zoom
-        scale = 1.0 / (2 ** zoom)
-        
-        z_dir = os.path.join(output_dir, str(current_zoom))
-        os.makedirs(z_dir, exist_ok=True)
-        
-        z_width = int(width * scale)
-        z_height = int(height * scale)
-        
-        print(f"  └─ Zoom {current_zoom}: Scaling to {z_width}x{z_height}...")
-        z_img = img.resize((z_width, z_height), Image.LANCZOS)
-        
-        cols = math.ceil(z_width / tile_size)
-        rows = math.ceil(z_height / tile_size)
-        
-        for x in range(cols):
-            x_dir = os.path.join(z_dir, str(x))
-            os.makedirs(x_dir, exist_ok=True)
-            
-            for y in range(rows):
-                left = x * tile_size
-                top = y * tile_size
-                right = min(left + tile_size, z_width)
-                bottom = min(top + tile_size, z_height)
-                
-                tile = z_img.crop((left, top, right, bottom))
-                
-                # Create background if tile is smaller than tile_size
-                if tile.size != (tile_size, tile_size):
-                    bg = Image.new('RGBA', (tile_size, tile_size), (0, 0, 0, 0))
-                    bg.paste(tile, (0, 0))
-                    tile = bg
-                
-                tile.save(os.path.join(x_dir, f"{y}.png"))
-                
-    print(f"✅ Tiling complete. Output saved to: {output_dir}")
+    count = build_from_image(image_path, output_dir, tile_size, max_zoom, jobs, dedupe)
+    print(f"✅ Tiling complete. {count} tiles saved to: {output_dir}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print("Usage: map_tiler.py <input_image> <output_dir>")
+        print("Usage: map_tiler.py <input_image> <output_dir> [jobs]")
         sys.exit(1)
-        
-    generate_tiles(sys.argv[1], sys.argv[2])
+
+    generate_tiles(sys.argv[1], sys.argv[2], jobs=int(sys.argv[3]) if len(sys.argv) > 3 else None)
@@ -2,82 +2,76 @@
 import os
 import sys
 import re
-import subprocess
-import shutil
-from pathlib import Path
-
-def get_mission_addons(pbo_path, temp_dir):
-    """Extract and parse mission.sqm for required addons."""
-    pbo_path = os.path.abspath(pbo_path)
-    temp_dir = os.path.abspath(temp_dir)
-    
-    # Clean temp dir
-    if os.path.exists(temp_dir):
-        shutil.rmtree(temp_dir)
-    os.makedirs(temp_dir)
+import glob
+import json
+import struct
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pbo_reader import PboReader, PboError
+from rap_reader import is_rapified, read_arrays, RapError
 
-    # 1. Extract mission.sqm using Mikero's -F flag
-    # Note: ExtractPBO on Linux/Wine often expects absolute paths
-    try:
-        # We try to extract mission.sqm specifically
-        subprocess.run(["extractpbo", "-P", f"-F=mission.sqm", pbo_path, temp_dir], check=True, stdout=subprocess.DEVNULL)
-    except subprocess.CalledProcessError:
-        # Try case-sensitive alternative just in case
-        try:
-            subprocess.run(["extractpbo", "-P", f"-F=Mission.sqm", pbo_path, temp_dir], check=True, stdout=subprocess.DEVNULL)
-        except:
-            return None
-
-    # Find the extracted file (might be nested)
-    sqm_path = None
-    for root, _, files in os.walk(temp_dir):
-        for f in files:
-            if f.lower() == "mission.sqm":
-                sqm_path = Path(root) / f
-                break
-    
-    if not sqm_path or not sqm_path.exists():
-        return None
+MISSION_ARRAYS = ("addons", "addonsAuto")
+READ_ERRORS = (OSError, PboError, RapError, IndexError, ValueError, struct.error)
+# Build output and addon sources hold addon PBOs, not missions
+SKIP_DIRS = {".git", ".hemtt", ".hemttout", ".uksf_cache", "addons", "node_modules"}
 
-    # 2. Derap if binary
-    try:
-        subprocess.run(["derap", str(sqm_path)], check=True, stdout=subprocess.DEVNULL)
-    except:
-        pass 
-
-    # 3. Parse Addons
-    content = sqm_path.read_text(errors='ignore')
+def mission_addons_from_sqm(data):
+    """Required addons of a mission.sqm given as bytes, binarized (raP) or plain text."""
+    if is_rapified(data):
+        return set(v for values in read_arrays(data, MISSION_ARRAYS).values() for v in values if isinstance(v, str) and v)
+    content = data.decode("utf-8", errors="ignore")
     addons = set()
-    
     # Match addons[]={...}; and addonsAuto[]={...};
     matches = re.finditer(r'addons(?:Auto)?\[\]\s*=\s*\{([^}]*)\}', content, re.MULTILINE | re.DOTALL)
     for m in matches:
         items = [i.strip().replace('"', '').replace("'", "") for i in m.group(1).split(',')]
         for i in items:
             if i: addons.add(i)
-            
-    return sorted(list(addons))
+    return addons
 
-def audit_mission(pbo_path, local_patches):
-    print(f"🔮 Auditing Mission: {os.path.basename(pbo_path)}")
-    
-    temp_dir = "/tmp/uksfta_audit"
-    required = get_mission_addons(pbo_path, temp_dir)
-    
-    if required is None:
-        print("  ❌ Error: Could not extract or parse mission.sqm. Verify extractpbo is installed and path is valid.")
+def read_mission_sqm(pbo_path):
+    """Raw mission.sqm bytes from a PBO, or None when it holds no mission (e.g. an addon PBO). Raises on unreadable PBOs."""
+    with PboReader(pbo_path) as pbo:
+        # The root mission.sqm wins over any nested copy
+        entries = sorted((e for e in pbo.entries if e.name.replace("/", "\\").split("\\")[-1].lower() == "mission.sqm"),
+                         key=lambda e: e.name.count("\\"))
+        if not entries: return None
+        return pbo.read(entries[0])
+
+def get_mission_addons(pbo_path):
+    """Reads mission.sqm straight out of the PBO and returns its required addons (None on failure)."""
+    try:
+        data = read_mission_sqm(pbo_path)
+        if data is None: return None
+        return sorted(mission_addons_from_sqm(data))
+    except READ_ERRORS:
         return None
 
-    known_externals = ["A3_", "cba_", "ace_", "task_force_radio", "acre_", "rhsusf_", "rhs_", "cup_", "uk3cb_"]
-    
+KNOWN_EXTERNALS = ["A3_", "cba_", "ace_", "task_force_radio", "acre_", "rhsusf_", "rhs_", "cup_", "uk3cb_"]
+# Base game and CDLC patches are not part of any indexed PBO folder (CDLC ships encrypted)
+BASE_GAME_PREFIXES = ["A3_", "3DEN", "Core", "CuratorOnly_", "Map_VR",
+                      "gm_", "vn_", "loadorder_f_vietnam", "csla_", "spe_", "ef_", "rf_"]
+BASE_GAME_SUFFIXES = ["_lxWS"]
+
+def classify_requirements(required, local_patches, external_patches=None):
+    """
+    Splits required addons into local / external / missing. With an 'external_patches'
+    set (lowercase names from the CfgPatches index) externals are resolved exactly;
+    without one, the KNOWN_EXTERNALS prefixes are assumed to be available. Base game and
+    CDLC patches always resolve by name.
+    """
+    local = {p.lower() for p in local_patches}
+    prefixes = tuple(p.lower() for p in BASE_GAME_PREFIXES + ([] if external_patches else KNOWN_EXTERNALS))
+    suffixes = tuple(s.lower() for s in BASE_GAME_SUFFIXES)
     missing = []
     resolved_local = []
     resolved_external = []
 
     for req in required:
-        if req in local_patches:
+        low = req.lower()
+        if low in local:
             resolved_local.append(req)
-        elif any(req.lower().startswith(ext.lower()) for ext in known_externals):
+        elif (external_patches and low in external_patches) or low.startswith(prefixes) or low.endswith(suffixes):
             resolved_external.append(req)
         else:
             missing.append(req)
@@ -89,5 +83,125 @@ def audit_mission(pbo_path, local_patches):
         "missing": missing
     }
 
+def audit_mission(pbo_path, local_patches, external_patches=None):
+    print(f"🔮 Auditing Mission: {os.path.basename(pbo_path)}")
+    
+    required = get_mission_addons(pbo_path)
+    
+    if required is None:
+        print("  ❌ Error: Could not read mission.sqm from the PBO. Verify the path points to a valid mission PBO.")
+        return None
+
+    return classify_requirements(required, local_patches, external_patches)
+
+# --- BATCH AUDIT ---
+_worker_patches = None
+
+def _init_worker(local_patches, external_patches=None):
+    global _worker_patches
+    _worker_patches = (local_patches, external_patches)
+
+def _audit_one(pbo_path):
+    """Worker task: reads everything from the PBO in memory, so tasks share no scratch space."""
+    try:
+        data = read_mission_sqm(pbo_path)
+        if data is None: return {"mission": pbo_path, "skipped": "No mission.sqm (not a mission PBO)"}
+        required = sorted(mission_addons_from_sqm(data))
+    except READ_ERRORS:
+        return {"mission": pbo_path, "error": "Could not read mission.sqm"}
+    result = classify_requirements(required, *_worker_patches)
+    result["mission"] = pbo_path
+    return result
+
+def expand_targets(targets):
+    """Mission PBOs from files, directories (recursive, without build and addon folders) and glob patterns."""
+    found = []
+    for t in targets:
+        if os.path.isdir(t):
+            for root, dirs, files in os.walk(t):
+                dirs[:] = [d for d in dirs if d.lower() not in SKIP_DIRS]
+                found.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pbo"))
+        elif os.path.isfile(t):
+            found.append(t)
+        else:
+            found.extend(p for p in glob.glob(t, recursive=True) if p.lower().endswith(".pbo"))
+    return sorted(set(os.path.abspath(p) for p in found))
+
+def audit_missions(pbo_paths, local_patches, jobs=None, external_patches=None):
+    """Audits many missions across a process pool. Returns results in input order."""
+    local_patches = frozenset(local_patches)
+    external_patches = frozenset(external_patches) if external_patches else None
+    if len(pbo_paths) < 2 or jobs == 1:
+        _init_worker(local_patches, external_patches)
+        return [_audit_one(p) for p in pbo_paths]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(local_patches, external_patches)) as pool:
+        return list(pool.map(_audit_one, pbo_paths, chunksize=max(1, len(pbo_paths) // 32)))
+
+def workspace_patches():
+    """CfgPatches classes defined by the unit's own projects."""
+    from dependency_graph import get_projects, collect_patches
+    return {info["name"] for info in collect_patches(get_projects()).values()}
+
+def resolve_patches(use_index=True):
+    """(local, external) patch name sets: workspace sources plus the cached PBO index."""
+    local = workspace_patches()
+    if not use_index: return local, None
+    from patch_index import load_index
+    index = load_index()
+    return local | index.names("workspace"), index.names("workshop")
+
+def aggregate(results):
+    """{missing addon: [missions requiring it]} across all audited missions."""
+    missing = {}
+    for r in results:
+        for addon in r.get("missing", []):
+            missing.setdefault(addon, []).append(os.path.basename(r["mission"]))
+    return dict(sorted(missing.items(), key=lambda kv: (-len(kv[1]), kv[0].lower())))
+
+def print_report(results, skipped=0):
+    print("\n🔮 UKSFTA Mission Audit")
+    print(" ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    for r in results:
+        name = os.path.basename(r["mission"])
+        if "error" in r:
+            print(f"  ❌ {name:<40} {r['error']}")
+        elif r["missing"]:
+            print(f"  ⚠️  {name:<40} {len(r['required'])} required, {len(r['missing'])} missing")
+        else:
+            print(f"  ✅ {name:<40} {len(r['required'])} required, all resolved")
+    missing = aggregate(results)
+    if missing:
+        print("\n  [Missing Addons]")
+        for addon, missions in missing.items():
+            print(f"    {addon:<32} {len(missions):>3} mission(s): {', '.join(missions)}")
+    errors = sum(1 for r in results if "error" in r)
+    print(f"\n  {len(results)} mission(s), {len(missing)} missing addon(s), {errors} unreadable"
+          f"{f', {skipped} PBO(s) without a mission skipped' if skipped else ''}.")
+    print(" ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Mission Auditor")
+    parser.add_argument("targets", nargs="*", default=["."], help="Mission PBOs, folders or glob patterns")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", help="Write the aggregated report as JSON")
+    parser.add_argument("--no-index", action="store_true", help="Skip the CfgPatches index and assume known external prefixes")
+    args = parser.parse_args()
+
+    missions = expand_targets(args.targets)
+    if not missions:
+        print("❌ No mission PBOs found."); sys.exit(1)
+    local, external = resolve_patches(not args.no_index)
+    results = audit_missions(missions, local, args.jobs, external)
+    # PBOs without a mission.sqm (addons) are not failures, just not ours to audit
+    skipped = sum(1 for r in results if "skipped" in r)
+    results = [r for r in results if "skipped" not in r]
+    if not results:
+        print(f"ℹ️  None of the {skipped} PBO(s) found is a mission."); sys.exit(0)
+    print_report(results, skipped)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"missions": results, "missing": aggregate(results)}, f, indent=2)
+    if any("error" in r or r["missing"] for r in results): sys.exit(1)
+
 if __name__ == "__main__":
-    pass
+    main()
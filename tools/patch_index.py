@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import struct
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from cache_utils import cache_path, file_signature, load_json, save_json
+from pbo_reader import PboReader, PboError
+from rap_reader import RapReader, RapError, is_rapified
+
+# UKSFTA CfgPatches Index
+# Maps every CfgPatches class found in the workspace build output (.hemttout) and the
+# Steam workshop cache to the PBO that defines it. config.bin entries are read directly
+# from the PBOs; a PBO is only re-read when its size or mtime changes.
+
+INDEX_VERSION = 1
+INDEX_FILE = "patch_index.json"
+STEAMAPP_ID = "107410"
+WORKSPACE_ROOT = Path(__file__).parent.parent.parent.resolve()
+# HEMTT output folders holding built PBOs, newest kind of build first
+BUILD_OUTPUTS = ("release", "build", "dev")
+
+def workshop_candidates():
+    home = os.path.expanduser("~")
+    env = os.environ.get("UKSFTA_WORKSHOP_PATH")
+    return ([env] if env else []) + [
+        os.path.join(home, ".steam/steam/steamapps/workshop/content", STEAMAPP_ID),
+        os.path.join(home, "Steam/steamapps/workshop/content", STEAMAPP_ID),
+        os.path.join(home, ".local/share/Steam/steamapps/workshop/content", STEAMAPP_ID),
+        os.path.join("/ext/SteamLibrary/steamapps/workshop/content", STEAMAPP_ID),
+        os.path.join(home, ".steam/steamcmd/steamapps/workshop/content", STEAMAPP_ID),
+    ]
+
+def find_workshop_path():
+    for p in workshop_candidates():
+        if os.path.isdir(p): return p
+    return None
+
+def workspace_build_dirs():
+    """Built addons/ folders of every UKSFTA project; unbuilt sources are covered by dependency_graph."""
+    if not WORKSPACE_ROOT.exists(): return []
+    return sorted(str(d / ".hemttout" / out / "addons") for d in WORKSPACE_ROOT.iterdir()
+                  if d.is_dir() and d.name.startswith("UKSFTA-")
+                  for out in BUILD_OUTPUTS if (d / ".hemttout" / out / "addons").is_dir())
+
+def _config_patches(data):
+    if is_rapified(data):
+        reader = RapReader(data)
+        offset = reader.find("CfgPatches")
+        if offset is None: return []
+        return [n for kind, n, _ in reader.entries(offset, arrays=()) if kind == "class"]
+    from config_parser import parse
+    patches = parse(data.decode("utf-8", errors="ignore")).find("CfgPatches")
+    return [c.name for c in patches.classes.values() if not c.extern] if patches else []
+
+def read_pbo_patches(pbo_path):
+    """CfgPatches class names defined by a PBO's config.bin/config.cpp entries. None if unreadable."""
+    try:
+        with PboReader(pbo_path) as pbo:
+            patches = []
+            for entry in pbo.entries:
+                base = entry.name.replace("/", "\\").split("\\")[-1].lower()
+                if base in ("config.bin", "config.cpp"):
+                    patches.extend(_config_patches(pbo.read(entry)))
+            return patches
+    except (OSError, PboError, RapError, IndexError, ValueError, struct.error):
+        return None
+
+def _scan_task(pbo_path):
+    return pbo_path, read_pbo_patches(pbo_path)
+
+class PatchIndex:
+    """
+    Persistent {pbo path: signature + patches} store with an in-memory
+    {lowercase patch name: pbo path} lookup.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else cache_path(INDEX_FILE)
+        data = load_json(self.path, {}) or {}
+        self.pbos = data.get("pbos", {}) if data.get("version") == INDEX_VERSION else {}
+        self.dirty = False
+        self._lookup = None
+
+    def update(self, roots, jobs=None):
+        """Rescans the given folders, re-reading only new or changed PBOs. Returns (read, total)."""
+        current = {}
+        for source, root in roots:
+            for dirpath, _, files in os.walk(root):
+                for f in files:
+                    if f.lower().endswith(".pbo"):
+                        current[os.path.join(dirpath, f)] = source
+        stale = []
+        for pbo, source in current.items():
+            entry = self.pbos.get(pbo)
+            if not entry or entry["sig"] != file_signature(pbo) or entry.get("source") != source:
+                stale.append(pbo)
+        removed = [p for p in self.pbos if p not in current]
+        for p in removed: del self.pbos[p]
+
+        if len(stale) > 1 and jobs != 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_scan_task, stale, chunksize=max(1, len(stale) // 64)))
+        else:
+            results = [_scan_task(p) for p in stale]
+        for pbo, patches in results:
+            self.pbos[pbo] = {"sig": file_signature(pbo), "source": current[pbo], "patches": patches or [], "error": patches is None}
+        if stale or removed:
+            self.dirty = True; self._lookup = None
+        return len(stale), len(current)
+
+    def save(self):
+        if self.dirty:
+            save_json(self.path, {"version": INDEX_VERSION, "pbos": self.pbos})
+            self.dirty = False
+
+    @property
+    def lookup(self):
+        if self._lookup is None:
+            self._lookup = {}
+            for pbo, entry in self.pbos.items():
+                for name in entry["patches"]:
+                    self._lookup.setdefault(name.lower(), pbo)
+        return self._lookup
+
+    def find(self, patch_name):
+        """PBO defining a CfgPatches class (case-insensitive), or None."""
+        return self.lookup.get(patch_name.lower())
+
+    def names(self, source_prefix=""):
+        """Lowercase patch names, optionally limited to one source ('workspace', 'workshop')."""
+        return {n.lower() for e in self.pbos.values() if e["source"].startswith(source_prefix) for n in e["patches"]}
+
+def load_index(workshop=True, jobs=None, quiet=False):
+    """Returns an up-to-date index over the workspace build output and (optionally) the workshop cache."""
+    roots = [("workspace", d) for d in workspace_build_dirs()]
+    ws = find_workshop_path() if workshop else None
+    if ws: roots.append(("workshop", ws))
+    index = PatchIndex()
+    read, total = index.update(roots, jobs)
+    index.save()
+    if not quiet:
+        print(f"📇 CfgPatches index: {len(index.lookup)} patches from {total} PBOs ({read} re-read).")
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA CfgPatches Index")
+    parser.add_argument("names", nargs="*", help="Patch names to look up")
+    parser.add_argument("--no-workshop", action="store_true", help="Only index the workspace build output")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes for changed PBOs")
+    args = parser.parse_args()
+
+    index = load_index(workshop=not args.no_workshop, jobs=args.jobs)
+    errors = [p for p, e in index.pbos.items() if e.get("error")]
+    if errors: print(f"  ⚠️  {len(errors)} PBO(s) could not be read.")
+    missing = 0
+    for name in args.names:
+        pbo = index.find(name)
+        if pbo: print(f"  ✅ {name:<32} {pbo}")
+        else: print(f"  ❌ {name:<32} not found"); missing += 1
+    if missing: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
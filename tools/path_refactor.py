@@ -3,60 +3,109 @@
 import os
 import sys
 import re
+import mmap
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from cache_utils import atomic_write, atomic_writer
 
-def refactor_paths(project_path, old_tag, new_prefix):
+# Target all relevant file types, especially P3D and RVMAT
+EXTS = {".cpp", ".hpp", ".sqf", ".rvmat", ".ext", ".cfg", ".p3d", ".wrp"}
+# Files at least this big are memory-mapped and streamed instead of read whole
+MMAP_THRESHOLD = 4 * 1024 * 1024
+# Below this many candidate files a pool costs more than it saves
+POOL_THRESHOLD = 16
+
+def compile_tag(old_tag):
+    """Case-insensitive literal byte pattern for the tag, so every casing of an old path is caught."""
+    return re.compile(re.escape(old_tag.encode("utf-8")), re.IGNORECASE)
+
+def _stream_replace(path, data, pattern, replacement):
+    """Writes 'data' with every match replaced, piece by piece, over 'path'. Returns the match count."""
+    count = 0; last = 0
+    with atomic_writer(path) as out:
+        for m in pattern.finditer(data):
+            out.write(data[last:m.start()]); out.write(replacement)
+            last = m.end(); count += 1
+        out.write(data[last:])
+    return count
+
+def refactor_file(path, old_tag, new_prefix, dry_run=False):
+    """Returns (path, matches, error). In dry-run mode the file is only counted."""
+    pattern = compile_tag(old_tag)
+    replacement = new_prefix.encode("utf-8")
+    try:
+        size = os.path.getsize(path)
+        if size == 0: return path, 0, None
+        with open(path, "rb") as f:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    # Most big binaries do not contain the tag at all; bail out on the first search
+                    if not pattern.search(data): return path, 0, None
+                    if dry_run: return path, sum(1 for _ in pattern.finditer(data)), None
+                    return path, _stream_replace(path, data, pattern, replacement), None
+            data = f.read()
+        if dry_run: return path, sum(1 for _ in pattern.finditer(data)), None
+        # A function replacement keeps backslashes in the new prefix literal
+        new_data, count = pattern.subn(lambda m: replacement, data)
+        if count: atomic_write(path, new_data)
+        return path, count, None
+    except (OSError, ValueError) as e:
+        return path, 0, str(e)
+
+def _refactor_task(task):
+    return refactor_file(*task)
+
+def collect_files(project_path):
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in (".git", ".hemttout")]
+        for f in files:
+            if os.path.splitext(f)[1].lower() in EXTS:
+                yield os.path.join(root, f)
+
+def refactor_paths(project_path, old_tag, new_prefix, dry_run=False, jobs=None):
     r"""
     Deep byte-level refactor of paths in binary and text files.
-    Accounts for various case variations and ensures VFS standard compliance.
+    Matches the old tag in any casing and ensures VFS standard compliance.
+    Returns {path: matches} for the files that contain the tag.
     """
     project_path = Path(project_path)
-    print(f"\n[*] Global Deep Refactor: {project_path.name}")
+    print(f"\n[*] Global Deep Refactor: {project_path.resolve().name}{' (dry run)' if dry_run else ''}")
     print(f"[*] Targeting: {old_tag} -> {new_prefix}")
     print(" ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
 
-    # Target all relevant file types, especially P3D and RVMAT
-    exts = {".cpp", ".hpp", ".sqf", ".rvmat", ".ext", ".cfg", ".p3d", ".wrp"}
-    count = 0
-    
-    # Generate common variations of the search tag to handle inconsistent casing in old files
-    variations = [
-        old_tag,
-        old_tag.lower(),
-        old_tag.upper(),
-        old_tag.capitalize()
-    ]
-    # Deduplicate variations
-    search_bytes = [v.encode('utf-8') for v in sorted(list(set(variations)))]
-    replace_byte = new_prefix.encode('utf-8')
-
-    for root, _, files in os.walk(project_path):
-        if ".git" in root or ".hemttout" in root: continue
-        for f in files:
-            path = Path(root) / f
-            if path.suffix.lower() in exts:
-                try:
-                    with open(path, 'rb') as f_in:
-                        content = f_in.read()
-                    
-                    original_content = content
-                    for s_byte in search_bytes:
-                        if s_byte in content:
-                            content = content.replace(s_byte, replace_byte)
-                    
-                    if content != original_content:
-                        with open(path, 'wb') as f_out:
-                            f_out.write(content)
-                        print(f"  ✅ Refactored: {path.relative_to(project_path)}")
-                        count += 1
-                except Exception as e:
-                    print(f"  ❌ Error processing {f}: {e}")
-
-    print(f"\n✨ Deep Refactor complete. Updated {count} files.")
+    tasks = [(p, old_tag, new_prefix, dry_run) for p in collect_files(project_path)]
+    if len(tasks) >= POOL_THRESHOLD and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_refactor_task, tasks, chunksize=max(1, len(tasks) // ((jobs or os.cpu_count() or 1) * 4))))
+    else:
+        results = [_refactor_task(t) for t in tasks]
+
+    changed = {}
+    for path, count, error in results:
+        rel = os.path.relpath(path, project_path)
+        if error:
+            print(f"  ❌ Error processing {rel}: {error}")
+        elif count:
+            changed[path] = count
+            print(f"  {'🔎 Would refactor' if dry_run else '✅ Refactored'}: {rel} ({count} match{'es' if count != 1 else ''})")
+
+    total = sum(changed.values())
+    if dry_run:
+        print(f"\n✨ Dry run complete. {total} matches in {len(changed)} of {len(tasks)} files.")
+    else:
+        print(f"\n✨ Deep Refactor complete. Updated {len(changed)} files ({total} references).")
+    return changed
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Deep Path Refactor")
+    parser.add_argument("project_path")
+    parser.add_argument("old_string")
+    parser.add_argument("new_string")
+    parser.add_argument("--dry-run", action="store_true", help="Only report match counts per file")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+    refactor_paths(args.project_path, args.old_string, args.new_string, args.dry_run, args.jobs)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print("Usage: path_refactor.py <project_path> <old_string> <new_string>")
-        sys.exit(1)
-    
-    refactor_paths(sys.argv[1], sys.argv[2], sys.argv[3])
+    main()
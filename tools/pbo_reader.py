@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import io
+import sys
+import struct
+
+# UKSFTA PBO Reader
+# Reads the PBO header table and individual entries without extracting the archive.
+# Only the requested entry is read from disk; LZSS-packed entries ('Cprs') are unpacked in memory.
+
+MIME_VERS = 0x56657273
+MIME_CPRS = 0x43707273
+_HEADER = struct.Struct("<5I")
+
+class PboError(Exception):
+    pass
+
+class PboEntry:
+    __slots__ = ("name", "packing", "original_size", "timestamp", "size", "offset")
+
+    def __init__(self, name, packing, original_size, timestamp, size, offset=0):
+        self.name = name
+        self.packing = packing
+        self.original_size = original_size
+        self.timestamp = timestamp
+        self.size = size
+        self.offset = offset
+
+    def __repr__(self):
+        return f"<PboEntry {self.name} {self.size}b>"
+
+def _read_asciiz(f):
+    buf = bytearray()
+    while True:
+        c = f.read(1)
+        if not c: raise PboError("Unexpected end of PBO header")
+        if c == b"\0": return buf.decode("utf-8", errors="replace")
+        buf += c
+
+def lzss_decompress(data, out_size):
+    """Arma LZSS: flag byte per 8 items; set bit = literal, clear bit = 12-bit back reference + 4-bit length."""
+    out = bytearray(); i = 0; n = len(data)
+    while len(out) < out_size and i < n:
+        flags = data[i]; i += 1
+        for bit in range(8):
+            if len(out) >= out_size or i >= n: break
+            if flags & (1 << bit):
+                out.append(data[i]); i += 1
+                continue
+            if i + 1 >= n: break
+            b1, b2 = data[i], data[i + 1]; i += 2
+            pos = len(out) - (b1 | ((b2 & 0xF0) << 4))
+            for _ in range((b2 & 0x0F) + 3):
+                # References before the start of the output expand to spaces
+                out.append(out[pos] if pos >= 0 else 0x20); pos += 1
+    return bytes(out[:out_size])
+
+class PboReader:
+    """
+    Random access to PBO entries. 'source' is a path or the PBO bytes.
+    Use as a context manager when reading from a path.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._f = io.BytesIO(source)
+        else:
+            self._f = open(source, "rb")
+        self.properties = {}
+        self.entries = []
+        try:
+            self._read_headers()
+        except (PboError, struct.error) as e:
+            self.close()
+            raise PboError(f"Invalid PBO: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._f.close()
+
+    def _read_headers(self):
+        f = self._f
+        while True:
+            name = _read_asciiz(f)
+            raw = f.read(_HEADER.size)
+            if len(raw) < _HEADER.size: raise PboError("Truncated header")
+            packing, original, _, timestamp, size = _HEADER.unpack(raw)
+            if not name:
+                if packing == MIME_VERS:
+                    # Header extension: key/value pairs up to an empty key
+                    while True:
+                        key = _read_asciiz(f)
+                        if not key: break
+                        self.properties[key] = _read_asciiz(f)
+                    continue
+                break
+            self.entries.append(PboEntry(name, packing, original, timestamp, size))
+        offset = f.tell()
+        for e in self.entries:
+            e.offset = offset
+            offset += e.size
+
+    def find(self, name):
+        """Case-insensitive lookup by path inside the PBO ('mission.sqm', 'addons\\x\\config.bin')."""
+        want = name.replace("/", "\\").lower()
+        for e in self.entries:
+            if e.name.lower() == want: return e
+        return None
+
+    def read(self, entry):
+        if isinstance(entry, str):
+            found = self.find(entry)
+            if found is None: raise PboError(f"No entry named {entry}")
+            entry = found
+        self._f.seek(entry.offset)
+        data = self._f.read(entry.size)
+        if len(data) < entry.size: raise PboError(f"Truncated data for {entry.name}")
+        if entry.packing == MIME_CPRS and entry.original_size:
+            return lzss_decompress(data, entry.original_size)
+        return data
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: pbo_reader.py <file.pbo>")
+        sys.exit(1)
+    with PboReader(sys.argv[1]) as pbo:
+        for k, v in pbo.properties.items(): print(f"{k} = {v}")
+        for e in pbo.entries: print(f"{e.size:>10}  {e.name}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import sys
+import struct
+from config_parser import ConfigClass, ConfigArray
+
+# UKSFTA raP Reader
+# Walks rapified (binarized) configs - config.bin, binarized mission.sqm - straight from bytes.
+# Class bodies are reached through their stored offsets, so a lookup such as
+# find("CfgPatches") or the addons[] arrays of a mission only touch the entries on the way.
+
+RAP_MAGIC = b"\0raP"
+_INT = struct.Struct("<i")
+_UINT = struct.Struct("<I")
+_FLOAT = struct.Struct("<f")
+_INT64 = struct.Struct("<q")
+
+class RapError(Exception):
+    pass
+
+def is_rapified(data):
+    return data[:4] == RAP_MAGIC
+
+class RapReader:
+    """Lazy reader over raP bytes. Class bodies are addressed by offset; the root body sits at 16."""
+
+    ROOT = 16
+
+    def __init__(self, data):
+        if not is_rapified(data): raise RapError("Not a rapified config")
+        self.data = data
+
+    # --- primitives ---
+    def _asciiz(self, pos):
+        end = self.data.index(b"\0", pos)
+        return bytes(self.data[pos:end]).decode("utf-8", errors="replace"), end + 1
+
+    def _compressed_int(self, pos):
+        value = 0; shift = 0
+        while True:
+            b = self.data[pos]; pos += 1
+            value |= (b & 0x7F) << shift
+            if not b & 0x80: return value, pos
+            shift += 7
+
+    def _scalar(self, kind, pos):
+        if kind == 0 or kind == 4: return self._asciiz(pos)
+        if kind == 1: return float(f"{_FLOAT.unpack_from(self.data, pos)[0]:.7g}"), pos + 4
+        if kind == 2: return _INT.unpack_from(self.data, pos)[0], pos + 4
+        if kind == 6: return _INT64.unpack_from(self.data, pos)[0], pos + 8
+        raise RapError(f"Unknown value type {kind} at {pos}")
+
+    def _array(self, pos, decode=True):
+        count, pos = self._compressed_int(pos)
+        items = [] if decode else None
+        for _ in range(count):
+            kind = self.data[pos]; pos += 1
+            if kind == 3:
+                value, pos = self._array(pos, decode)
+                if decode: items.append(ConfigArray(value))
+            else:
+                value, pos = self._scalar(kind, pos)
+                if decode: items.append(value)
+        return items, pos
+
+    # --- structure ---
+    def entries(self, offset=ROOT, arrays=None):
+        """
+        Yields (kind, name, payload) for one class body:
+        ('class', name, body_offset), ('value', name, value), ('array', name, list or None),
+        ('extern', name, None), ('delete', name, None). The body's parent is available via parent().
+        Arrays are only decoded when 'arrays' is None or contains their lowercase name.
+        """
+        _, pos = self._asciiz(offset)
+        count, pos = self._compressed_int(pos)
+        for _ in range(count):
+            kind = self.data[pos]; pos += 1
+            if kind == 0:
+                name, pos = self._asciiz(pos)
+                yield "class", name, _UINT.unpack_from(self.data, pos)[0]
+                pos += 4
+            elif kind == 1:
+                sub = self.data[pos]
+                name, pos = self._asciiz(pos + 1)
+                value, pos = self._scalar(sub, pos)
+                yield "value", name, value
+            elif kind in (2, 5):
+                append = kind == 5
+                if append: pos += 4
+                name, pos = self._asciiz(pos)
+                want = arrays is None or name.lower() in arrays
+                value, pos = self._array(pos, want)
+                yield "array", name, (ConfigArray(value, append) if want else None)
+            elif kind in (3, 4):
+                name, pos = self._asciiz(pos)
+                yield ("extern" if kind == 3 else "delete"), name, None
+            else:
+                raise RapError(f"Unknown entry type {kind} at {pos - 1}")
+
+    def parent(self, offset):
+        return self._asciiz(offset)[0] or None
+
+    def find(self, *path):
+        """Body offset of a nested class (case-insensitive), e.g. find("CfgPatches"). None if absent."""
+        offset = self.ROOT
+        for name in path:
+            low = name.lower()
+            for kind, entry_name, payload in self.entries(offset, arrays=()):
+                if kind == "class" and entry_name.lower() == low:
+                    offset = payload; break
+            else:
+                return None
+        return offset
+
+    def iter_arrays(self, names, offset=ROOT, _path=()):
+        """Yields (class_path, name, values) for every array called one of 'names', at any depth."""
+        names = {n.lower() for n in names}
+        for kind, name, payload in self.entries(offset, arrays=names):
+            if kind == "array" and payload is not None:
+                yield _path, name, payload
+            elif kind == "class":
+                yield from self.iter_arrays(names, payload, _path + (name,))
+
+    def to_class(self, offset=ROOT, name="", depth=None):
+        """Decodes a class body into a config_parser.ConfigClass; 'depth' limits how far to descend."""
+        node = ConfigClass(name, self.parent(offset))
+        for kind, entry_name, payload in self.entries(offset):
+            if kind == "class":
+                if depth is None or depth > 0:
+                    node._add_class(self.to_class(payload, entry_name, None if depth is None else depth - 1))
+                else:
+                    node._add_class(ConfigClass(entry_name, self.parent(payload)))
+            elif kind in ("value", "array"):
+                node.properties[entry_name] = payload
+            elif kind == "extern":
+                node._add_class(ConfigClass(entry_name, extern=True))
+            else:
+                node.deleted.append(entry_name)
+        return node
+
+def read_arrays(data, names):
+    """{lowercase name: merged values} of the requested arrays anywhere in a rapified config."""
+    found = {}
+    for _, name, values in RapReader(data).iter_arrays(names):
+        found.setdefault(name.lower(), []).extend(values)
+    return found
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: rap_reader.py <config.bin|mission.sqm> [array names...]")
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f: raw = f.read()
+    for path, name, values in RapReader(raw).iter_arrays(sys.argv[2:] or ["addons", "addonsAuto", "requiredAddons"]):
+        print(f"{'/'.join(path + (name,))}[] = {list(values)}")
@@ -14,7 +14,9 @@ import html
 import argparse
 import multiprocessing
 import time
+import cProfile
 from workshop_utils import resolve_transitive_dependencies, get_bulk_metadata
+from build_trace import Tracer
 
 try:
     from rich.console import Console
@@ -38,6 +40,9 @@ STAGING_DIR = os.path.join(HEMTT_OUT, "release")
 PROJECT_TOML = os.path.join(PROJECT_ROOT, ".hemtt", "project.toml")
 LOCK_FILE = os.path.join(PROJECT_ROOT, "mods.lock")
 MOD_SOURCES_FILE = os.path.join(PROJECT_ROOT, "mod_sources.txt")
+TRACE_FILE = os.path.join(HEMTT_OUT, "release_trace.json")
+STAGE_EVENTS_FILE = os.path.join(HEMTT_OUT, "build_stages.jsonl")
+PROFILE_DIR = os.path.join(HEMTT_OUT, "profile")
 
 def load_env():
     env_paths = [os.path.join(PROJECT_ROOT, ".env"), os.path.join(PROJECT_ROOT, "..", "UKSFTA-Tools", ".env")]
@@ -162,8 +167,28 @@ def main():
     parser.add_argument("--skip-build", action="store_true", help="Skip the build process and use existing artifacts in .hemttout/release")
     parser.add_argument("--dry-run", action="store_true", help="Simulate release")
     parser.add_argument("--offline", action="store_true", help="Offline mode")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile stats for release.py and the build's Python tools to .hemttout/profile")
     args = parser.parse_args()
 
+    # Every run leaves a stage trace in .hemttout/release_trace.json (chrome://tracing / Perfetto)
+    tracer = Tracer(TRACE_FILE)
+    profiler = None
+    if args.profile:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler = cProfile.Profile(); profiler.enable()
+    try:
+        run_release(args, tracer)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(PROFILE_DIR, "release.prof"))
+            print(f"📈 cProfile output: {PROFILE_DIR}")
+        tracer.import_events(STAGE_EVENTS_FILE)
+        print("\n--- Release Stage Timings ---")
+        print(tracer.summary())
+        print(f"🕒 Trace written: {tracer.save()}")
+
+def run_release(args, tracer):
     v_str, _ = get_current_version()
     print(f"Current version: {v_str}")
     choice = 'n'
@@ -178,10 +203,11 @@ def main():
         part = "patch"
         if choice == 'm': part = "minor"
         if choice == 'major': part = "major"
-        new_v = bump_version(part)
-        if not args.dry_run:
-            subprocess.run(["git", "add", VERSION_FILE], check=True)
-            subprocess.run(["git", "commit", "-S", "-m", f"chore: bump version to {new_v}"], check=True)
+        with tracer.stage("version bump", path=VERSION_FILE):
+            new_v = bump_version(part)
+            if not args.dry_run:
+                subprocess.run(["git", "add", VERSION_FILE], check=True)
+                subprocess.run(["git", "commit", "-S", "-m", f"chore: bump version to {new_v}"], check=True)
 
     if args.skip_build:
         print("⏩ Skipping build as requested. Using existing artifacts in .hemttout/release...")
@@ -200,6 +226,10 @@ def main():
         build_env["TMPDIR"] = build_temp_dir
         build_env["TEMP"] = build_temp_dir
         build_env["TMP"] = build_temp_dir
+        # build.sh appends its own stage records (audit, hemtt, timestamps, zip) for the trace
+        if os.path.exists(STAGE_EVENTS_FILE): os.remove(STAGE_EVENTS_FILE)
+        build_env["UKSFTA_TRACE_EVENTS"] = STAGE_EVENTS_FILE
+        if args.profile: build_env["UKSFTA_PROFILE_DIR"] = PROFILE_DIR
         
         # Calculate threads: use provided count or default (cpu_count - 2)
         if args.threads:
@@ -208,7 +238,8 @@ def main():
             cpu_count = multiprocessing.cpu_count()
             num_threads = str(max(1, cpu_count - 2))
             
-        subprocess.run(["bash", "build.sh", "release", "--threads", num_threads], check=True, env=build_env)
+        with tracer.stage("build.sh release", path=STAGING_DIR, threads=int(num_threads)):
+            subprocess.run(["bash", "build.sh", "release", "--threads", num_threads], check=True, env=build_env)
 
     ws_config = get_workshop_config()
     workshop_id = ws_config["id"]
@@ -234,7 +265,10 @@ def main():
         print(f"Searched: {potential_root} and {STAGING_DIR}")
         sys.exit(1)
 
-    vdf_p, desc_p = create_vdf("107410", workshop_id, vdf_content_path, "Release v" + new_v)
+    with tracer.stage("create_vdf") as stage:
+        vdf_p, desc_p = create_vdf("107410", workshop_id, vdf_content_path, "Release v" + new_v)
+        stage["files"] = 2
+        stage["bytes"] = sum(os.path.getsize(p) for p in (vdf_p, desc_p) if os.path.exists(p))
     
     if args.offline:
         print(f"\n[OFFLINE] Diamond Tier Staging Complete.")
@@ -262,11 +296,13 @@ def main():
     
     try:
         # Running steamcmd with a timeout of 15 minutes to prevent hung processes, but allowing enough time for large uploads
-        result = subprocess.run(cmd, check=True, timeout=900)
+        with tracer.stage("steamcmd upload", path=vdf_content_path):
+            result = subprocess.run(cmd, check=True, timeout=900)
         print("\n✅ Mod updated and validated on Workshop.")
         tag_name = f"v{new_v}"
-        subprocess.run(["git", "tag", "-s", tag_name, "-m", f"Release {new_v}"], check=True)
-        subprocess.run(["git", "push", "origin", "main", "--tags", "-f"], check=False)
+        with tracer.stage("git tag + push"):
+            subprocess.run(["git", "tag", "-s", tag_name, "-m", f"Release {new_v}"], check=True)
+            subprocess.run(["git", "push", "origin", "main", "--tags", "-f"], check=False)
     except subprocess.TimeoutExpired:
         print("\n❌ Error: SteamCMD timed out after 15 minutes. The upload might still be processing, please check the Workshop.")
         sys.exit(1)
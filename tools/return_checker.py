@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
+import argparse
 import fnmatch
 import os
 import re
 import sys
+from changed_files import add_file_arguments, selected_files
+from sqf_lexer import read_tokens, COMMENT, PREPROC
 
 
 def get_files():
@@ -23,58 +26,46 @@ def get_files():
     return sqf_files
 
 
+def get_return_value(tokens):
+    """`* Return Value:` type from the file's first block comment (docblock), or None."""
+    for tok in tokens:
+        if tok.kind == COMMENT and tok.value.startswith('/*'):
+            lines = [l.strip() for l in tok.value.splitlines()]
+            try:
+                # Drop the first two characters (e.g. `* `) so it returns the return type
+                return lines[lines.index('* Return Value:') + 1][2:]
+            except (ValueError, IndexError):
+                # Skip if documentation block doesn't match expected format
+                return None
+    return None
+
+
+def analyze_file(filepath):
+    """Reads and tokenizes a file once; returns (return_value, last_line) or None without a docblock."""
+    text, tokens = read_tokens(filepath, comments=True)
+    return_value = get_return_value(tokens)
+    if return_value is None:
+        return None
+    # The last line holding code; trailing comments and blank lines are ignored
+    code = [t for t in tokens if t.kind not in (COMMENT, PREPROC)]
+    if not code:
+        return None
+    last = code[-1]
+    last_line = text.split('\n')[last.line + last.value.count('\n') - 1].strip()
+    return return_value, last_line
+
+
 def filter_files(filepaths):
+    # Return only files that have a docblock, with their return type and last code line
     filtered_files = []
-
-    # Return only files that have a docblock
     for filepath in filepaths:
-        with open(filepath, 'r') as file_contents:
-            for line in file_contents:
-                contents = line.strip()
-
-                # A possible docblock starts
-                if contents.startswith('/*'):
-                    # Find the `* Return Value:` comment
-                    lines = list(map(
-                        # Remove \n from all the lines
-                        (lambda s: s.strip()), file_contents.readlines()
-                    ))
-
-                    try:
-                        return_value_comment_index = lines.index('* Return Value:')
-                        return_value_index = return_value_comment_index + 1
-
-                        # Drop the first two characters (e.g. `* `) so it returns the return type
-                        return_value = lines[return_value_index][2:]
-
-                        filtered_files.append([filepath, return_value])
-                    except ValueError:
-                        # Skip if documentation block doesn't match expected format
-                        continue
-
-                    break
-
+        details = analyze_file(filepath)
+        if details:
+            filtered_files.append([filepath] + list(details))
     return filtered_files
 
 
-def get_last_line(filepath):
-    with open(filepath, 'r') as file_contents:
-        lines = file_contents.readlines()
-        last_line = lines[-1].strip()
-
-        # Handle multiple blank lines at the end of the file
-        if last_line == "":
-            i = -2
-
-            while lines[i].strip() == "":
-                i -= 1
-
-            return lines[i].strip()
-        return last_line
-
-
-def check_last_character(filepath, return_value):
-    last_line = get_last_line(filepath)
+def check_last_character(last_line, return_value):
     last_line_character = last_line[-1]
 
     # If return type is None and the last line has a semicolon OR the last thing is just the nil keyword OR last thing is a closing bracket
@@ -103,22 +94,25 @@ def get_expected_last_line(last_line, return_value):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    add_file_arguments(parser)
+    args = parser.parse_args()
+
     print('Validating Return Types')
     print('-----------------------')
 
     bad_files = []
 
-    files = get_files()
+    files = selected_files(args, ('.sqf',))
+    if files is None:
+        files = get_files()
     filtered_files = filter_files(files)
 
     for file_details in filtered_files:
-        filepath, return_value = file_details
-
-        status = check_last_character(filepath, return_value)
+        filepath, return_value, last_line = file_details
 
-        if not status:
-            bad_files.append(
-                [filepath, return_value, get_last_line(filepath)])
+        if not check_last_character(last_line, return_value):
+            bad_files.append([filepath, return_value, last_line])
 
     error_count = len(bad_files)
     print('Found {} error(s)'.format(error_count))
@@ -5,125 +5,137 @@ import os
 import re
 import ntpath
 import sys
+import json
 import argparse
-
-def get_private_declare(content):
+from pathlib import Path
+from changed_files import add_file_arguments, selected_files
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from sqf_lexer import tokenize, string_value, IDENT, STRING, BRACKET, OPEN_BRACKETS
+
+# Locals the engine provides; never reported
+IMPLICIT_LOCALS = {"_this", "_x", "_y", "_foreachindex", "_thisscript", "_exception"}
+DECLARING_MACROS = re.compile(r'PARAMS_[0-9]+|EXPLODE_[0-9]+_PVT|DEFAULT_PARAM|KEY_PARAM|IGNORE_PRIVATE_WARNING')
+LOCAL_IN_STRING = re.compile(r'(?<![A-Za-z0-9_])_[A-Za-z0-9_]+')
+
+def _group(tokens, i):
+    """Tokens inside the bracket group opening at tokens[i] and the index after it."""
+    depth = 0
+    for j in range(i, len(tokens)):
+        tok = tokens[j]
+        if tok.kind == BRACKET:
+            if tok.value in OPEN_BRACKETS: depth += 1
+            else: depth -= 1
+            if depth == 0: return tokens[i + 1:j], j + 1
+    return tokens[i + 1:], len(tokens)
+
+def _declared_names(group):
+    """(name, line, col) for every local named in a declaration."""
+    names = []
+    for tok in group:
+        if tok.kind == IDENT and tok.value.startswith("_"): names.append((tok.value, tok.line, tok.col))
+        elif tok.kind == STRING:
+            value = string_value(tok)
+            if LOCAL_IN_STRING.fullmatch(value): names.append((value, tok.line, tok.col))
+    return names
+
+def get_private_declare(tokens):
+    """Locals declared via private, params and the CBA/ACE parameter macros."""
     priv_declared = []
-
-    srch = re.compile('private.*')
-    priv_srch_declared = srch.findall(content)
-    priv_srch_declared = sorted(set(priv_srch_declared))
-
-    priv_dec_str = ''.join(priv_srch_declared)
-
-    srch = re.compile(r'(?<![_a-zA-Z0-9])(_[a-zA-Z]*?)[ ,\}\]\)";]')
-    priv_split = srch.findall(priv_dec_str)
-    priv_split = sorted(set(priv_split))
-    priv_declared += priv_split;
-
-    srch = re.compile(r'params \[.*\]|PARAMS_[0-9].*|EXPLODE_[0-9]_PVT.*|DEFAULT_PARAM.*|KEY_PARAM.*|IGNORE_PRIVATE_WARNING.*')
-    priv_srch_declared = srch.findall(content)
-    priv_srch_declared = sorted(set(priv_srch_declared))
-
-    priv_dec_str = ''.join(priv_srch_declared)
-
-    srch = re.compile(r'(?<![_a-zA-Z0-9])(_[a-zA-Z]*?)[ ,\}\]\)";]')
-    priv_split = srch.findall(priv_dec_str)
-    priv_split = sorted(set(priv_split))
-
-    priv_declared += priv_split;
-
-
+    for i, tok in enumerate(tokens):
+        if tok.kind != IDENT: continue
+        low = tok.value.lower()
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if nxt is None: break
+        if low == "private":
+            if nxt.kind == BRACKET and nxt.value == "[":
+                priv_declared += _declared_names(_group(tokens, i + 1)[0])
+            else:
+                priv_declared += _declared_names([nxt])
+        elif (low == "params" or DECLARING_MACROS.fullmatch(tok.value)) and nxt.kind == BRACKET and nxt.value in "[(":
+            priv_declared += _declared_names(_group(tokens, i + 1)[0])
     return priv_declared
 
-def check_privates(filepath):
-    bad_count_file = 0
-    def pushClosing(t):
-        closingStack.append(closing.expr)
-        closing << Literal( closingFor[t[0]] )
-
-    def popClosing():
-        closing << closingStack.pop()
+def count_private_uses(tokens):
+    """Occurrences of every local (lowercase), including code inside strings."""
+    uses = Counter()
+    for tok in tokens:
+        if tok.kind == IDENT:
+            if tok.value.startswith("_"): uses[tok.value.lower()] += 1
+        elif tok.kind == STRING and "_" in tok.value:
+            uses.update(m.lower() for m in LOCAL_IN_STRING.findall(tok.value))
+    return uses
+
+def find_unused(tokens):
+    """(name, line, col) of declared locals that are never used after their declaration (tokens from sqf_lexer)."""
+    uses = count_private_uses(tokens)
+    unused = []; seen = set()
+    for name, line, col in get_private_declare(tokens):
+        low = name.lower()
+        if low in IMPLICIT_LOCALS or low in seen: continue
+        seen.add(low)
+        if uses[low] == 1: unused.append((name, line, col))
+    return unused
 
-    with open(filepath, 'r') as file:
+def check_privates(filepath):
+    """Unused privates of one file as (name, line, col); worker entry point."""
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as file:
         content = file.read()
+    return filepath, find_unused(list(tokenize(content)))
 
-        priv_use = []
-        priv_use = []
-
-
-        # Regex search privates
-        srch = re.compile(r'(?<![_a-zA-Z0-9])(_[a-zA-Z]*?)[ ,\}\]\)";]')
-        priv_use = srch.findall(content)
-
-        # Private declaration search
-        priv_declared = get_private_declare(content)
-
-        if '_this' in priv_declared: priv_declared.remove('_this')
-        if '_this' in priv_use: priv_use.remove('_this')
-
-        if '_x' in priv_declared: priv_declared.remove('_x')
-        if '_x' in priv_use: priv_use.remove('_x')
-
-        if '_forEachIndex' in priv_declared: priv_declared.remove('_forEachIndex')
-        if '_forEachIndex' in priv_use: priv_use.remove('_forEachIndex')
-        if '_forEachIndex' in priv_declared: priv_declared.remove('_forEachIndex')
-        if '_forEachIndex' in priv_use: priv_use.remove('_forEachIndex')
-        if '_forEachindex' in priv_declared: priv_declared.remove('_forEachindex')
-        if '_forEachindex' in priv_use: priv_use.remove('_forEachindex')
+def lint_check(lint_file):
+    """Lint engine entry point; reuses the file's shared token stream."""
+    return [(line, col, f"Unused private '{name}'") for name, line, col in find_unused(lint_file.sqf_tokens)]
 
-        unused = []
-        for s in priv_declared:
-            if priv_use.count(s) == 1:
-                if s.lower() not in map(str.lower,unused):
-                    unused.append(s)
-
-        if len(unused) > 0:
-            print (filepath)
-
-            private_output = 'private[';
-            first = True
-            for bad_priv in unused:
-                if first:
-                    first = False
-                    private_output = private_output + '"' + bad_priv
-                else:
-                    private_output = private_output + '", "' + bad_priv
-
-            private_output = private_output + '"];';
-            print (private_output)
-
-            for bad_priv in unused:
-                print ('\t' + bad_priv)
-                bad_count_file = bad_count_file + 1
+# Picked up by lint_engine.py
+LINT_CHECKER = {"name": "sqf-privates", "version": 1, "extensions": (".sqf",), "roots": ("addons",), "check": lint_check}
 
+def find_sqf_files(path, module=""):
+    scan_root = Path(path)
+    addons_dir = scan_root / "addons"
+    target_dir = addons_dir if addons_dir.exists() else scan_root
+    if module: target_dir = target_dir / module
+    sqf_list = []
+    for root, dirnames, filenames in os.walk(target_dir):
+        dirnames[:] = [d for d in dirnames if d not in (".hemttout", ".uksf_tools", ".git")]
+        for filename in fnmatch.filter(filenames, '*.sqf'):
+            sqf_list.append(os.path.join(root, filename))
+    return sorted(sqf_list)
 
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m','--module', help='only search specified module addon folder', required=False, default="")
+    parser.add_argument('path', nargs='?', default=".", help="Project path to scan")
+    parser.add_argument('-j', '--jobs', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--json', action='store_true', help="Print findings as JSON")
+    add_file_arguments(parser)
+    args = parser.parse_args()
 
-    return bad_count_file
+    sqf_list = selected_files(args, ('.sqf',))
+    if sqf_list is None: sqf_list = find_sqf_files(args.path, args.module)
+    if len(sqf_list) > 1 and args.jobs != 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(check_privates, sqf_list, chunksize=max(1, len(sqf_list) // 64)))
+    else:
+        results = [check_privates(f) for f in sqf_list]
 
-def main():
+    findings = [{"file": f, "line": line, "col": col, "name": name} for f, unused in results for name, line, col in unused]
+    if args.json:
+        print(json.dumps({"files": len(sqf_list), "unused": findings}, indent=2))
+        return 1 if findings else 0
 
     print("#########################")
     print("# Search your Privates  #")
     print("#   (~ ACE 33664af)     #")
     print("#########################")
-
-    sqf_list = []
-    bad_count = 0
-
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-m','--module', help='only search specified module addon folder', required=False, default=".")
-    args = parser.parse_args()
-
-    for root, dirnames, filenames in os.walk('../addons' + '/' + args.module):
-      for filename in fnmatch.filter(filenames, '*.sqf'):
-        sqf_list.append(os.path.join(root, filename))
-
-    for filename in sqf_list:
-        bad_count = bad_count + check_privates(filename)
-
-
-    print ("Bad Count {0}".format(bad_count))
+    for filepath, unused in results:
+        if not unused: continue
+        print (filepath)
+        print ('private[' + ', '.join('"%s"' % name for name, _, _ in unused) + '];')
+        for name, line, col in unused:
+            print (f'\t{name} (line {line})')
+    print ("Bad Count {0}".format(len(findings)))
+    return 1 if findings else 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,60 +1,160 @@
 #!/usr/bin/env python3
 import os
-import sys
 import re
+import sys
+import mmap
+import argparse
+import subprocess
+import threading
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from changed_files import selected_files
 
 # High-fidelity patterns for secret detection
 PATTERNS = {
     "Discord Webhook": r"https://discord\.com/api/webhooks/\d+/[A-Za-z0-9_-]+",
     "GitHub Token": r"gh[p|o|u|s|r]_[A-Za-z0-9_]{36,255}",
     "Private Key": r"-----BEGIN [A-Z ]+ PRIVATE KEY-----",
-    "Generic Token": r"(?i)(api[_-]key|secret|password|token)\s*[:=]\s*['\"][A-Za-z0-9_-]{16,}['\"]"
+    "Generic Token": r"(?i:(?:api[_-]key|secret|password|token)\s*[:=]\s*['\"][A-Za-z0-9_-]{16,}['\"])"
 }
 
-def audit_security(project_path):
-    # Use ASCII characters only for maximum CI compatibility
-    print(f"[SECURITY] Guardian Scan: {os.path.basename(project_path)}")
-    leaks = []
-    
-    # 1. Check for un-ignored .env files
+# All patterns in one alternation; the named group that matched tells which label fired
+GROUP_LABELS = {re.sub(r"\W", "_", label).lower(): label for label in PATTERNS}
+SECRET_RE = re.compile("|".join(f"(?P<{group}>{PATTERNS[label]})" for group, label in GROUP_LABELS.items()).encode())
+_NEWLINE_RE = re.compile(b"\n")
+
+CODE_EXTS = {".cpp", ".hpp", ".sqf", ".py", ".sh", ".yml", ".json", ".xml"}
+SKIP_DIRS = {".git", ".hemttout"}
+# Files above this are reported instead of scanned (generated data, not hand-written config)
+MAX_FILE_SIZE = 32 * 1024 * 1024
+# Below this many files a pool costs more than it saves
+POOL_THRESHOLD = 32
+
+def scan_bytes(data):
+    """[(label, line)] with the first hit of each pattern. 'data' may be bytes or an mmap."""
+    found = {}
+    for m in SECRET_RE.finditer(data):
+        label = GROUP_LABELS[m.lastgroup]
+        if label not in found:
+            # mmap has no count(); a regex scan counts newlines without copying the prefix
+            found[label] = sum(1 for _ in _NEWLINE_RE.finditer(data, 0, m.start())) + 1
+            if len(found) == len(PATTERNS): break
+    return sorted(found.items(), key=lambda item: item[1])
+
+def scan_file(path, max_size=MAX_FILE_SIZE):
+    """Returns (path, hits, note). Files are memory-mapped, so big JSON never lands on the heap."""
+    try:
+        size = os.path.getsize(path)
+        if size > max_size: return path, [], f"skipped ({size // (1024 * 1024)} MB exceeds the scan limit)"
+        if size == 0: return path, [], None
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return path, scan_bytes(data), None
+    except (OSError, ValueError) as e:
+        return path, [], f"unreadable ({e})"
+
+def _scan_task(task):
+    return scan_file(*task)
+
+def collect_files(project_path):
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for f in files:
+            if Path(f).suffix.lower() in CODE_EXTS:
+                yield os.path.join(root, f)
+
+def staged_blobs(project_path):
+    """Yields (path, bytes) for every added/modified file in the index, as it will be committed."""
+    raw = subprocess.run(["git", "diff", "--cached", "--raw", "-z", "--no-abbrev", "--no-renames", "--diff-filter=ACM"],
+                         cwd=project_path, capture_output=True, check=True).stdout
+    fields = raw.split(b"\0")
+    entries = []
+    for meta, path in zip(fields[0::2], fields[1::2]):
+        if meta: entries.append((path.decode("utf-8", errors="replace"), meta.split()[3]))
+    if not entries: return
+    # One cat-file process streams all blobs. The object names are fed from a thread:
+    # written up front, both pipes fill and git and this reader wait on each other.
+    proc = subprocess.Popen(["git", "cat-file", "--batch"], cwd=project_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    def feed():
+        try:
+            for _, sha in entries: proc.stdin.write(sha + b"\n")
+            proc.stdin.close()
+        except OSError:
+            pass
+    threading.Thread(target=feed, daemon=True).start()
+    for path, _ in entries:
+        header = proc.stdout.readline().split()
+        size = int(header[2]) if len(header) == 3 else 0
+        data = proc.stdout.read(size); proc.stdout.read(1)
+        yield path, data
+    proc.wait()
+
+def check_env_file(project_path):
     env_file = Path(project_path) / ".env"
     if env_file.exists():
-        # Check if it's ignored
         gitignore = Path(project_path) / ".gitignore"
-        is_ignored = False
-        if gitignore.exists():
-            if ".env" in gitignore.read_text():
-                is_ignored = True
-        
-        if not is_ignored:
-            leaks.append("CRITICAL: .env file found and NOT ignored in .gitignore")
-
-    # 2. Scan code for hardcoded secrets
-    code_exts = {".cpp", ".hpp", ".sqf", ".py", ".sh", ".yml", ".json", ".xml"}
-    for root, _, files in os.walk(project_path):
-        if ".git" in root or ".hemttout" in root: continue
-        for f in files:
-            file_path = Path(root) / f
-            if file_path.suffix.lower() in code_exts:
-                try:
-                    content = file_path.read_text(errors='ignore')
-                    for label, pattern in PATTERNS.items():
-                        if re.search(pattern, content):
-                            leaks.append(f"LEAK: {label} detected in {file_path.relative_to(project_path)}")
-                except: pass
+        if not (gitignore.exists() and ".env" in gitignore.read_text()):
+            return "CRITICAL: .env file found and NOT ignored in .gitignore"
+    return None
+
+def audit_security(project_path, staged=False, jobs=None, max_size=MAX_FILE_SIZE, files=None):
+    # Use ASCII characters only for maximum CI compatibility
+    print(f"[SECURITY] Guardian Scan: {os.path.basename(os.path.abspath(project_path))}{' (staged changes)' if staged else ''}")
+    leaks = []; notes = []
+
+    if staged:
+        scanned = 0
+        for path, data in staged_blobs(project_path):
+            if os.path.basename(path) == ".env":
+                leaks.append(f"CRITICAL: .env file is staged for commit ({path})")
+            if Path(path).suffix.lower() not in CODE_EXTS: continue
+            scanned += 1
+            if len(data) > max_size:
+                notes.append(f"{path}: skipped ({len(data) // (1024 * 1024)} MB exceeds the scan limit)"); continue
+            for label, line in scan_bytes(data):
+                leaks.append(f"LEAK: {label} detected in {path}:{line}")
+    else:
+        # An explicit file list replaces the project walk
+        env_leak = check_env_file(project_path) if files is None else None
+        if env_leak: leaks.append(env_leak)
+        tasks = [(p, max_size) for p in (files if files is not None else collect_files(project_path))]
+        scanned = len(tasks)
+        if len(tasks) >= POOL_THRESHOLD and jobs != 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_scan_task, tasks, chunksize=max(1, len(tasks) // ((jobs or os.cpu_count() or 1) * 4))))
+        else:
+            results = [_scan_task(t) for t in tasks]
+        for path, hits, note in results:
+            rel = os.path.relpath(path, project_path)
+            if note: notes.append(f"{rel}: {note}")
+            for label, line in hits:
+                leaks.append(f"LEAK: {label} detected in {rel}:{line}")
 
+    for n in notes:
+        print(f"  [i] {n}")
     if leaks:
         print("  [!] Security risks identified!")
         for l in leaks:
             print(f"     - {l}")
         return False
     else:
-        print("  [OK] No secrets detected. Repository is clean.")
+        print(f"  [OK] No secrets detected in {scanned} file(s). Repository is clean.")
         return True
 
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Secret Scanner")
+    parser.add_argument("project_path", nargs="?", default=".", help="Project folder")
+    parser.add_argument("--staged", "--changed", dest="staged", action="store_true", help="Only scan the files staged for commit (git diff --cached)")
+    parser.add_argument("--files", nargs="+", metavar="FILE", help="Only scan these files")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-size", type=int, default=MAX_FILE_SIZE // (1024 * 1024), help="Skip files larger than this many MB")
+    args = parser.parse_args()
+    try:
+        clean = audit_security(args.project_path, args.staged, args.jobs, args.max_size * 1024 * 1024,
+                               selected_files(args, tuple(CODE_EXTS)))
+    except subprocess.CalledProcessError as e:
+        print(f"  [!] git failed: {e.stderr.decode(errors='replace').strip()}")
+        sys.exit(2)
+    sys.exit(0 if clean else 1)
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: security_auditor.py <project_path>")
-        sys.exit(1)
-    audit_security(sys.argv[1])
+    main()
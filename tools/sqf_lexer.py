@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+import sys
+from collections import namedtuple
+
+# UKSFTA SQF Lexer
+# One-pass tokenizer shared by the SQF checks (sqf_validator, search_unused_privates,
+# return_checker). Strings, comments and preprocessor lines are single tokens, so
+# brackets or '_locals' inside them never confuse a rule. Every token carries line/col (1-based).
+
+Token = namedtuple("Token", "kind value line col")
+
+# Token kinds
+STRING = "string"
+COMMENT = "comment"
+PREPROC = "preproc"
+IDENT = "ident"
+NUMBER = "number"
+BRACKET = "bracket"
+OP = "op"
+# Unterminated string or block comment (runs to the end of the file)
+UNTERMINATED = "unterminated"
+
+OPEN_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+CLOSE_BRACKETS = {v: k for k, v in OPEN_BRACKETS.items()}
+
+_TOKEN_RE = re.compile(r'''
+    (?P<preproc>(?:^|(?<=\n))[ \t]*\#(?:\\\r?\n|\\.|[^\\\n])*)
+  | (?P<nl>\n)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<comment>//[^\n]*|/\*[\s\S]*?\*/)
+  | (?P<string>"(?:[^"]|"")*"|'(?:[^']|'')*')
+  | (?P<unterminated>/\*[\s\S]*|"[\s\S]*|'[\s\S]*)
+  | (?P<number>(?:0x|\$)[0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<bracket>[()\[\]{}])
+  | (?P<op>==|!=|>=|<=|&&|\|\||>>|.)
+''', re.VERBOSE | re.IGNORECASE)
+
+def tokenize(text, comments=False):
+    """Yields Tokens. Comments are dropped unless 'comments' is True."""
+    line = 1; line_start = 0
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "nl":
+            line += 1; line_start = m.end()
+            continue
+        if kind == "ws": continue
+        value = m.group()
+        start = m.start()
+        if kind != COMMENT or comments:
+            yield Token(kind, value, line, start - line_start + 1)
+        newlines = value.count("\n")
+        if newlines:
+            line += newlines
+            line_start = start + value.rindex("\n") + 1
+
+def string_value(token):
+    """Content of a string token with the doubled quotes collapsed."""
+    q = token.value[0]
+    return token.value[1:-1].replace(q + q, q)
+
+def read_tokens(filepath, comments=False):
+    """Reads a file once; returns (text, tokens)."""
+    with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+    return text, list(tokenize(text, comments))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: sqf_lexer.py <file.sqf>")
+        sys.exit(1)
+    for tok in read_tokens(sys.argv[1], comments=True)[1]:
+        print(f"{tok.line}:{tok.col}\t{tok.kind}\t{tok.value!r}")
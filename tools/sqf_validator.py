@@ -5,49 +5,88 @@ import sys
 import argparse
 import fnmatch
 from pathlib import Path
+from changed_files import add_file_arguments, selected_files
+from sqf_lexer import tokenize, BRACKET, UNTERMINATED, OPEN_BRACKETS, CLOSE_BRACKETS
+
+def check_brackets(tokens):
+    """Bracket balance over the token stream; returns (line, col, message) diagnostics."""
+    errors = []; stack = []
+    for tok in tokens:
+        if tok.kind == UNTERMINATED:
+            what = "block comment" if tok.value.startswith("/*") else "string"
+            errors.append((tok.line, tok.col, f"Unterminated {what}"))
+        elif tok.kind != BRACKET:
+            continue
+        elif tok.value in OPEN_BRACKETS:
+            stack.append(tok)
+        elif stack and stack[-1].value == CLOSE_BRACKETS[tok.value]:
+            stack.pop()
+        elif stack:
+            opener = stack[-1]
+            errors.append((tok.line, tok.col, f"Mismatched '{tok.value}', expected '{OPEN_BRACKETS[opener.value]}' to close '{opener.value}' from line {opener.line}:{opener.col}"))
+            # Drop the opener when the closer matches one further down (missing closer), else skip the stray closer
+            if any(o.value == CLOSE_BRACKETS[tok.value] for o in stack):
+                while stack and stack[-1].value != CLOSE_BRACKETS[tok.value]: stack.pop()
+                stack.pop()
+        else:
+            errors.append((tok.line, tok.col, f"Unexpected '{tok.value}' with no matching '{CLOSE_BRACKETS[tok.value]}'"))
+    for opener in stack:
+        errors.append((opener.line, opener.col, f"Unclosed '{opener.value}'"))
+    return errors
+
+def check_sqf(text):
+    """All token-level checks for one file's content."""
+    return check_brackets(tokenize(text))
 
 def validate_sqf(filepath):
-    """Simple syntax check for common SQF errors."""
+    """Syntax check for common SQF errors (brackets, unterminated strings/comments)."""
     bad_count = 0
     try:
         with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
-            # Basic validation: check for balanced brackets
-            for char_open, char_close in [('(', ')'), ('[', ']'), ('{', '}')]:
-                if content.count(char_open) != content.count(char_close):
-                    print(f"ERROR: Unbalanced {char_open}{char_close} in {filepath}")
-                    bad_count += 1
     except Exception as e:
         print(f"ERROR: Failed to read {filepath}: {e}")
+        return 1
+    for line, col, message in check_sqf(content):
+        print(f"ERROR: {message} in {filepath}:{line}:{col}")
         bad_count += 1
     return bad_count
 
+def lint_check(lint_file):
+    """Lint engine entry point; reuses the file's shared token stream."""
+    return check_brackets(lint_file.sqf_tokens)
+
+# Picked up by lint_engine.py
+LINT_CHECKER = {"name": "sqf-syntax", "version": 1, "extensions": (".sqf",), "roots": ("addons",), "check": lint_check}
+
 def main():
     print("Validating SQF")
     parser = argparse.ArgumentParser()
     parser.add_argument('-m','--module', help='only search specified module addon folder', required=False, default="")
     parser.add_argument('path', nargs='?', default=".", help="Project path to scan")
+    add_file_arguments(parser)
     args = parser.parse_args()
 
     bad_count = 0
-    sqf_files = []
-    
-    scan_root = Path(args.path)
-    addons_dir = scan_root / "addons"
-    target_dir = addons_dir if addons_dir.exists() else scan_root
-    
-    if args.module:
-        target_dir = target_dir / args.module
-
-    if not target_dir.exists():
-        print(f"  [!] Target directory not found: {target_dir}")
-        return 0
-
-    for root, _, filenames in os.walk(target_dir):
-        if ".hemttout" in root or ".uksf_tools" in root: continue
-        for filename in filenames:
-            if filename.lower().endswith('.sqf'):
-                sqf_files.append(os.path.join(root, filename))
+    sqf_files = selected_files(args, ('.sqf',))
+    if sqf_files is None:
+        sqf_files = []
+        scan_root = Path(args.path)
+        addons_dir = scan_root / "addons"
+        target_dir = addons_dir if addons_dir.exists() else scan_root
+
+        if args.module:
+            target_dir = target_dir / args.module
+
+        if not target_dir.exists():
+            print(f"  [!] Target directory not found: {target_dir}")
+            return 0
+
+        for root, _, filenames in os.walk(target_dir):
+            if ".hemttout" in root or ".uksf_tools" in root: continue
+            for filename in filenames:
+                if filename.lower().endswith('.sqf'):
+                    sqf_files.append(os.path.join(root, filename))
 
     for f in sqf_files:
         bad_count += validate_sqf(f)
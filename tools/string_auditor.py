@@ -2,63 +2,62 @@
 import os
 import sys
 import re
+import argparse
 from pathlib import Path
-import xml.etree.ElementTree as ET
+from changed_files import add_file_arguments, selected_files
+from string_index import LocalizationIndex
 
-def audit_strings(project_path):
-    print(f"🌍 Auditing Localization for: {os.path.basename(project_path)}")
-    
-    st_path = Path(project_path) / "addons" / "main" / "stringtable.xml"
-    if not st_path.exists():
-        # Try finding ANY stringtable in addons
-        st_paths = list(Path(project_path).glob("addons/*/stringtable.xml"))
-        if not st_paths:
-            print("  No stringtable.xml found.")
-            return
-        st_path = st_paths[0]
+# Sources whose usages and stringtables whose definitions the audit covers
+AUDIT_EXTS = (".cpp", ".hpp", ".sqf", ".ext", ".xml")
 
-    # 1. Extract keys from XML
-    xml_keys = set()
-    try:
-        tree = ET.parse(st_path)
-        for key in tree.iter('Key'):
-            xml_keys.add(key.get('ID').lower())
-    except Exception as e:
-        print(f"  ❌ Error parsing XML: {e}")
-        return
+def audit_strings(project_path, files=None):
+    """
+    Reports missing, unused and duplicate keys. With 'files', only keys used in or
+    defined by those files are reported; the index still covers the whole project.
+    """
+    print(f"🌍 Auditing Localization for: {os.path.basename(os.path.abspath(project_path))}")
 
-    # 2. Extract keys from Code
-    code_keys = set()
-    code_exts = {".cpp", ".hpp", ".sqf"}
-    for root, _, files in os.walk(project_path):
-        if ".git" in root or ".hemttout" in root: continue
-        for f in files:
-            if Path(f).suffix.lower() in code_exts:
-                content = (Path(root) / f).read_text(errors='ignore')
-                # Match STR_UKSTFA_Something
-                matches = re.findall(r'STR_[a-zA-Z0-9_]+', content)
-                for m in matches:
-                    code_keys.add(m.lower())
+    index = LocalizationIndex(project_path)
+    if not index.stringtables:
+        print("  No stringtable.xml found.")
+        return 0
+    for path, error in index.errors.items():
+        print(f"  ❌ Error parsing {path}: {error}")
 
-    # 3. Compare
-    missing_in_xml = code_keys - xml_keys
-    unused_in_xml = xml_keys - code_keys
+    missing_in_xml = index.missing()
+    unused_in_xml = index.unused()
+    duplicates = index.duplicates()
+    if files is not None:
+        selected = {os.path.realpath(f) for f in files}
+        touches = lambda sites: any(os.path.realpath(p) in selected for p, _ in sites)
+        missing_in_xml = [k for k in missing_in_xml if touches(index.usages[k])]
+        unused_in_xml = [k for k in unused_in_xml if touches(index.definitions[k])]
+        duplicates = [k for k in duplicates if touches(index.definitions[k])]
+    print(f"  {len(index.definitions)} keys across {len(index.stringtables)} stringtable(s).")
 
     if missing_in_xml:
         print(f"  ❌ {len(missing_in_xml)} keys used in code but MISSING in stringtable:")
-        for k in sorted(missing_in_xml):
-            print(f"     - {k.upper()}")
-    
+        for k in missing_in_xml:
+            path, line = index.usages[k][0]
+            print(f"     - {k.upper()} ({os.path.relpath(path, project_path)}:{line})")
+
     if unused_in_xml:
         print(f"  ⚠️ {len(unused_in_xml)} keys exist in stringtable but are UNUSED in code:")
-        for k in sorted(unused_in_xml):
+        for k in unused_in_xml:
             print(f"     - {k.upper()}")
 
+    if duplicates:
+        print(f"  ⚠️ {len(duplicates)} keys are defined in more than one stringtable:")
+        for k in duplicates:
+            print(f"     - {k.upper()}: {', '.join(os.path.relpath(p, project_path) for p, _ in index.definitions[k])}")
+
     if not missing_in_xml and not unused_in_xml:
         print("  ✅ Localization is 100% synchronized.")
+    return len(missing_in_xml)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: string_auditor.py <project_path>")
-        sys.exit(1)
-    audit_strings(sys.argv[1])
+    parser = argparse.ArgumentParser(description="UKSFTA Localization Auditor")
+    parser.add_argument("project_path")
+    add_file_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(1 if audit_strings(args.project_path, selected_files(args, AUDIT_EXTS)) else 0)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from cache_utils import cache_path, file_signature, load_json, save_json
+
+# UKSFTA Localization Index
+# Maps every STR_ key of a project to its stringtable definitions and its usage sites.
+# Source files and stringtables are only re-read when their size/mtime changes, so the
+# string tools (auditor, cleaner, validator) share one cheap scan.
+
+INDEX_VERSION = 2
+INDEX_FILE = "string_index.json"
+CODE_EXTS = {".cpp", ".hpp", ".sqf", ".ext"}
+SKIP_DIRS = (".git", ".hemtt", ".uksf_cache", ".uksf_tools")
+# Any casing (str_main_hello is as valid as STR_Main_Hello), but not the tail of a longer name
+_KEY_RE = re.compile(rb"(?<![A-Za-z0-9_])STR_[A-Za-z0-9_]+", re.IGNORECASE)
+
+def is_indexed_key(key):
+    """Whether usages of this ID are tracked; IDs without the STR_ prefix are not."""
+    return _KEY_RE.fullmatch(key.encode("utf-8", errors="replace")) is not None
+
+def scan_usages(path):
+    """[[key, line], ...] for every STR_ token (any casing) in a source file."""
+    with open(path, "rb") as f: data = f.read()
+    usages = []; line = 1; last = 0
+    for m in _KEY_RE.finditer(data):
+        line += data.count(b"\n", last, m.start()); last = m.start()
+        usages.append([m.group().decode("ascii"), line])
+    return usages
+
+def scan_stringtable(path):
+    """[[id, container], ...] for every Key of a stringtable, inside Containers or directly in a Package."""
+    keys = []; stack = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem.get("name") if elem.tag in ("Package", "Container") else None)
+            continue
+        stack.pop()
+        if elem.tag == "Key" and elem.get("ID"):
+            keys.append([elem.get("ID"), next((n for n in reversed(stack) if n), "")])
+        elif elem.tag in ("Package", "Container"):
+            elem.clear()
+    return keys
+
+class LocalizationIndex:
+    """
+    definitions: {key (lowercase): [(stringtable, ID as written)]}
+    usages:      {key (lowercase): [(file, line)]}
+    """
+
+    def __init__(self, project_path, index_path=None):
+        self.root = Path(project_path).resolve()
+        self.path = Path(index_path) if index_path else cache_path(INDEX_FILE)
+        data = load_json(self.path, {}) or {}
+        fresh = data.get("version") == INDEX_VERSION
+        self.sources = data.get("sources", {}) if fresh else {}
+        self.tables = data.get("tables", {}) if fresh else {}
+        self.errors = {}
+        self.dirty = False
+        self.refresh()
+
+    def _walk(self):
+        for dirpath, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith(SKIP_DIRS)]
+            for f in files:
+                if f.lower() == "stringtable.xml": yield "table", os.path.join(dirpath, f)
+                elif os.path.splitext(f)[1].lower() in CODE_EXTS: yield "source", os.path.join(dirpath, f)
+
+    def refresh(self):
+        """Re-reads files whose signature changed and forgets files that are gone."""
+        seen = set()
+        for kind, path in self._walk():
+            seen.add(path)
+            store = self.tables if kind == "table" else self.sources
+            sig = file_signature(path)
+            entry = store.get(path)
+            if entry and entry["sig"] == sig: continue
+            try:
+                items = scan_stringtable(path) if kind == "table" else scan_usages(path)
+            except (OSError, ET.ParseError) as e:
+                self.errors[path] = str(e)
+                items = []
+            store[path] = {"sig": sig, "items": items}
+            self.dirty = True
+        prefix = str(self.root) + os.sep
+        for store in (self.sources, self.tables):
+            for path in [p for p in store if p.startswith(prefix) and p not in seen]:
+                del store[path]; self.dirty = True
+        self.save()
+        self._build()
+
+    def save(self):
+        if self.dirty:
+            save_json(self.path, {"version": INDEX_VERSION, "sources": self.sources, "tables": self.tables})
+            self.dirty = False
+
+    def _in_project(self, path):
+        return path.startswith(str(self.root) + os.sep)
+
+    def _build(self):
+        self.definitions = {}; self.usages = {}
+        for path, entry in self.tables.items():
+            if not self._in_project(path): continue
+            for key_id, _ in entry["items"]:
+                self.definitions.setdefault(key_id.lower(), []).append((path, key_id))
+        for path, entry in self.sources.items():
+            if not self._in_project(path): continue
+            for key, line in entry["items"]:
+                self.usages.setdefault(key.lower(), []).append((path, line))
+
+    @property
+    def stringtables(self):
+        return sorted(p for p in self.tables if self._in_project(p))
+
+    def missing(self):
+        """Keys used in code but defined in no stringtable."""
+        return sorted(k for k in self.usages if k not in self.definitions)
+
+    def unused(self):
+        """Keys defined in a stringtable but never referenced in code."""
+        return sorted(k for k in self.definitions if k not in self.usages)
+
+    def duplicates(self):
+        """Keys defined more than once across the project's stringtables."""
+        return sorted(k for k, defs in self.definitions.items() if len(defs) > 1)
+
+    def files_using(self, keys):
+        """Source files referencing any of the given keys (only meaningful for keys where is_indexed_key holds)."""
+        return sorted({path for k in keys for path, _ in self.usages.get(k.lower(), ())})
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: string_index.py <project_path> [STR_key...]")
+        sys.exit(1)
+    index = LocalizationIndex(sys.argv[1])
+    print(f"📚 {len(index.definitions)} keys in {len(index.stringtables)} stringtable(s), {sum(len(u) for u in index.usages.values())} usages")
+    for key in sys.argv[2:]:
+        for path, key_id in index.definitions.get(key.lower(), []): print(f"  defined: {key_id} in {path}")
+        for path, line in index.usages.get(key.lower(), []): print(f"  used:    {path}:{line}")
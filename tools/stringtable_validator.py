@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 
 import fnmatch
+import io
 import os
 import sys
 import xml.etree.ElementTree as ET
 import argparse
 import re
+import time
 from pathlib import Path
+from cache_utils import atomic_write
+from string_index import LocalizationIndex, is_indexed_key
 
 # STRINGTABLE VALIDATOR & FIXER
 # ---------------------
@@ -15,29 +19,62 @@ from pathlib import Path
 
 PROJECT_NAME = "AFM"
 
-def fix_source_code(root_dir, old_id, new_id):
-    """Refactors code references when an ID changes."""
-    count = 0
-    # Scan only relevant file types
-    exts = {".cpp", ".hpp", ".sqf", ".ext"}
-    
-    for path in Path(root_dir).rglob("*"):
-        if path.suffix not in exts: continue
-        if ".git" in str(path) or ".hemtt" in str(path): continue
-        
+SOURCE_EXTS = {".cpp", ".hpp", ".sqf", ".ext"}
+SKIP_DIRS = (".git", ".hemtt", ".uksf_cache")
+
+def compile_renames(renames):
+    """
+    One alternation matching every old ID as a whole token (no partial hits such as
+    STR_Old inside STR_Old_Extra). Longest IDs first so overlapping prefixes resolve correctly.
+    """
+    alts = b"|".join(re.escape(old.encode("utf-8")) for old in sorted(renames, key=len, reverse=True))
+    return re.compile(rb"(?<![A-Za-z0-9_])(?:" + alts + rb")(?![A-Za-z0-9_])")
+
+def _source_files(root_dir):
+    for dirpath, dirs, names in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(SKIP_DIRS)]
+        for name in names:
+            if os.path.splitext(name)[1] in SOURCE_EXTS: yield os.path.join(dirpath, name)
+
+def fix_source_code(root_dir, renames, paths=None):
+    """
+    Applies all ID renames in a single pass over the source tree, or only over 'paths'
+    when the caller already knows which files reference the old IDs.
+    Files are matched as bytes (encoding is preserved) and each changed file is written once, atomically.
+    Returns (files_changed, references_replaced).
+    """
+    if not renames: return 0, 0
+    pattern = compile_renames(renames)
+    lookup = {old.encode("utf-8"): new.encode("utf-8") for old, new in renames.items()}
+    # Cheap pre-filter: every old ID shares this prefix (usually 'STR_')
+    prefix = os.path.commonprefix(list(renames)).encode("utf-8")
+    files = 0; refs = 0
+    for path in (paths if paths is not None else _source_files(root_dir)):
         try:
-            content = path.read_text(encoding='utf-8', errors='ignore')
-            if old_id in content:
-                # Use word boundary check to avoid partial replacements
-                # Need to be careful: "STR_Old" should replace, but "STR_Old_Extra" shouldn't if we matched "STR_Old"
-                # Using simple replace for now as IDs are usually unique enough
-                new_content = content.replace(old_id, new_id)
-                path.write_text(new_content, encoding='utf-8')
-                count += 1
-        except: pass
-    return count
-
-def check_and_fix_stringtable(filepath, fix_mode=False):
+            with open(path, "rb") as f: data = f.read()
+        except OSError: continue
+        if prefix and prefix not in data: continue
+        hits = 0
+        def swap(m):
+            nonlocal hits
+            hits += 1
+            return lookup[m.group()]
+        new_data = pattern.sub(swap, data)
+        if hits:
+            atomic_write(path, new_data)
+            files += 1; refs += hits
+    return files, refs
+
+def rename_users(repo_root, renames, index_path=None):
+    """
+    Source files that reference the old IDs, from the localization index. None (walk every
+    source file) when an old ID is one the index does not track, e.g. 'Legacy_Hello'.
+    """
+    if not all(is_indexed_key(old) for old in renames): return None
+    return LocalizationIndex(repo_root, index_path).files_using(renames)
+
+def check_and_fix_stringtable(filepath, fix_mode=False, renames=None):
+    """Validates one stringtable; in fix mode, ID renames are collected into 'renames' for a later single source pass."""
     try:
         parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
         tree = ET.parse(filepath, parser)
@@ -123,16 +160,13 @@ def check_and_fix_stringtable(filepath, fix_mode=False):
                 
                 new_id = f"{expected_prefix}{suffix}"
                 
-                # Check for collision? (Unlikely if 1:1 mapping)
-                key.set("ID", new_id)
-                modified = True
-                
-                # Update Code References
-                # We search from the Component Root (one level up from filepath usually?)
-                # Actually, search the whole "addons" folder just in case.
-                repo_root = Path(filepath).parent.parent.parent 
-                refs = fix_source_code(repo_root, old_id, new_id)
-                print(f"    ✅ Renamed to {new_id} (Updated {refs} files)")
+                if renames is not None and renames.get(old_id, new_id) != new_id:
+                    print(f"    ⚠️  '{old_id}' is already renamed to {renames[old_id]}; skipping.")
+                else:
+                    key.set("ID", new_id)
+                    modified = True
+                    if renames is not None: renames[old_id] = new_id
+                    print(f"    ✅ Renamed to {new_id}")
 
         # 3b. Fix "Original" tag (Remove it)
         original = key.find("Original")
@@ -159,7 +193,9 @@ def check_and_fix_stringtable(filepath, fix_mode=False):
                     print("    ✅ Reordered English to top.")
 
     if modified:
-        tree.write(filepath, encoding="utf-8", xml_declaration=True)
+        out = io.BytesIO()
+        tree.write(out, encoding="utf-8", xml_declaration=True)
+        atomic_write(filepath, out.getvalue())
         print(f"  💾 Saved changes to {filepath}")
 
     return errors
@@ -174,11 +210,21 @@ def main():
     print("-----------------------")
     
     bad_count = 0
+    # Source root (project folder above addons/<component>/) -> {old ID: new ID}
+    renames_by_root = {}
     for root, _, files in os.walk(args.target):
         if "stringtable.xml" in files:
             path = os.path.join(root, "stringtable.xml")
             print(f"\nChecking {path}...")
-            bad_count += check_and_fix_stringtable(path, args.fix)
+            renames = renames_by_root.setdefault(str(Path(path).resolve().parent.parent.parent), {})
+            bad_count += check_and_fix_stringtable(path, args.fix, renames)
+
+    for repo_root, renames in renames_by_root.items():
+        if not renames: continue
+        start = time.perf_counter()
+        # The localization index usually knows which files mention the old IDs
+        files, refs = fix_source_code(repo_root, renames, rename_users(repo_root, renames))
+        print(f"\n🔁 Applied {len(renames)} ID renames: {refs} references in {files} files ({time.perf_counter() - start:.2f}s)")
 
     if bad_count == 0:
         print("\n✅ All Stringtables Validated.")
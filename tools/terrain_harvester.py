@@ -5,9 +5,11 @@ import sys
 import subprocess
 import shutil
 import re
-import math
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PIL import Image
+from tile_dedup import dedupe_tiles
+from tile_pyramid import TILE_SIZE, TileWriter, build_from_image, build_lower_levels, half, save_tile, tile_path
 
 def convert_paa_to_png(paa_path, png_path):
     """Converts a PAA file to PNG using HEMTT."""
@@ -15,7 +17,22 @@ def convert_paa_to_png(paa_path, png_path):
     subprocess.run(["hemtt", "utils", "paa", "convert", str(paa_path), str(png_path)], 
                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-def generate_tiles_from_pbo(pbo_path, theatre_name, web_root):
+def _convert_layer_tile(task):
+    """Worker: PAA layer tile -> top-zoom web tile. Returns (x, y, half-size image for the parent level)."""
+    paa_path, x_idx, y_idx, output_dir, zoom = task
+    temp_png = Path(paa_path).with_suffix(".png")
+    convert_paa_to_png(paa_path, temp_png)
+    if not temp_png.exists(): return x_idx, y_idx, None
+    with Image.open(temp_png) as src:
+        img = src.convert("RGBA")
+    os.remove(temp_png)
+    # Resize to web standard 256x256 if needed (Arma tiles vary)
+    if img.size != (TILE_SIZE, TILE_SIZE):
+        img = img.resize((TILE_SIZE, TILE_SIZE), Image.LANCZOS)
+    save_tile(img, tile_path(output_dir, zoom, x_idx, y_idx))
+    return x_idx, y_idx, half(img)
+
+def generate_tiles_from_pbo(pbo_path, theatre_name, web_root, top_zoom=5, jobs=None):
     print(f"🕵️  [Terrain Ripper] Targeting PBO: {pbo_path}")
     
     pbo_path = Path(pbo_path)
@@ -76,83 +93,47 @@ def generate_tiles_from_pbo(pbo_path, theatre_name, web_root):
     print(f"  └─ Grid Dimensions: {max_x + 1}x{max_y + 1} tiles")
 
     # 3. Virtual Stitching & Web Tiling
-    # Instead of making one giant image, we process the Arma tiles directly into Web tiles
-    # Arma tiles are usually 512px or 1024px. Web tiles are 256px.
-    # This means we just need to resize/split the Arma tiles.
-    
+    # Instead of making one giant image, we process the Arma tiles directly into Web tiles.
+    # Arma tiles are usually 512px or 1024px; each becomes one 256px tile of the top zoom
+    # level, and the lower levels are merged from those without re-reading the PBO.
+
     output_dir = Path(web_root) / "static" / "theatre" / theatre_name
     if output_dir.exists(): shutil.rmtree(output_dir)
-    
-    # We treat the Arma grid as Zoom Level X (depending on resolution)
-    # For simplicity, we'll assume the Arma grid corresponds to Zoom 4 or 5
-    # and just convert them directly.
-    
-    # Target Zoom Level 5 (Highest Detail)
-    z5_dir = output_dir / "5"
-    
+
+    # The Arma grid is treated as Zoom 5 (Highest Detail).
+    # Arma Y is often inverted or different origin; we map 1:1 for now, but might need flipping.
+    tasks = []
     for t in tile_files:
         match = re.search(r's_(\d+)_(\d+)_l00', t.name.lower())
-        x_idx = int(match.group(1))
-        y_idx = int(match.group(2))
-        
-        # Convert PAA to PNG
-        temp_png = t.with_suffix(".png")
-        convert_paa_to_png(t, temp_png)
-        
-        if temp_png.exists():
-            img = Image.open(temp_png)
-            # Resize to web standard 256x256 if needed (Arma tiles vary)
-            if img.size != (256, 256):
-                img = img.resize((256, 256), Image.LANCZOS)
-            
-            # Save to web structure
-            # Arma Y is often inverted or different origin. 
-            # We map 1:1 for now, but might need flipping.
-            target_x = z5_dir / str(x_idx)
-            target_x.mkdir(parents=True, exist_ok=True)
-            img.save(target_x / f"{y_idx}.png")
-            
-            os.remove(temp_png)
-            print(f"    Processed Tile: {x_idx},{y_idx}", end="\r")
+        tasks.append((str(t), int(match.group(1)), int(match.group(2)), str(output_dir), top_zoom))
+
+    halves = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_convert_layer_tile, task) for task in tasks]
+        for i, future in enumerate(as_completed(futures)):
+            x_idx, y_idx, half_img = future.result()
+            if half_img is not None: halves[(x_idx, y_idx)] = half_img
+            print(f"    Processed Tile: {i + 1}/{len(tasks)}", end="\r")
+    print(f"\n  └─ Zoom {top_zoom}: {len(halves)} tiles ({len(tasks) - len(halves)} failed to convert)")
+
+    with TileWriter(output_dir, jobs) as writer:
+        build_lower_levels(halves, top_zoom, writer)
+    # The top level was written by the workers; share its duplicate tiles too
+    dedupe_tiles(output_dir)
 
     print(f"\n✅ Extraction Complete. {theatre_name} is now archived.")
     shutil.rmtree(temp_dir)
 
-def generate_tiles_from_image(image_path, theatre_name, web_root, tile_size=256, max_zoom=5):
-    """Standard image slicer."""
-    # (Previous implementation preserved here...)
-    # I'll just call the new logic if it's a PBO
+def generate_tiles_from_image(image_path, theatre_name, web_root, tile_size=256, max_zoom=5, jobs=None):
+    """Standard image slicer; PBOs are routed to the layer ripper."""
     if str(image_path).endswith(".pbo"):
-        generate_tiles_from_pbo(image_path, theatre_name, web_root)
+        generate_tiles_from_pbo(image_path, theatre_name, web_root, max_zoom, jobs)
         return
 
-    # ... Original logic ...
-    # Re-implementing simplified for context:
     print(f"🗺️  [Intelligence Harvester] Slicing imagery for: {theatre_name}")
     output_dir = Path(web_root) / "static" / "theatre" / theatre_name
     if output_dir.exists(): shutil.rmtree(output_dir)
-    img = Image.open(image_path)
-    width, height = img.size
-    for zoom in range(max_zoom + 1):
-        scale = 1.0 / (2 ** zoom)
-        z_dir = output_dir / str(max_zoom - zoom)
-        z_dir.mkdir(parents=True, exist_ok=True)
-        z_width = int(width * scale)
-        z_height = int(height * scale)
-        z_img = img.resize((z_width, z_height), Image.LANCZOS)
-        cols = math.ceil(z_width / tile_size)
-        rows = math.ceil(z_height / tile_size)
-        for x in range(cols):
-            x_dir = z_dir / str(x)
-            x_dir.mkdir(exist_ok=True)
-            for y in range(rows):
-                left = x * tile_size; top = y * tile_size
-                right = min(left + tile_size, z_width); bottom = min(top + tile_size, z_height)
-                tile = z_img.crop((left, top, right, bottom))
-                if tile.size != (tile_size, tile_size):
-                    bg = Image.new('RGBA', (tile_size, tile_size), (0, 0, 0, 0))
-                    bg.paste(tile, (0, 0)); tile = bg
-                tile.save(x_dir / f"{y}.png")
+    build_from_image(image_path, output_dir, tile_size, max_zoom, jobs)
     print(f"✅ Intelligence Harvested! Theatre '{theatre_name}' is now locally cached.")
 
 if __name__ == "__main__":
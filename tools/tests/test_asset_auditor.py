@@ -0,0 +1,23 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asset_auditor
+
+class TestAssetAuditor(unittest.TestCase):
+
+    def test_code_only_scope_still_checks_vfs_links(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            addon = os.path.join(tmp, "addons", "main")
+            os.makedirs(addon)
+            with open(os.path.join(addon, "$PBOPREFIX$"), "w") as f: f.write("z\\uksfta\\addons\\main")
+            with open(os.path.join(addon, "fn_icon.sqf"), "w") as f: f.write('_icon = "\\z\\uksfta\\addons\\main\\data\\gone.paa";\n')
+            self.assertFalse(asset_auditor.audit_project_assets(tmp, only_addons={"main"}))
+            # The full audit keeps passing projects without binary assets
+            self.assertTrue(asset_auditor.audit_project_assets(tmp))
+
+if __name__ == "__main__":
+    unittest.main()
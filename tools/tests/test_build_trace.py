@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import build_trace
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build_trace.py")
+
+class TestBuildTrace(unittest.TestCase):
+
+    def test_stage_records_measured_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "a.pbo"), "wb") as f: f.write(b"x" * 10)
+            tracer = build_trace.Tracer(os.path.join(tmp, "trace.json"))
+            with tracer.stage("hemtt", path=tmp, threads=4):
+                pass
+            with tracer.stage("create_vdf") as stage:
+                stage["files"] = 2
+            hemtt, vdf = tracer.events[1:]
+            self.assertEqual(hemtt["args"], {"threads": 4, "files": 1, "bytes": 10})
+            # Values set by the caller win over measuring
+            self.assertEqual(vdf["args"], {"files": 2})
+
+    def test_build_stages_nest_in_chrome_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            events = os.path.join(tmp, "stages.jsonl")
+            tracer = build_trace.Tracer(os.path.join(tmp, "out", "trace.json"))
+            with tracer.stage("build.sh release"):
+                # As build.sh calls it around each of its own stages
+                start = str(build_trace.time.time_ns())
+                subprocess.run([sys.executable, SCRIPT, "record", events, "hemtt", start, str(build_trace.time.time_ns()), tmp], check=True)
+                with open(events, "a") as f: f.write("not json\n\n")
+                subprocess.run([sys.executable, SCRIPT, "record", events, "zip", start, str(build_trace.time.time_ns())], check=True)
+            self.assertEqual(tracer.import_events(events), 2)
+            self.assertEqual(tracer.import_events(os.path.join(tmp, "missing.jsonl")), 0)
+
+            with open(tracer.save()) as f: trace = json.load(f)
+            self.assertEqual(trace["displayTimeUnit"], "ms")
+            meta, outer, *inner = trace["traceEvents"]
+            self.assertEqual((meta["ph"], meta["args"]), ("M", {"name": "release"}))
+            self.assertEqual([e["name"] for e in inner], ["hemtt", "zip"])
+            for e in inner:
+                self.assertEqual((e["ph"], e["pid"], e["tid"]), ("X", outer["pid"], 1))
+                self.assertGreaterEqual(e["ts"], outer["ts"])
+                self.assertLessEqual(e["ts"] + e["dur"], outer["ts"] + outer["dur"] + 1)
+            self.assertIn("files", inner[0]["args"])
+            self.assertNotIn("files", inner[1]["args"])
+
+            lines = tracer.summary().splitlines()
+            self.assertTrue(lines[0].startswith("  build.sh release"))
+            self.assertTrue(lines[1].startswith("    hemtt"))
+            self.assertIn("  - files", lines[2])
+
+    def test_record_cli_usage(self):
+        res = subprocess.run([sys.executable, SCRIPT, "record", "events.jsonl"], capture_output=True, text=True)
+        self.assertEqual(res.returncode, 1)
+        self.assertIn("Usage", res.stdout)
+
+if __name__ == "__main__":
+    unittest.main()
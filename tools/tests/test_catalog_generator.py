@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import catalog_generator
+
+def write_config(project, addon, classes):
+    path = project / "addons" / addon / "config.cpp"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = "".join(f'class {c} : Base {{ scope = 2; displayName = "{c} Name"; }};\n' for c in classes)
+    path.write_text("class CfgVehicles {\n class Base;\n" + body + "};\n")
+    return path
+
+class TestCatalogGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        self.projects = [self.root / "UKSFTA-Mods", self.root / "UKSFTA-Maps"]
+        cache = lambda name: self.root / name
+        patches = [
+            patch("catalog_generator.get_projects", lambda: self.projects),
+            patch("catalog_generator.cache_path", cache),
+            patch("catalog_generator.OUTPUT_DIR", self.root),
+            patch("config_parser.cache_path", cache),
+            patch("config_parser._cache", None),
+            patch("config_parser._cache_dirty", False),
+            patch("builtins.print"),
+        ]
+        for p in patches:
+            p.start(); self.addCleanup(p.stop)
+
+    def cached(self):
+        return json.loads((self.root / catalog_generator.CACHE_FILE).read_text())
+
+    def test_only_changed_configs_are_reparsed(self):
+        main = write_config(self.projects[0], "main", ["UKSFTA_Truck"])
+        write_config(self.projects[0], "gear", ["UKSFTA_Vest"])
+        write_config(self.projects[1], "terrain", ["UKSFTA_Tree"])
+        catalog_generator.generate_catalog()
+        assets = json.loads((self.root / "unit_assets.json").read_text())
+        self.assertEqual(sorted(a["className"] for a in assets), ["UKSFTA_Tree", "UKSFTA_Truck", "UKSFTA_Vest"])
+        self.assertEqual(len(self.cached()), 3)
+
+        # Unchanged: nothing is parsed
+        with patch("catalog_generator._parse_stale") as parse_stale:
+            catalog_generator.generate_catalog()
+            parse_stale.assert_not_called()
+
+        write_config(self.projects[0], "main", ["UKSFTA_Truck", "UKSFTA_Boat"])
+        os.utime(main, ns=(0, 1))
+        with patch("catalog_generator._parse_stale", wraps=catalog_generator._parse_stale) as parse_stale:
+            catalog_generator.generate_catalog()
+            parse_stale.assert_called_once_with([str(main)])
+        self.assertEqual(self.cached()[str(main)]["sig"], catalog_generator.file_signature(main))
+        assets = json.loads((self.root / "unit_assets.json").read_text())
+        self.assertIn("UKSFTA_Boat", {a["className"] for a in assets})
+
+    def test_removed_configs_are_pruned(self):
+        write_config(self.projects[0], "main", ["UKSFTA_Truck"])
+        gone = write_config(self.projects[1], "terrain", ["UKSFTA_Tree"])
+        catalog_generator.generate_catalog()
+        self.assertIn(str(gone), self.cached())
+
+        gone.unlink()
+        catalog_generator.generate_catalog()
+        self.assertEqual(list(self.cached()), [str(self.projects[0] / "addons" / "main" / "config.cpp")])
+        assets = json.loads((self.root / "unit_assets.json").read_text())
+        self.assertEqual([a["className"] for a in assets], ["UKSFTA_Truck"])
+
+    def test_write_if_changed(self):
+        out = self.root / "catalog.md"
+        header = catalog_generator.CATALOG_HEADER
+        self.assertTrue(catalog_generator.write_if_changed(out, header + "1*\n| a |", ignore_prefix=header))
+        mtime = out.stat().st_mtime_ns
+        # Only the ignored timestamp line differs
+        self.assertFalse(catalog_generator.write_if_changed(out, header + "2*\n| a |", ignore_prefix=header))
+        self.assertEqual(out.stat().st_mtime_ns, mtime)
+        self.assertEqual(out.read_text(), header + "1*\n| a |")
+        self.assertTrue(catalog_generator.write_if_changed(out, header + "3*\n| b |", ignore_prefix=header))
+        self.assertEqual(out.read_text(), header + "3*\n| b |")
+        # Without a prefix the header counts
+        self.assertTrue(catalog_generator.write_if_changed(out, header + "4*\n| b |"))
+
+if __name__ == "__main__":
+    unittest.main()
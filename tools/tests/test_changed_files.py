@@ -0,0 +1,31 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from changed_files import IncludeGraph
+
+class TestIncludeGraph(unittest.TestCase):
+
+    def write(self, root, rel, text):
+        path = os.path.join(root, *rel.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f: f.write(text)
+        return path
+
+    def test_transitive_dependants(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            macros = self.write(tmp, "addons/main/script_macros.hpp", "#define X 1\n")
+            component = self.write(tmp, "addons/main/script_component.hpp", '#include "\\z\\uksfta\\addons\\main\\script_macros.hpp"\n')
+            config = self.write(tmp, "addons/main/config.cpp", '#include "script_component.hpp"\nclass CfgPatches {};\n')
+            function = self.write(tmp, "addons/main/functions/fn_test.sqf", '#include "..\\script_component.hpp"\n')
+            self.write(tmp, "addons/other/config.cpp", "class CfgPatches {};\n")
+
+            graph = IncludeGraph([tmp], os.path.join(tmp, "graph.json"))
+            self.assertEqual(graph.dependants([macros]), {component, config, function})
+            self.assertEqual(graph.dependants([config]), set())
+
+if __name__ == "__main__":
+    unittest.main()
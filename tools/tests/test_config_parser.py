@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config_parser
+
+SAMPLE = r'''
+#include "script_component.hpp"
+#define MULTI(x) \
+    class x {};
+class CfgPatches {
+    class uksfta_main {
+        units[] = {};
+        requiredAddons[] = {"A3_Data_F", "cba_main"};
+        requiredVersion = 2.10;
+        author = "Say ""Hello""";
+    };
+};
+/* class Commented : Base { scope = 2; }; */
+class CfgWeapons {
+    class Vest_Camo_Base;
+    class UKSFTA_Vest : Vest_Camo_Base {
+        scope = 2; // public
+        displayName = "Plate Carrier";
+        class ItemInfo : VestItem { scope = 0; displayName = "Nested"; };
+        hiddenSelectionsTextures[] = {"\z\uksfta\a.paa", {1, -2.5}};
+        magazines[] += {"mag_1"};
+    };
+    delete Old_Vest;
+};
+'''
+
+class TestConfigParser(unittest.TestCase):
+
+    def setUp(self):
+        self.root = config_parser.parse(SAMPLE)
+
+    def test_patches_and_arrays(self):
+        patch_cls = self.root.find("CfgPatches", "uksfta_main")
+        self.assertEqual(patch_cls.get("requiredAddons"), ["A3_Data_F", "cba_main"])
+        self.assertEqual(patch_cls.get("requiredVersion"), 2.10)
+        self.assertEqual(patch_cls.get("author"), 'Say "Hello"')
+
+    def test_inheritance_and_nesting(self):
+        vest = self.root.find("CfgWeapons", "uksfta_vest")
+        self.assertEqual(vest.parent, "Vest_Camo_Base")
+        self.assertEqual(vest.get("SCOPE"), 2)
+        # Nested properties belong to the nested class, not to the vest
+        self.assertEqual(vest.get("displayName"), "Plate Carrier")
+        self.assertEqual(vest.child("ItemInfo").get("displayName"), "Nested")
+        self.assertEqual(vest.get("hiddenSelectionsTextures"), ["\\z\\uksfta\\a.paa", [1, -2.5]])
+        self.assertTrue(vest.get("magazines").append)
+
+    def test_extern_delete_and_comments(self):
+        weapons = self.root.find("CfgWeapons")
+        self.assertTrue(weapons.child("Vest_Camo_Base").extern)
+        self.assertEqual(weapons.deleted, ["Old_Vest"])
+        names = [c.name for _, c in self.root.walk()]
+        self.assertNotIn("Commented", names)
+        # The continuation line of the #define belongs to the macro, not the tree
+        self.assertNotIn("x", names)
+
+    def test_load_config_uses_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = Path(tmp) / "config.cpp"
+            cfg.write_text(SAMPLE)
+            with patch("config_parser.cache_path", return_value=Path(tmp) / "cache.pickle"), \
+                 patch("config_parser._cache", None):
+                first = config_parser.load_config(cfg)
+                with patch("config_parser.parse") as mock_parse:
+                    second = config_parser.load_config(cfg)
+                    mock_parse.assert_not_called()
+                self.assertIs(first, second)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import os
+import sys
+import random
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config_style_checker as csc
+
+CASES = [
+    'class A {\n  x[] = {1,(2};\n  y = "(";\n  /* ( */ z = (1];\n};\n}',
+    '/* a */ x = 1; /*/ still code? */ y = (1];',
+    "s = 'it''s ( fine'; // ) [\nq = [1, 2);",
+    'unterminated = "abc\n(\n[',
+    '/* never closed (',
+]
+
+class TestConfigStyleChecker(unittest.TestCase):
+
+    def test_matches_reference_scanner(self):
+        for case in CASES:
+            self.assertEqual(csc.scan_config_style(case), csc.scan_config_style_reference(case), case)
+
+    def test_matches_reference_on_random_input(self):
+        rng = random.Random(7)
+        alphabet = ['(', ')', '[', ']', '{', '}', '"', "'", '/', '*', '\n', 'a', '/*', '*/', '//']
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            self.assertEqual(csc.scan_config_style(text), csc.scan_config_style_reference(text), repr(text))
+
+    def test_generated_config(self):
+        content = csc.generate_benchmark_config(0.05)
+        self.assertEqual(csc.scan_config_style(content), [])
+
+if __name__ == "__main__":
+    unittest.main()
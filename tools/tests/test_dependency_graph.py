@@ -0,0 +1,42 @@
+import unittest
+import os
+import sys
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dependency_graph
+
+class TestDependencyGraph(unittest.TestCase):
+
+    def test_each_cycle_reported_once(self):
+        graph = {
+            "UKSFTA-A": {"patches": [], "deps": {"UKSFTA-B"}},
+            "UKSFTA-B": {"patches": [], "deps": {"UKSFTA-C"}},
+            "UKSFTA-C": {"patches": [], "deps": {"UKSFTA-A", "UKSFTA-D"}},
+            "UKSFTA-D": {"patches": [], "deps": set()},
+        }
+        cycles = dependency_graph.find_circular_dependencies(graph)
+        self.assertEqual(cycles, [["UKSFTA-A", "UKSFTA-B", "UKSFTA-C", "UKSFTA-A"]])
+
+    def test_minimal_cycle_inside_dense_component(self):
+        # a <-> b plus a longer loop through c: the reported cycle is the shortest one
+        adjacency = {"a": {"b", "c"}, "b": {"a"}, "c": {"d"}, "d": {"a"}}
+        self.assertEqual(dependency_graph.find_cycles(adjacency), [["a", "b", "a"]])
+
+    def test_acyclic_graph(self):
+        adjacency = {"a": {"b"}, "b": {"c"}, "c": set()}
+        self.assertEqual(dependency_graph.find_cycles(adjacency), [])
+        self.assertEqual(len(dependency_graph.strongly_connected_components(adjacency)), 3)
+
+    def test_topological_waves(self):
+        adjacency = {"scripts": set(), "mods": {"scripts"}, "maps": {"scripts"}, "ops": {"mods", "maps"}}
+        waves, blocked = dependency_graph.topological_waves(adjacency)
+        self.assertEqual(waves, [["scripts"], ["maps", "mods"], ["ops"]])
+        self.assertEqual(blocked, [])
+        # Nodes on or behind a cycle cannot be placed
+        waves, blocked = dependency_graph.topological_waves({"a": {"b"}, "b": {"a"}, "c": {"a"}, "d": set()})
+        self.assertEqual(waves, [["d"]])
+        self.assertEqual(blocked, ["a", "b", "c"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import re
+import sys
+import json
+import tempfile
+import threading
+from unittest import mock
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import intel_mirror
+except ImportError:
+    intel_mirror = None
+
+TILE_RE = re.compile(r"/tiles/([^/]+)/(\d+)/(\d+)/(\d+)\.png$")
+
+class FakeSources:
+    """
+    Stands in for fetch_tile. 'have' maps a theatre to (source substring, zoom depth, columns
+    covered at each zoom as a fraction); 'fail' maps URLs to how many times they error first.
+    """
+
+    def __init__(self, have, fail=None, stop_after=None):
+        self.have = have
+        self.fail = dict(fail or {})
+        self.stop_after = stop_after
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, session, url, dest):
+        with self.lock:
+            self.calls.append(url)
+            if self.stop_after is not None and len(self.calls) > self.stop_after:
+                raise KeyboardInterrupt
+            if self.fail.get(url):
+                self.fail[url] -= 1
+                return "error", 0
+        theatre, z, x, y = TILE_RE.search(url).groups()
+        z, x = int(z), int(x)
+        entry = self.have.get(theatre)
+        if entry is None or entry[0] not in url: return "missing", 0
+        _, depth, share = entry
+        if z > depth or x >= max(1, int((1 << z) * share)): return "missing", 0
+        intel_mirror.atomic_write(dest, b"tile " + url.encode())
+        return "ok", 16
+
+@unittest.skipUnless(intel_mirror, "requests is not installed")
+class TestIntelMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.web = self.tmp.name
+        patches = [
+            mock.patch.object(intel_mirror, "cache_path", lambda name: os.path.join(self.web, name)),
+            mock.patch.object(intel_mirror, "BACKOFF", 0.0),
+            mock.patch.object(intel_mirror, "dedupe_tiles", lambda *a, **k: None),
+            mock.patch("builtins.print"),
+        ]
+        for p in patches:
+            p.start(); self.addCleanup(p.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_mirror(self, fake, names, **limits):
+        with mock.patch.object(intel_mirror, "fetch_tile", fake):
+            return intel_mirror.mirror_theatres(names, self.web, max_zoom=3, **limits)
+
+    def tiles_on_disk(self, theatre):
+        root = os.path.join(self.web, "static", "theatre", theatre)
+        return {os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files if f.endswith(".png")}
+
+    def test_quadtree_is_pruned_and_finished_theatres_skipped(self):
+        # Only the second source has it, left half of the grid, down to z2
+        have = {"altis": ("jetelain", 2, 0.5)}
+        fake = FakeSources(have)
+        self.assertEqual(self.run_mirror(fake, ["altis"]), {"altis": "done"})
+        # z0, 1x2 tiles at z1 and 2x4 at z2 exist; besides the failed probe on the first source,
+        # only those tiles and their children (to max_zoom 3) were asked for, each once
+        self.assertEqual(len(self.tiles_on_disk("altis")), 1 + 2 + 8)
+        self.assertEqual(len(fake.calls), 1 + 1 + 4 + 2 * 4 + 8 * 4)
+        self.assertEqual(len(fake.calls), len(set(fake.calls)))
+
+        # Completed: nothing is requested again
+        again = FakeSources(have)
+        self.assertEqual(self.run_mirror(again, ["altis"]), {"altis": "skipped"})
+        self.assertEqual(again.calls, [])
+
+    def test_theatre_complete_on_disk_without_manifest(self):
+        # As mirrored by the old tool: every tile down to max_zoom present, no .mirror.json
+        have = {"altis": ("plan-ops", 3, 1.0)}
+        self.run_mirror(FakeSources(have), ["altis"])
+        manifest = os.path.join(self.web, "static", "theatre", "altis", intel_mirror.MANIFEST_FILE)
+        os.remove(manifest)
+
+        fake = FakeSources(have)
+        self.assertEqual(self.run_mirror(fake, ["altis"]), {"altis": "done"})
+        self.assertEqual(fake.calls, [])
+        self.assertTrue(json.load(open(manifest))["complete"])
+        self.assertEqual(self.run_mirror(FakeSources(have), ["altis"]), {"altis": "skipped"})
+
+    def test_interrupted_run_resumes_where_it_stopped(self):
+        have = {"altis": ("plan-ops", 3, 1.0)}
+        first = FakeSources(have, stop_after=20)
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_mirror(first, ["altis"], workers=1)
+        progress = json.load(open(os.path.join(self.web, intel_mirror.PROGRESS_FILE)))
+        self.assertEqual([e["status"] for e in progress.values()], ["partial"])
+        fetched = self.tiles_on_disk("altis")
+
+        second = FakeSources(have)
+        self.assertEqual(self.run_mirror(second, ["altis"]), {"altis": "done"})
+        self.assertEqual(len(self.tiles_on_disk("altis")), 1 + 4 + 16 + 64)
+        # Tiles from the first run were not downloaded again
+        refetched = {TILE_RE.search(u).group(0) for u in second.calls}
+        self.assertFalse({"/tiles/altis/" + t for t in fetched} & refetched)
+
+    def test_errors_are_retried_with_backoff(self):
+        have = {"altis": ("plan-ops", 1, 1.0)}
+        flaky = "https://tiles.plan-ops.fr/tiles/altis/1/1/1.png"
+        fake = FakeSources(have, fail={flaky: 2})
+        self.assertEqual(self.run_mirror(fake, ["altis"], retries=2), {"altis": "done"})
+        self.assertEqual(fake.calls.count(flaky), 3)
+
+        # Out of retries: the theatre stays incomplete and the tile is asked for on the next run
+        other = {"stratis": ("plan-ops", 1, 1.0)}
+        flaky = "https://tiles.plan-ops.fr/tiles/stratis/1/0/1.png"
+        self.assertEqual(self.run_mirror(FakeSources(other, fail={flaky: 5}), ["stratis"], retries=1), {"stratis": "partial"})
+        retry = FakeSources(other)
+        self.assertEqual(self.run_mirror(retry, ["stratis"]), {"stratis": "done"})
+        # Only the failed tile and its children
+        self.assertEqual(sorted(TILE_RE.search(u).group(0) for u in retry.calls),
+                         ["/tiles/stratis/1/0/1.png"] + [f"/tiles/stratis/2/{x}/{y}.png" for x in (0, 1) for y in (2, 3)])
+
+    def test_unreachable_source_is_not_cached_as_unavailable(self):
+        down = "https://tiles.plan-ops.fr/tiles/altis/0/0/0.png"
+        fake = FakeSources({}, fail={down: 10})
+        self.assertEqual(self.run_mirror(fake, ["altis", "nowhere"], retries=1), {"altis": "partial", "nowhere": "unavailable"})
+        again = FakeSources({})
+        self.assertEqual(self.run_mirror(again, ["altis", "nowhere"]), {"altis": "unavailable", "nowhere": "skipped"})
+        self.assertTrue(all("/altis/" in u for u in again.calls))
+
+    def test_token_bucket_sleeps_off_overdraft(self):
+        bucket = intel_mirror.TokenBucket(1000)
+        with mock.patch.object(intel_mirror.time, "sleep") as sleep:
+            bucket.consume(500)
+            sleep.assert_not_called()
+            bucket.consume(1000)
+            self.assertAlmostEqual(sleep.call_args[0][0], 0.5, places=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lint_engine
+
+class TestLintEngine(unittest.TestCase):
+
+    def test_results_cached_per_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp) / "UKSFTA-Test"
+            funcs = project / "addons" / "main" / "functions"
+            funcs.mkdir(parents=True)
+            (funcs / "fn_good.sqf").write_text('params ["_a"]; hint str _a;')
+            (funcs / "fn_bad.sqf").write_text('if (true) then {\n    hint "x";\n')
+            (project / "addons" / "main" / "config.cpp").write_text("class CfgPatches { class main { x[] = {1, (2}; }; };")
+
+            with patch("lint_engine.cache_path", return_value=Path(tmp) / "lint_cache.json"):
+                report, stats = lint_engine.run_lint([project], jobs=1, quiet=True)
+                self.assertEqual(stats["linted"], 3)
+                bad = str(funcs / "fn_bad.sqf")
+                self.assertEqual(report[bad]["sqf-syntax"][0][:2], [1, 16])
+                self.assertIn("config-style", report[str(project / "addons" / "main" / "config.cpp")])
+
+                report, stats = lint_engine.run_lint([project], jobs=1, quiet=True)
+                self.assertEqual((stats["linted"], stats["cached"]), (0, 3))
+                self.assertIn(bad, report)
+
+                (funcs / "fn_bad.sqf").write_text('if (true) then {\n    hint "x";\n};')
+                report, stats = lint_engine.run_lint([project], jobs=1, quiet=True)
+                self.assertEqual(stats["linted"], 1)
+                self.assertNotIn(bad, report)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import mission_auditor
+from test_rap_reader import rapify, make_pbo
+
+class TestMissionAuditor(unittest.TestCase):
+
+    def test_batch_audit_aggregates_missing_addons(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, addons in enumerate([["uksfta_main", "A3_Data_F"], ["uksfta_main", "mystery_mod"], ["mystery_mod"]]):
+                with open(os.path.join(tmp, f"op{i}.Altis.pbo"), "wb") as f:
+                    f.write(make_pbo([("mission.sqm", rapify([("array", "addons", addons)]))]))
+            with open(os.path.join(tmp, "broken.pbo"), "wb") as f: f.write(b"\1")
+
+            missions = mission_auditor.expand_targets([tmp])
+            self.assertEqual(len(missions), 4)
+            results = mission_auditor.audit_missions(missions, {"UKSFTA_Main"}, jobs=2)
+            self.assertEqual([os.path.basename(r["mission"]) for r in results], ["broken.pbo", "op0.Altis.pbo", "op1.Altis.pbo", "op2.Altis.pbo"])
+            self.assertIn("error", results[0])
+            self.assertEqual(results[1]["missing"], [])
+            self.assertEqual(mission_auditor.aggregate(results), {"mystery_mod": ["op1.Altis.pbo", "op2.Altis.pbo"]})
+
+    def test_addon_pbos_are_skipped_not_failed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            mission = make_pbo([("mission.sqm", rapify([("array", "addons", ["uksfta_main"])]))])
+            addon = make_pbo([("config.bin", rapify([("array", "units", [])]))])
+            for rel, data in (("missions/op.Altis.pbo", mission), ("addons/uksfta_main.pbo", addon),
+                              (".hemttout/build/addons/uksfta_main.pbo", addon), ("optionals/extra.pbo", addon)):
+                path = os.path.join(tmp, *rel.split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f: f.write(data)
+
+            missions = mission_auditor.expand_targets([tmp])
+            self.assertEqual([os.path.relpath(m, tmp) for m in missions], [os.path.join("missions", "op.Altis.pbo"), os.path.join("optionals", "extra.pbo")])
+            results = mission_auditor.audit_missions(missions, {"UKSFTA_Main"}, jobs=1)
+            self.assertEqual(results[0]["missing"], [])
+            self.assertIn("skipped", results[1])
+            self.assertNotIn("error", results[1])
+
+    def test_base_game_and_cdlc_resolve_with_an_index(self):
+        required = ["A3_Characters_F", "3DEN", "gm_core", "vn_weapons", "Characters_F_lxWS", "cba_main", "mystery_mod"]
+        result = mission_auditor.classify_requirements(required, set(), external_patches={"cba_main"})
+        self.assertEqual(result["missing"], ["mystery_mod"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+import tempfile
+import unittest.mock
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import patch_index
+from test_rap_reader import rapify, make_pbo
+
+def _cfg(*names):
+    return rapify([("class", "CfgPatches", None, [("class", n, None, []) for n in names] + [("extern", "cba_main")])])
+
+class TestPatchIndex(unittest.TestCase):
+
+    def test_index_reads_changed_pbos_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            addons = os.path.join(tmp, "addons"); os.makedirs(addons)
+            pbo_a = os.path.join(addons, "a.pbo"); pbo_b = os.path.join(addons, "b.pbo")
+            with open(pbo_a, "wb") as f: f.write(make_pbo([("config.bin", _cfg("Mod_A", "Mod_A_Sub"))]))
+            with open(pbo_b, "wb") as f: f.write(make_pbo([("sub\\config.cpp", b"class CfgPatches { class mod_b {}; };")]))
+
+            index = patch_index.PatchIndex(os.path.join(tmp, "index.json"))
+            self.assertEqual(index.update([("workshop", addons)], jobs=1), (2, 2))
+            index.save()
+            self.assertEqual(index.find("MOD_A_SUB"), pbo_a)
+            self.assertEqual(index.find("mod_b"), pbo_b)
+            self.assertIsNone(index.find("cba_main"))
+
+            index = patch_index.PatchIndex(os.path.join(tmp, "index.json"))
+            self.assertEqual(index.update([("workshop", addons)], jobs=1), (0, 2))
+            os.remove(pbo_b)
+            index.update([("workshop", addons)], jobs=1)
+            self.assertEqual(index.names("workshop"), {"mod_a", "mod_a_sub"})
+
+    def test_workspace_roots_are_build_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for rel in ("UKSFTA-Mods/addons/main", "UKSFTA-Mods/.hemttout/build/addons", "UKSFTA-Maps/.hemttout/release/addons", "Other/.hemttout/build/addons"):
+                os.makedirs(os.path.join(tmp, *rel.split("/")))
+            with unittest.mock.patch.object(patch_index, "WORKSPACE_ROOT", patch_index.Path(tmp)):
+                dirs = patch_index.workspace_build_dirs()
+            self.assertEqual([os.path.relpath(d, tmp) for d in dirs],
+                             [os.path.join("UKSFTA-Maps", ".hemttout", "release", "addons"), os.path.join("UKSFTA-Mods", ".hemttout", "build", "addons")])
+
+if __name__ == "__main__":
+    unittest.main()
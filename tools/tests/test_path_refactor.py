@@ -0,0 +1,32 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import path_refactor
+
+class TestPathRefactor(unittest.TestCase):
+
+    def test_any_casing_replaced_literally(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = os.path.join(tmp, "config.cpp")
+            with open(cfg, "wb") as f: f.write(b'model = "\\OldTag\\a.p3d"; OLDTAG; oLdTaG;')
+            self.assertEqual(path_refactor.refactor_paths(tmp, "oldtag", "z\\new", dry_run=True), {cfg: 3})
+            with open(cfg, "rb") as f: self.assertIn(b"OldTag", f.read())
+
+            path_refactor.refactor_paths(tmp, "oldtag", "z\\new")
+            with open(cfg, "rb") as f: self.assertEqual(f.read(), b'model = "\\z\\new\\a.p3d"; z\\new; z\\new;')
+
+    def test_large_files_streamed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wrp = os.path.join(tmp, "world.wrp")
+            with open(wrp, "wb") as f: f.write(b"\0" * 64 + b"\\oldtag\\road.p3d\0" + b"\1" * 64)
+            with mock.patch.object(path_refactor, "MMAP_THRESHOLD", 16):
+                self.assertEqual(path_refactor.refactor_file(wrp, "OldTag", "z\\new"), (wrp, 1, None))
+            with open(wrp, "rb") as f: self.assertEqual(f.read(), b"\0" * 64 + b"\\z\\new\\road.p3d\0" + b"\1" * 64)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import os
+import sys
+import struct
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import rap_reader
+import mission_auditor
+from pbo_reader import PboReader, lzss_decompress
+
+def _cint(n):
+    out = bytearray()
+    while True:
+        b = n & 0x7F; n >>= 7
+        out.append(b | (0x80 if n else 0))
+        if not n: return bytes(out)
+
+def _z(s):
+    return s.encode() + b"\0"
+
+def _array(items):
+    out = _cint(len(items))
+    for i in items:
+        if isinstance(i, list): out += b"\x03" + _array(i)
+        elif isinstance(i, str): out += b"\x00" + _z(i)
+        elif isinstance(i, float): out += b"\x01" + struct.pack("<f", i)
+        else: out += b"\x02" + struct.pack("<i", i)
+    return out
+
+def rapify(classes):
+    """Minimal raP writer: classes is a list of (name, parent, entries) trees."""
+    body = bytearray()
+    def write_class(parent, entries):
+        # Class bodies are written after the entry table that points at them
+        offset = 16 + len(body)
+        table = bytearray(_z(parent or "") + _cint(len(entries)))
+        fixups = []
+        for e in entries:
+            if e[0] == "class":
+                table += b"\x00" + _z(e[1]); fixups.append((len(table), e)); table += b"\0\0\0\0"
+            elif e[0] == "array":
+                table += b"\x02" + _z(e[1]) + _array(e[2])
+            elif e[0] == "extern":
+                table += b"\x03" + _z(e[1])
+            elif isinstance(e[2], str):
+                table += b"\x01\x00" + _z(e[1]) + _z(e[2])
+            else:
+                table += b"\x01\x02" + _z(e[1]) + struct.pack("<i", e[2])
+        body.extend(table)
+        for pos, e in fixups:
+            child = write_class(e[2], e[3])
+            body[offset - 16 + pos:offset - 16 + pos + 4] = struct.pack("<I", child)
+        return offset
+    write_class("", classes)
+    return b"\0raP" + struct.pack("<II", 0, 8) + struct.pack("<I", 0) + bytes(body)
+
+def make_pbo(files):
+    head = _z("") + struct.pack("<5I", 0x56657273, 0, 0, 0, 0) + _z("prefix") + _z("mission") + b"\0"
+    for name, data in files: head += _z(name) + struct.pack("<5I", 0, len(data), 0, 0, len(data))
+    head += _z("") + struct.pack("<5I", 0, 0, 0, 0, 0)
+    return head + b"".join(d for _, d in files)
+
+MISSION = [
+    ("value", "version", 53),
+    ("array", "addons", ["A3_Characters_F", "uksfta_main"]),
+    ("class", "AddonsMetaData", None, [("class", "List", None, [("value", "items", 2)])]),
+    ("class", "Mission", None, [
+        ("class", "Entities", None, [("class", "Item0", None, [("value", "dataType", "Group")])]),
+        ("array", "addonsAuto", ["cba_main", ["nested", 1.5]]),
+    ]),
+]
+
+class TestRapReader(unittest.TestCase):
+
+    def test_walk_and_decode(self):
+        reader = rap_reader.RapReader(rapify(MISSION))
+        entities = reader.find("mission", "ENTITIES")
+        self.assertIsNotNone(entities)
+        tree = reader.to_class()
+        self.assertEqual(tree.get("version"), 53)
+        self.assertEqual(tree.find("Mission", "Entities", "Item0").get("dataType"), "Group")
+        self.assertEqual(tree.find("Mission").get("addonsAuto"), ["cba_main", ["nested", 1.5]])
+        self.assertIsNone(reader.find("CfgPatches"))
+
+    def test_read_arrays(self):
+        found = rap_reader.read_arrays(rapify(MISSION), ["addons", "addonsAuto"])
+        self.assertEqual(found["addons"], ["A3_Characters_F", "uksfta_main"])
+        self.assertEqual(found["addonsauto"][0], "cba_main")
+
+    def test_mission_addons_from_pbo(self):
+        pbo = make_pbo([("description.ext", b"author = \"x\";"), ("mission.sqm", rapify(MISSION))])
+        with PboReader(pbo) as reader:
+            self.assertEqual(reader.properties, {"prefix": "mission"})
+            self.assertEqual(reader.read("description.ext"), b"author = \"x\";")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "op.Altis.pbo")
+            with open(path, "wb") as f: f.write(pbo)
+            self.assertEqual(mission_auditor.get_mission_addons(path), ["A3_Characters_F", "cba_main", "uksfta_main"])
+
+    def test_lzss(self):
+        # 'abc' as literals, then a back reference of length 6 to offset 3
+        packed = bytes([0b00000111]) + b"abc" + bytes([3, 3])
+        self.assertEqual(lzss_decompress(packed, 9), b"abcabcabc")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,9 @@ import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import os
 import sys
+import json
+import argparse
+import tempfile
 
 # Add parent dir to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -52,5 +55,41 @@ class TestReleaseTool(unittest.TestCase):
         self.assertIn("upload.vdf", vdf_path)
         self.assertIn("workshop_description_final.txt", desc_path)
 
+    def test_main_saves_trace_when_release_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trace = os.path.join(tmp, "release_trace.json")
+            events = os.path.join(tmp, "build_stages.jsonl")
+            with open(events, "w") as f: f.write(json.dumps({"name": "hemtt", "start_ns": 0, "end_ns": 10 ** 9}) + "\n")
+            def failing_release(args, tracer):
+                with tracer.stage("version bump"): pass
+                sys.exit(1)
+            with patch("release.TRACE_FILE", trace), patch("release.STAGE_EVENTS_FILE", events), \
+                 patch("release.run_release", side_effect=failing_release) as run, \
+                 patch("sys.argv", ["release.py", "-n", "--offline"]), patch("builtins.print"):
+                with self.assertRaises(SystemExit):
+                    release.main()
+            args, tracer = run.call_args[0]
+            self.assertTrue(args.none and args.offline)
+            self.assertIsInstance(tracer, release.Tracer)
+            with open(trace) as f:
+                names = [e["name"] for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+            self.assertEqual(names, ["version bump", "hemtt"])
+
+    @patch("release.create_vdf")
+    @patch("release.get_workshop_config", return_value={"id": "9999"})
+    @patch("release.get_current_version", return_value=("1.2.3", (1, 2, 3)))
+    def test_run_release_offline_records_stages(self, mock_version, mock_config, mock_vdf):
+        with tempfile.TemporaryDirectory() as tmp:
+            staging = os.path.join(tmp, "release")
+            os.makedirs(os.path.join(staging, "addons"))
+            mock_vdf.return_value = (os.path.join(tmp, "upload.vdf"), os.path.join(tmp, "desc.txt"))
+            args = argparse.Namespace(patch=False, minor=False, major=False, none=True, yes=True, threads=None,
+                                      skip_build=True, dry_run=False, offline=True, profile=False)
+            tracer = release.Tracer(os.path.join(tmp, "trace.json"))
+            with patch("release.STAGING_DIR", staging), patch("release.HEMTT_OUT", tmp), patch("builtins.print"):
+                release.run_release(args, tracer)
+            mock_vdf.assert_called_once_with("107410", "9999", staging, "Release v1.2.3")
+            self.assertEqual([e["name"] for e in tracer.events if e["ph"] == "X"], ["create_vdf"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import os
+import sys
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sqf_lexer
+from sqf_validator import check_sqf
+from search_unused_privates import find_unused
+
+SAMPLE = '''#include "script_component.hpp"
+#define DEBUG(x) \\
+    diag_log x
+params ["_unit", ["_pos", [0, 0, 0]], "_unused"];
+private _msg = "Unit ( at { pos"; // ) ]
+/* { */ if (_unit isEqualTo objNull) then { hint _msg; };
+[_pos] call FUNC(move);
+'''
+
+class TestSqfLexer(unittest.TestCase):
+
+    def test_tokens_and_positions(self):
+        tokens = list(sqf_lexer.tokenize(SAMPLE))
+        self.assertEqual([t.kind for t in tokens[:2]], ["preproc", "preproc"])
+        self.assertIn("diag_log", tokens[1].value)
+        msg = next(t for t in tokens if t.kind == "string" and "Unit" in t.value)
+        self.assertEqual((msg.line, msg.col), (5, 16))
+        if_tok = next(t for t in tokens if t.value == "if")
+        self.assertEqual((if_tok.line, if_tok.col), (6, 9))
+        self.assertFalse(any(t.kind == "comment" for t in tokens))
+
+    def test_brackets_ignore_strings_and_comments(self):
+        self.assertEqual(check_sqf(SAMPLE), [])
+        errors = check_sqf('call {\n    _a = (1 + 2;\n};\n_b = "unterminated')
+        self.assertEqual([(l, c) for l, c, _ in errors], [(3, 1), (4, 6)])
+
+    def test_unused_privates(self):
+        self.assertEqual(find_unused(list(sqf_lexer.tokenize(SAMPLE))), [("_unused", 4, 39)])
+
+if __name__ == "__main__":
+    unittest.main()
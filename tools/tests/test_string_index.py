@@ -0,0 +1,61 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from string_index import LocalizationIndex
+
+TABLE_A = """<?xml version="1.0" encoding="utf-8"?>
+<Project name="TEST">
+    <Package name="Main">
+        <Key ID="STR_Test_Loose"><English>Loose</English></Key>
+        <Container name="Menu">
+            <Key ID="STR_Test_Used"><English>Used</English></Key>
+            <Key ID="STR_Test_Unused"><English>Unused</English></Key>
+        </Container>
+    </Package>
+</Project>
+"""
+
+TABLE_B = """<?xml version="1.0" encoding="utf-8"?>
+<Project name="TEST">
+    <Package name="Other">
+        <Key ID="STR_TEST_USED"><English>Again</English></Key>
+    </Package>
+</Project>
+"""
+
+class TestLocalizationIndex(unittest.TestCase):
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f: f.write(text)
+
+    def test_all_stringtables_and_usage_sites(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = os.path.join(tmp, "UKSFTA-Test")
+            cache = os.path.join(tmp, "string_index.json")
+            self.write(os.path.join(project, "addons", "main", "stringtable.xml"), TABLE_A)
+            self.write(os.path.join(project, "addons", "other", "stringtable.xml"), TABLE_B)
+            src = os.path.join(project, "addons", "main", "fn_test.sqf")
+            self.write(src, '// header\nhint localize "STR_Test_Used";\nhint localize "STR_Test_Loose";\nhint localize "STR_Test_Missing";\n')
+
+            index = LocalizationIndex(project, cache)
+            self.assertEqual(len(index.stringtables), 2)
+            self.assertEqual(index.usages["str_test_used"], [(src, 2)])
+            self.assertEqual(index.missing(), ["str_test_missing"])
+            self.assertEqual(index.unused(), ["str_test_unused"])
+            self.assertEqual(index.duplicates(), ["str_test_used"])
+            self.assertEqual(index.files_using(["STR_Test_Loose"]), [src])
+
+            # Unchanged files come from the cache; edited ones are re-read
+            self.assertFalse(LocalizationIndex(project, cache).dirty)
+            self.write(src, 'hint localize "STR_Test_Unused";\n')
+            os.utime(src, ns=(0, 0))
+            index = LocalizationIndex(project, cache)
+            self.assertEqual(index.unused(), ["str_test_loose", "str_test_used"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import stringtable_validator
+
+class TestStringtableValidator(unittest.TestCase):
+
+    def test_renames_applied_in_one_pass(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "fn_test.sqf")
+            with open(src, "wb") as f:
+                f.write('hint localize "STR_Old"; hint localize "STR_Old_Extra"; $STR_Old2 // café\n'.encode("utf-8"))
+            untouched = os.path.join(tmp, "fn_other.sqf")
+            with open(untouched, "w") as f: f.write('hint "STR_Unrelated";')
+            before = os.stat(untouched).st_mtime_ns
+
+            renames = {"STR_Old": "STR_AFM_Test_Old", "STR_Old2": "STR_AFM_Test_Old2"}
+            self.assertEqual(stringtable_validator.fix_source_code(tmp, renames), (1, 2))
+            with open(src, "rb") as f:
+                self.assertEqual(f.read().decode("utf-8"), 'hint localize "STR_AFM_Test_Old"; hint localize "STR_Old_Extra"; $STR_AFM_Test_Old2 // café\n')
+            self.assertEqual(os.stat(untouched).st_mtime_ns, before)
+
+    def test_lowercase_and_unprefixed_ids_are_found(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "addons", "main", "fn_test.sqf")
+            os.makedirs(os.path.dirname(src))
+            with open(src, "w") as f: f.write('hint localize "str_main_hello"; hint localize "Legacy_Hello";\n')
+            index_path = os.path.join(tmp, "string_index.json")
+
+            renames = {"str_main_hello": "STR_AFM_Main_Hello"}
+            users = stringtable_validator.rename_users(tmp, renames, index_path)
+            self.assertEqual(users, [os.path.realpath(src)])
+            self.assertEqual(stringtable_validator.fix_source_code(tmp, renames, users), (1, 1))
+
+            # Not an ID the index tracks: every source file is checked
+            renames = {"Legacy_Hello": "STR_AFM_Main_Legacy"}
+            self.assertIsNone(stringtable_validator.rename_users(tmp, renames, index_path))
+            self.assertEqual(stringtable_validator.fix_source_code(tmp, renames, None), (1, 1))
+            with open(src) as f:
+                self.assertEqual(f.read(), 'hint localize "STR_AFM_Main_Hello"; hint localize "STR_AFM_Main_Legacy";\n')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tile_dedup
+
+class TestTileDedup(unittest.TestCase):
+
+    def make_tiles(self, root):
+        tiles = {"0/0/0.png": b"land", "1/0/0.png": b"sea", "1/0/1.png": b"sea", "1/1/0.png": b"sea", "1/1/1.png": b"coast"}
+        for key, data in tiles.items():
+            path = os.path.join(root, *key.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f: f.write(data)
+        return tiles
+
+    def test_duplicates_hardlinked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.make_tiles(tmp)
+            self.assertEqual(tile_dedup.dedupe_tiles(tmp, quiet=True), (5, 3, 6))
+            self.assertTrue(os.path.samefile(os.path.join(tmp, "1", "0", "0.png"), os.path.join(tmp, "1", "1", "0.png")))
+            # A second pass finds nothing left to share
+            self.assertEqual(tile_dedup.dedupe_tiles(tmp, quiet=True)[2], 0)
+
+    def test_manifest_and_mbtiles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tiles = self.make_tiles(tmp)
+            tile_dedup.dedupe_tiles(tmp, manifest=True, quiet=True)
+            self.assertEqual(tile_dedup.resolve_aliases(tmp), {"1/0/1": "1/0/0", "1/1/0": "1/0/0"})
+            self.assertFalse(os.path.exists(os.path.join(tmp, "1", "0", "1.png")))
+
+            out = os.path.join(tmp, "theatre.mbtiles")
+            self.assertEqual(tile_dedup.write_mbtiles(tmp, out), (5, 3))
+            db = sqlite3.connect(out)
+            rows = {f"{z}/{x}/{y}.png": data for z, x, y, data in db.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles")}
+            db.close()
+            self.assertEqual(rows, tiles)
+
+    def test_manifest_drops_aliases_replaced_by_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.make_tiles(tmp)
+            tile_dedup.dedupe_tiles(tmp, manifest=True, quiet=True)
+            # Earlier aliases survive a second pass while their tile is still absent
+            tile_dedup.dedupe_tiles(tmp, manifest=True, quiet=True)
+            self.assertEqual(tile_dedup.resolve_aliases(tmp), {"1/0/1": "1/0/0", "1/1/0": "1/0/0"})
+
+            with open(os.path.join(tmp, "1", "0", "1.png"), "wb") as f: f.write(b"reef")
+            tile_dedup.dedupe_tiles(tmp, manifest=True, quiet=True)
+            self.assertEqual(tile_dedup.resolve_aliases(tmp), {"1/1/0": "1/0/0"})
+
+if __name__ == "__main__":
+    unittest.main()
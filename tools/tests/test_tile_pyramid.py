@@ -0,0 +1,115 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from PIL import Image, ImageColor
+    import tile_pyramid
+    import tile_dedup
+except ImportError:
+    Image = None
+
+def sample_image(width, height):
+    """Noise over a gradient, so every tile and every zoom level differs."""
+    noise = Image.effect_noise((width, height), 48).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    return Image.blend(noise, gradient, 0.5)
+
+def reference_tiles(img, tile_size, max_zoom):
+    """{(z, x, y): RGBA bytes} tiled from the full image, halved once per zoom level."""
+    tiles = {}
+    level = img
+    for z in range(max_zoom, -1, -1):
+        for x in range(0, level.width, tile_size):
+            for y in range(0, level.height, tile_size):
+                tile = Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0))
+                tile.paste(level.crop((x, y, min(x + tile_size, level.width), min(y + tile_size, level.height))), (0, 0))
+                tiles[(z, x // tile_size, y // tile_size)] = tile.tobytes()
+        level = tile_pyramid.half(level)
+    return tiles
+
+def written_tiles(output_dir):
+    tiles = {}
+    for z in os.listdir(output_dir):
+        for x in os.listdir(os.path.join(output_dir, z)):
+            for name in os.listdir(os.path.join(output_dir, z, x)):
+                with Image.open(os.path.join(output_dir, z, x, name)) as im:
+                    tiles[(int(z), int(x), int(name[:-4]))] = im.convert("RGBA").tobytes()
+    return tiles
+
+class CollectingWriter:
+    """Stands in for TileWriter and keeps the tiles in memory."""
+
+    def __init__(self):
+        self.tiles = {}
+
+    def put(self, z, x, y, img):
+        self.tiles[(z, x, y)] = img.convert("RGBA").tobytes()
+
+@unittest.skipUnless(Image, "Pillow is not installed")
+class TestTilePyramid(unittest.TestCase):
+
+    def test_build_from_image_matches_full_decode(self):
+        img = sample_image(300, 260)
+        expected = reference_tiles(img, 64, 2)
+        for ext, options in (("ppm", {}), ("bmp", {}), ("tif", {}), ("tif", {"rowsperstrip": 16})):
+            with self.subTest(format=ext, **options), tempfile.TemporaryDirectory() as tmp:
+                source = os.path.join(tmp, f"source.{ext}")
+                img.save(source, **options)
+                out = os.path.join(tmp, "tiles")
+                self.assertEqual(tile_pyramid.build_from_image(source, out, tile_size=64, max_zoom=2, jobs=1, dedupe=None), len(expected))
+                self.assertEqual(written_tiles(out), expected)
+
+    def test_lower_levels_match_box_reduced_reference(self):
+        size, top_zoom = 32, 2
+        top = sample_image(3 * size, 2 * size).convert("RGBA")
+        halves = {(x, y): tile_pyramid.half(top.crop((x * size, y * size, (x + 1) * size, (y + 1) * size)))
+                  for x in range(3) for y in range(2)}
+        writer = CollectingWriter()
+        tile_pyramid.build_lower_levels(halves, top_zoom, writer, tile_size=size)
+
+        # Reference: the top level on its full transparent grid, box-reduced once per level
+        grid = Image.new("RGBA", (size << top_zoom, size << top_zoom), (0, 0, 0, 0))
+        grid.paste(top, (0, 0))
+        expected = {}
+        for z in range(top_zoom - 1, -1, -1):
+            grid = grid.reduce(2)
+            # Only parents of existing tiles are written
+            for x in range((3 + (1 << (top_zoom - z)) - 1) >> (top_zoom - z)):
+                for y in range((2 + (1 << (top_zoom - z)) - 1) >> (top_zoom - z)):
+                    expected[(z, x, y)] = grid.crop((x * size, y * size, (x + 1) * size, (y + 1) * size)).tobytes()
+        self.assertEqual(sorted(writer.tiles), sorted(expected))
+        self.assertEqual(writer.tiles, expected)
+
+    def test_retiling_does_not_write_through_hardlinks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with tile_pyramid.TileWriter(tmp, jobs=1) as writer:
+                for x in range(3): writer.put(0, x, 0, Image.new("RGB", (64, 64), "navy"))
+            self.assertTrue(os.path.samefile(tile_pyramid.tile_path(tmp, 0, 0, 0), tile_pyramid.tile_path(tmp, 0, 2, 0)))
+            # A second image with different tiles over the same folder
+            with tile_pyramid.TileWriter(tmp, jobs=1) as writer:
+                for x, colour in enumerate(("red", "green", "blue")): writer.put(0, x, 0, Image.new("RGB", (64, 64), colour))
+            for x, colour in enumerate(("red", "green", "blue")):
+                with Image.open(tile_pyramid.tile_path(tmp, 0, x, 0)) as im:
+                    self.assertEqual(im.convert("RGB").getpixel((0, 0)), ImageColor.getrgb(colour))
+
+    def test_retiling_rebuilds_the_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with tile_pyramid.TileWriter(tmp, jobs=1, dedupe="manifest") as writer:
+                for x in range(3): writer.put(0, x, 0, Image.new("RGB", (64, 64), "navy"))
+            self.assertEqual(tile_dedup.resolve_aliases(tmp), {"0/1/0": "0/0/0", "0/2/0": "0/0/0"})
+
+            with tile_pyramid.TileWriter(tmp, jobs=1, dedupe="manifest") as writer:
+                for x, colour in enumerate(("red", "green", "red")): writer.put(0, x, 0, Image.new("RGB", (64, 64), colour))
+            self.assertEqual(tile_dedup.resolve_aliases(tmp), {"0/2/0": "0/0/0"})
+            self.assertTrue(os.path.exists(tile_pyramid.tile_path(tmp, 0, 1, 0)))
+
+            with tile_pyramid.TileWriter(tmp, jobs=1, dedupe="manifest") as writer:
+                for x, colour in enumerate(("red", "green", "blue")): writer.put(0, x, 0, Image.new("RGB", (64, 64), colour))
+            self.assertEqual(tile_dedup.resolve_aliases(tmp), {})
+
+if __name__ == '__main__':
+    unittest.main()
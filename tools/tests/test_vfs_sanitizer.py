@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import json
+import tempfile
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import vfs_sanitizer
+
+NESTED = rb'model = "\z\z\uksfta\addons\mods\addons\main\data\vest.p3d";'
+FIXED = rb'model = "z\uksfta\addons\main\data\vest.p3d";'
+# Doubled separators only line up into a nested path once the first pass has collapsed them
+DOUBLED = rb'icon = "\\z\\uksfta\\addons\\mods\\addons\\main\\icon.paa";'
+
+class TestVfsSanitizer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.project = os.path.join(self.tmp.name, "project")
+        os.makedirs(os.path.join(self.project, "addons", "main"))
+        self.cache = os.path.join(self.tmp.name, "vfs_clean.json")
+        for p in (patch("vfs_sanitizer.cache_path", lambda name: self.cache), patch("builtins.print")):
+            p.start(); self.addCleanup(p.stop)
+
+    def write(self, name, data):
+        path = os.path.join(self.project, "addons", "main", name)
+        with open(path, "wb") as f: f.write(data)
+        return path
+
+    def read(self, path):
+        with open(path, "rb") as f: return f.read()
+
+    def recorded(self):
+        with open(self.cache) as f: return json.load(f)["files"]
+
+    def test_latin1_file_keeps_its_bytes(self):
+        # 0xE9 is not valid UTF-8 on its own
+        path = self.write("config.cpp", b"// caf\xe9 \xa9 UKSF\r\n" + NESTED + b"\r\n")
+        self.assertEqual(vfs_sanitizer.sanitize_project(self.project, jobs=1), 1)
+        self.assertEqual(self.read(path), b"// caf\xe9 \xa9 UKSF\r\n" + FIXED + b"\r\n")
+
+    def test_clean_record_skips_files_with_same_signature(self):
+        path = self.write("fn_clean.sqf", b"_x = 1;\n")
+        vfs_sanitizer.sanitize_project(self.project, jobs=1)
+        self.assertEqual(self.recorded()[os.path.abspath(path)][:2], vfs_sanitizer.file_signature(path))
+
+        with patch("vfs_sanitizer.sanitize_file", wraps=vfs_sanitizer.sanitize_file) as sanitize:
+            vfs_sanitizer.sanitize_project(self.project, jobs=1)
+            sanitize.assert_not_called()
+
+        # A new signature is checked again; unchanged content is known clean by hash
+        os.utime(path, ns=(0, 1))
+        with patch("vfs_sanitizer.sanitize_file", wraps=vfs_sanitizer.sanitize_file) as sanitize:
+            vfs_sanitizer.sanitize_project(self.project, jobs=1)
+            self.assertEqual(sanitize.call_args[0], (os.path.abspath(path), self.recorded()[os.path.abspath(path)][2]))
+
+    def test_unsettled_repair_is_not_recorded_clean(self):
+        path = os.path.abspath(self.write("config.cpp", DOUBLED))
+        self.assertEqual(vfs_sanitizer.sanitize_project(self.project, jobs=1), 1)
+        self.assertNotIn(path, self.recorded())
+        # The next run looks at it again and finishes the repair
+        self.assertEqual(vfs_sanitizer.sanitize_project(self.project, jobs=1), 1)
+        self.assertEqual(self.read(path), rb'icon = "z\uksfta\addons\main\icon.paa";')
+        self.assertIn(path, self.recorded())
+
+if __name__ == "__main__":
+    unittest.main()
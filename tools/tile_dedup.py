@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import argparse
+from cache_utils import atomic_write, hash_file
+
+# UKSFTA Tile Deduplication
+# Theatre folders are dominated by identical tiles (transparent padding, open sea).
+# Every distinct tile is stored once: duplicates become hardlinks to it, or are listed
+# in a manifest.json alias map for the web client. A folder can also be packed into
+# an MBTiles-style SQLite file with one blob per distinct tile.
+
+MANIFEST_FILE = "manifest.json"
+
+def link_tile(src, dst):
+    """Makes 'dst' the same file as 'src' (hardlink, or a copy where links are unsupported)."""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".link"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def iter_tiles(output_dir):
+    """Yields (z, x, y, path) for every {z}/{x}/{y}.png below output_dir."""
+    for z in sorted(os.listdir(output_dir)):
+        z_dir = os.path.join(output_dir, z)
+        if not (z.isdigit() and os.path.isdir(z_dir)): continue
+        for x in os.listdir(z_dir):
+            x_dir = os.path.join(z_dir, x)
+            if not (x.isdigit() and os.path.isdir(x_dir)): continue
+            for name in os.listdir(x_dir):
+                y, ext = os.path.splitext(name)
+                if ext == ".png" and y.isdigit():
+                    yield int(z), int(x), int(y), os.path.join(x_dir, name)
+
+def dedupe_tiles(output_dir, manifest=False, quiet=False):
+    """
+    Replaces duplicate tiles by hardlinks to one canonical copy, or with manifest=True removes
+    them and records {"z/x/y": "z/x/y of the canonical tile"} in manifest.json.
+    Returns (tiles, distinct, bytes_saved).
+    """
+    output_dir = str(output_dir)
+    canonical = {}; aliases = {}
+    tiles = 0; saved = 0
+    for z, x, y, path in iter_tiles(output_dir):
+        tiles += 1
+        st = os.stat(path)
+        digest = hash_file(path)
+        first = canonical.get(digest)
+        if first is None:
+            canonical[digest] = (path, f"{z}/{x}/{y}", st)
+            continue
+        first_path, first_key, first_st = first
+        if (st.st_dev, st.st_ino) == (first_st.st_dev, first_st.st_ino): continue
+        saved += st.st_size
+        if manifest:
+            aliases[f"{z}/{x}/{y}"] = first_key
+            os.remove(path)
+        else:
+            link_tile(first_path, path)
+    if manifest:
+        # Aliases from earlier passes stay valid while their tile is still gone; re-point them
+        # at the canonical copy when their target was removed as a duplicate just now
+        for key, target in resolve_aliases(output_dir).items():
+            aliases.setdefault(key, aliases.get(target, target))
+        write_manifest(output_dir, aliases)
+    if not quiet:
+        print(f"  ♻️  {tiles} tiles, {len(canonical)} distinct ({saved / (1024 * 1024):.1f} MB saved)")
+    return tiles, len(canonical), saved
+
+def _tile_exists(output_dir, key):
+    return os.path.exists(os.path.join(output_dir, *key.split("/")) + ".png")
+
+def write_manifest(output_dir, aliases):
+    """
+    Replaces the folder's manifest.json with {"z/x/y": canonical "z/x/y"}. Aliases whose tile
+    exists as a file, or whose canonical tile does not, are dropped; with none left the
+    manifest is removed.
+    """
+    output_dir = str(output_dir)
+    aliases = {k: v for k, v in aliases.items() if not _tile_exists(output_dir, k) and _tile_exists(output_dir, v)}
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if aliases:
+        atomic_write(path, json.dumps({"version": 1, "aliases": aliases}, indent=1, sort_keys=True))
+    elif os.path.exists(path):
+        os.remove(path)
+
+def resolve_aliases(output_dir):
+    """{"z/x/y": canonical "z/x/y"} from a manifest-mode folder (empty if there is none)."""
+    try:
+        with open(os.path.join(str(output_dir), MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("aliases", {})
+    except (OSError, ValueError):
+        return {}
+
+def write_mbtiles(output_dir, mbtiles_path, name=None):
+    """
+    Packs a tile folder into an MBTiles-style SQLite file. Distinct tiles are stored once
+    (images/map tables behind the standard 'tiles' view). Rows keep the folder's XYZ
+    numbering (metadata scheme=xyz), since the Simple CRS grids are not TMS-bounded.
+    Returns (tiles, distinct).
+    """
+    output_dir = str(output_dir)
+    tmp = mbtiles_path + ".tmp"
+    if os.path.exists(tmp): os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    try:
+        db.executescript("""
+            CREATE TABLE metadata (name TEXT, value TEXT);
+            CREATE TABLE images (tile_id TEXT PRIMARY KEY, tile_data BLOB);
+            CREATE TABLE map (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT);
+            CREATE UNIQUE INDEX map_index ON map (zoom_level, tile_column, tile_row);
+            CREATE VIEW tiles AS SELECT map.zoom_level AS zoom_level, map.tile_column AS tile_column,
+                map.tile_row AS tile_row, images.tile_data AS tile_data
+                FROM map JOIN images ON images.tile_id = map.tile_id;
+        """)
+        tiles = 0; distinct = set(); zooms = set()
+        entries = [(z, x, y, path) for z, x, y, path in iter_tiles(output_dir)]
+        by_key = {f"{z}/{x}/{y}": path for z, x, y, path in entries}
+        for key, target in resolve_aliases(output_dir).items():
+            if target in by_key:
+                z, x, y = (int(v) for v in key.split("/"))
+                entries.append((z, x, y, by_key[target]))
+        for z, x, y, path in entries:
+            digest = hash_file(path)
+            if digest not in distinct:
+                with open(path, "rb") as f:
+                    db.execute("INSERT INTO images VALUES (?, ?)", (digest, f.read()))
+                distinct.add(digest)
+            db.execute("INSERT OR REPLACE INTO map VALUES (?, ?, ?, ?)", (z, x, y, digest))
+            tiles += 1; zooms.add(z)
+        meta = {"name": name or os.path.basename(os.path.abspath(output_dir)), "format": "png", "scheme": "xyz",
+                "minzoom": str(min(zooms, default=0)), "maxzoom": str(max(zooms, default=0))}
+        db.executemany("INSERT INTO metadata VALUES (?, ?)", meta.items())
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp, mbtiles_path)
+    print(f"  📦 {mbtiles_path}: {tiles} tiles, {len(distinct)} distinct images")
+    return tiles, len(distinct)
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA Tile Deduplication")
+    parser.add_argument("output_dir", help="Tile folder ({z}/{x}/{y}.png)")
+    parser.add_argument("--manifest", action="store_true", help="Remove duplicates and list them in manifest.json instead of hardlinking")
+    parser.add_argument("--mbtiles", help="Also pack the folder into this MBTiles file")
+    args = parser.parse_args()
+    if not os.path.isdir(args.output_dir):
+        print(f"❌ Not a directory: {args.output_dir}")
+        sys.exit(1)
+    print(f"🧩 [Tile Dedup] {args.output_dir}")
+    dedupe_tiles(args.output_dir, args.manifest)
+    if args.mbtiles: write_mbtiles(args.output_dir, args.mbtiles)
+
+if __name__ == "__main__":
+    main()
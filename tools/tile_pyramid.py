@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import math
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from PIL import Image
+from cache_utils import atomic_writer
+from tile_dedup import link_tile, write_manifest
+
+# UKSFTA Tile Pyramid
+# Shared plumbing for the COP tile generators (map_tiler, terrain_harvester):
+# PNG encoding on a process pool with duplicate tiles stored once, bottom-up construction
+# of lower zoom levels and a strip-streamed builder for whole satellite images.
+# Output layout is always {output_dir}/{z}/{x}/{y}.png.
+
+TILE_SIZE = 256
+# Bytes per pixel of the raw layouts that can be read a row range at a time
+_RAW_BYTES = {"L": 1, "P": 1, "LA": 2, "RGB": 3, "BGR": 3, "RGBA": 4, "RGBX": 4, "BGRA": 4, "BGRX": 4}
+
+def tile_path(output_dir, z, x, y):
+    return os.path.join(output_dir, str(z), str(x), f"{y}.png")
+
+def save_tile(img, path):
+    """Writes a new file rather than over the old one, which may be a hardlink shared with other tiles."""
+    with atomic_writer(path) as f:
+        img.save(f, format="PNG")
+
+def half(img):
+    """2x2 box downsample (floor size). Seam-free, so strips and quadrants can be halved independently."""
+    w, h = img.size
+    if w < 2 or h < 2: return img.resize((max(1, w // 2), max(1, h // 2)), Image.BOX)
+    return img.crop((0, 0, w - w % 2, h - h % 2)).reduce(2)
+
+def _encode_task(task):
+    path, mode, size, raw = task
+    save_tile(Image.frombytes(mode, size, raw), path)
+    return path
+
+class TileWriter:
+    """
+    Encodes tiles on a process pool. At most a few tiles per worker are in flight,
+    so feeding it a whole pyramid does not queue the pyramid in memory.
+
+    Tiles with identical pixels (transparent padding, open sea) are encoded once: later
+    copies become hardlinks to the first (dedupe="link"), entries in manifest.json
+    (dedupe="manifest"), or are encoded again (dedupe=None).
+    """
+
+    def __init__(self, output_dir, jobs=None, dedupe="link"):
+        self.output_dir = str(output_dir)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        self.dedupe = dedupe
+        self.pending = set()
+        self.distinct = {}
+        self.duplicates = []
+        self.count = 0
+
+    def put(self, z, x, y, img):
+        path = tile_path(self.output_dir, z, x, y)
+        self.count += 1
+        raw = img.tobytes()
+        if self.dedupe:
+            digest = hashlib.sha1(f"{img.mode}{img.size}".encode() + raw).digest()
+            first = self.distinct.setdefault(digest, (path, f"{z}/{x}/{y}"))
+            if first[0] != path:
+                self.duplicates.append((first, path, f"{z}/{x}/{y}")); return
+        if not self.pool:
+            save_tile(img, path); return
+        while len(self.pending) >= self.jobs * 4:
+            done, self.pending = wait(self.pending, return_when=FIRST_COMPLETED)
+            for f in done: f.result()
+        self.pending.add(self.pool.submit(_encode_task, (path, img.mode, img.size, raw)))
+
+    def close(self):
+        if self.pool:
+            for f in self.pending: f.result()
+            self.pool.shutdown()
+            self.pool = None
+        self.pending = set()
+        # Canonical tiles are all on disk now
+        if self.dedupe == "manifest":
+            for _, path, _ in self.duplicates:
+                if os.path.exists(path): os.remove(path)
+            # Rebuilt from this run alone, so aliases left by an earlier tiling do not survive
+            write_manifest(self.output_dir, {key: first[1] for first, _, key in self.duplicates})
+        else:
+            for first, path, _ in self.duplicates: link_tile(first[0], path)
+        if self.duplicates:
+            print(f"  ♻️  {self.count} tiles, {len(self.distinct)} distinct")
+        self.duplicates = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def build_lower_levels(halves, top_zoom, writer, tile_size=TILE_SIZE):
+    """
+    Builds zoom levels top_zoom-1 .. 0 from the top level without touching the source again.
+    'halves' maps (x, y) of each top-level tile to its half-size RGBA image; every parent is
+    the 2x2 merge of its children's halves (missing children stay transparent).
+    Only one level of halves is held at a time.
+    """
+    quarter = tile_size // 2
+    level = halves
+    for z in range(top_zoom - 1, -1, -1):
+        parents = {}
+        for (x, y), img in level.items():
+            parents.setdefault((x // 2, y // 2), []).append((x % 2, y % 2, img))
+        level = {}
+        for (px, py), children in sorted(parents.items()):
+            tile = Image.new("RGBA", (tile_size, tile_size), (0, 0, 0, 0))
+            for dx, dy, img in children:
+                tile.paste(img, (dx * quarter, dy * quarter))
+            writer.put(z, px, py, tile)
+            level[(px, py)] = half(tile)
+        print(f"  └─ Zoom {z}: {len(parents)} tiles")
+
+class StripReader:
+    """
+    Reads an image as horizontal bands without decoding the rest of it.
+    Works for single raw rasters Pillow decodes through its image size (PPM, uncompressed
+    BMP). Other formats (PNG, JPEG, TIFF) have to be decoded once in full; 'streamed'
+    tells which case applies.
+    """
+
+    # The TIFF plugin sizes the decode from its own tags, so a band-sized image is not honoured
+    STREAM_FORMATS = {"PPM", "BMP"}
+
+    def __init__(self, path):
+        self.path = str(path)
+        with Image.open(self.path) as im:
+            self.size = im.size
+            self.mode = im.mode
+            self.format = im.format
+            self._tiles = [tuple(t) for t in im.tile]
+        self._full = None
+        self.streamed = self._plan(0, min(1, self.size[1])) is not None
+
+    def _plan(self, top, bottom):
+        """(decoder tiles re-based to rows [top, bottom)), or None if the format cannot be read in bands."""
+        w, h = self.size
+        if self.format not in self.STREAM_FORMATS or len(self._tiles) != 1: return None
+        name, extents, offset, args = self._tiles[0]
+        if name != "raw" or tuple(extents) != (0, 0, w, h): return None
+        rawmode, stride, orientation = (tuple(args) + (0, 1))[:3] if isinstance(args, tuple) else (args, 0, 1)
+        stride = stride or (w * _RAW_BYTES[rawmode] if rawmode in _RAW_BYTES else 0)
+        if not stride or orientation not in (1, -1): return None
+        # Bottom-up rasters (BMP) store the band starting from its last row
+        start = offset + (top if orientation == 1 else h - bottom) * stride
+        return [("raw", (0, 0, w, bottom - top), start, (rawmode, stride, orientation))]
+
+    def _read_full(self, top, bottom):
+        if self._full is None:
+            with Image.open(self.path) as im:
+                self._full = _working_mode(im)
+        return self._full.crop((0, top, self.size[0], bottom))
+
+    def read(self, top, bottom):
+        w = self.size[0]
+        tiles = self._plan(top, bottom) if self.streamed else None
+        if tiles is None: return self._read_full(top, bottom)
+        with Image.open(self.path) as im:
+            # Point the decoder at the band only; the image is allocated at band size
+            im.tile = tiles
+            im._size = (w, bottom - top)
+            im.load()
+            band = _working_mode(im)
+        if band.size != (w, bottom - top):
+            # The plugin did not honour the band; never hand a partly decoded image on
+            self.streamed = False
+            return self._read_full(top, bottom)
+        return band
+
+def _working_mode(img):
+    return img.copy() if img.mode in ("RGB", "RGBA", "L") else img.convert("RGBA")
+
+def _vstack(top, bottom):
+    if top is None: return bottom
+    out = Image.new(top.mode, (top.width, top.height + bottom.height))
+    out.paste(top, (0, 0)); out.paste(bottom, (0, top.height))
+    return out
+
+class _Level:
+    """
+    One zoom level of a streamed pyramid. Receives its pixel rows top to bottom, cuts
+    complete tile rows as soon as they are available and hands every pair of rows,
+    halved, to the next lower level. Holds less than two tile rows of its own width.
+    """
+
+    def __init__(self, zoom, width, height, tile_size, writer, lower):
+        self.zoom, self.width, self.height = zoom, width, height
+        self.tile_size, self.writer, self.lower = tile_size, writer, lower
+        self.pending = None; self.carry = None
+        self.seen = 0; self.tile_row = 0
+
+    def feed(self, band):
+        # Halving floors the size, so rows beyond this level's height are dropped
+        take = min(band.height, self.height - self.seen)
+        if take <= 0: return
+        if band.width != self.width or take != band.height:
+            band = band.crop((0, 0, self.width, take))
+        self.seen += take
+
+        self.pending = _vstack(self.pending, band)
+        ts = self.tile_size
+        while self.pending is not None and (self.pending.height >= ts or self.seen == self.height):
+            rows = min(ts, self.pending.height)
+            self._emit_row(self.pending.crop((0, 0, self.width, rows)))
+            self.pending = self.pending.crop((0, rows, self.width, self.pending.height)) if rows < self.pending.height else None
+        if self.seen == self.height:
+            print(f"  └─ Zoom {self.zoom}: {self.width}x{self.height}, {math.ceil(self.width / ts)}x{self.tile_row} tiles")
+
+        if self.lower:
+            pair = _vstack(self.carry, band)
+            even = pair.height - pair.height % 2
+            self.carry = pair.crop((0, even, self.width, pair.height)) if even < pair.height else None
+            if even: self.lower.feed(half(pair.crop((0, 0, self.width, even))))
+
+    def _emit_row(self, strip):
+        ts = self.tile_size
+        for x in range(math.ceil(self.width / ts)):
+            tile = strip.crop((x * ts, 0, min((x + 1) * ts, self.width), strip.height))
+            # Create background if tile is smaller than tile_size
+            if tile.size != (ts, ts):
+                bg = Image.new('RGBA', (ts, ts), (0, 0, 0, 0))
+                bg.paste(tile, (0, 0))
+                tile = bg
+            self.writer.put(self.zoom, x, self.tile_row, tile)
+        self.tile_row += 1
+
+def build_from_image(image_path, output_dir, tile_size=TILE_SIZE, max_zoom=5, jobs=None, dedupe="link"):
+    """
+    Tiles an image into zoom levels max_zoom (1:1) .. 0 (1/2^max_zoom), reading it in
+    strips of one tile row. Each level is halved from the level above, so peak memory
+    depends on the image width, never its height, and the source is read exactly once.
+    Same layout as a full-image resize per level: level k is floor(size / 2^k) pixels.
+    Returns the number of tiles written.
+    """
+    reader = StripReader(image_path)
+    width, height = reader.size
+    if not reader.streamed:
+        print("  ⚠️  This format cannot be read in strips; decoding it once in memory. "
+              "Export an uncompressed PPM or BMP to keep memory bounded.")
+    with TileWriter(output_dir, jobs, dedupe) as writer:
+        level = None
+        for k in range(max_zoom, -1, -1):
+            if width >> k and height >> k:
+                level = _Level(max_zoom - k, width >> k, height >> k, tile_size, writer, level)
+        if level is None: return 0
+        for top in range(0, height, tile_size):
+            level.feed(reader.read(top, min(top + tile_size, height)))
+    return writer.count
@@ -3,10 +3,23 @@
 import os
 import sys
 import re
+import hashlib
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from cache_utils import atomic_write, cache_path, file_signature, load_json, save_json
 
 # --- CONFIGURATION ---
 UNIT_PREFIX = r"z\uksfta\addons"
+EXTS = {".cpp", ".hpp", ".sqf", ".rvmat", ".ext", ".cfg"}
+# Bump when sanitize_content changes so files recorded as clean are checked again
+RULES_VERSION = 1
+CACHE_FILE = "vfs_clean.json"
+# Below this many files to check a pool costs more than it saves
+POOL_THRESHOLD = 16
+
+_Z_RUN_RE = re.compile(r'(\\?z\\)+', re.IGNORECASE)
+_NESTED_ADDONS_RE = re.compile(r'addons\\[a-zA-Z0-9_]+\\addons', re.IGNORECASE)
 
 def sanitize_content(content):
     r"""
@@ -14,56 +27,97 @@ def sanitize_content(content):
     Example: z\z\z\uksfta\addons\mods\addons\mods\addons\main -> z\uksfta\addons\mods\main
     """
     # 1. Collapse multiple z\
-    # Note: Using raw strings for regex to handle backslashes safely
-    content = re.sub(r'(\\?z\\)+', r'z\\', content, flags=re.IGNORECASE)
-    
+    content = _Z_RUN_RE.sub(r'z\\', content)
+
     # 2. Fix redundant project/addons nesting
-    # Strategy: replace 'addons\PROJECT\addons' with 'addons'
-    # We loop to catch multiple levels of recursion
+    # Strategy: replace 'addons\PROJECT\addons' with 'addons', up to four levels deep
     for _ in range(4):
-        # This matches: addons\word\addons and replaces with addons
-        content = re.sub(r'addons\\[a-zA-Z0-9_]+\\addons', r'addons', content, flags=re.IGNORECASE)
-    
+        content, n = _NESTED_ADDONS_RE.subn(r'addons', content)
+        if not n: break
+
     # 3. Final cleanup of any double backslashes
     content = content.replace('\\\\', '\\')
-    
+
     return content
 
-def sanitize_project(project_path):
-    print(f"\n✨ [VFS Sanitizer] Repairing: {Path(project_path).name}")
+def sanitize_file(path, clean_sha=None):
+    """
+    Returns (path, sig, sha, status, error) with status 'clean' or 'repaired'.
+    The file keeps its encoding (UTF-8, or latin-1 when it does not decode) and is written atomically.
+    """
+    try:
+        sig = file_signature(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        sha = hashlib.sha1(data).hexdigest()
+        if sha == clean_sha: return path, sig, sha, 'clean', None
+        try:
+            content = data.decode('utf-8'); encoding = 'utf-8'
+        except UnicodeDecodeError:
+            content = data.decode('latin-1'); encoding = 'latin-1'
+        new_content = sanitize_content(content)
+        if new_content == content: return path, sig, sha, 'clean', None
+        new_data = new_content.encode(encoding)
+        atomic_write(path, new_data)
+        # Only remember the result as clean if another pass would leave it alone
+        settled = sanitize_content(new_content) == new_content
+        return path, file_signature(path), hashlib.sha1(new_data).hexdigest() if settled else None, 'repaired', None
+    except (OSError, UnicodeError) as e:
+        return path, None, None, 'error', str(e)
+
+def _sanitize_task(task):
+    return sanitize_file(*task)
+
+def sanitize_project(project_path, jobs=None, use_cache=True):
+    print(f"\n✨ [VFS Sanitizer] Repairing: {Path(project_path).resolve().name}")
     print(" ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    
-    exts = {".cpp", ".hpp", ".sqf", ".rvmat", ".ext", ".cfg"}
-    count = 0
-    
-    for root, _, files in os.walk(project_path):
-        if ".git" in root or ".hemttout" in root: continue
+
+    cache_file = cache_path(CACHE_FILE)
+    cache = (load_json(cache_file, {}) or {}) if use_cache else {}
+    clean = cache.get("files", {}) if cache.get("version") == RULES_VERSION else {}
+
+    tasks = []; skipped = 0
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in (".git", ".hemttout")]
         for f in files:
-            path = Path(root) / f
-            if path.suffix.lower() in exts:
-                try:
-                    with open(path, 'rb') as f_in:
-                        data = f_in.read()
-                    
-                    try:
-                        content = data.decode('utf-8')
-                    except:
-                        content = data.decode('latin-1')
-                        
-                    new_content = sanitize_content(content)
-                    
-                    if new_content != content:
-                        with open(path, 'w', encoding='utf-8') as f_out:
-                            f_out.write(new_content)
-                        print(f"  ✅ Repaired: {path.relative_to(project_path)}")
-                        count += 1
-                except Exception as e:
-                    print(f"  ❌ Error processing {f}: {e}")
-
-    print(f"\n✨ Sanitization complete. Fixed {count} files.")
+            if os.path.splitext(f)[1].lower() not in EXTS: continue
+            path = os.path.abspath(os.path.join(root, f))
+            entry = clean.get(path)
+            # Same size/mtime as when it was found clean: nothing to read
+            if entry and entry[:2] == file_signature(path):
+                skipped += 1; continue
+            tasks.append((path, entry[2] if entry else None))
+
+    if len(tasks) >= POOL_THRESHOLD and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_sanitize_task, tasks, chunksize=max(1, len(tasks) // ((jobs or os.cpu_count() or 1) * 4))))
+    else:
+        results = [_sanitize_task(t) for t in tasks]
+
+    count = 0
+    for path, sig, sha, status, error in results:
+        if status == 'error':
+            print(f"  ❌ Error processing {os.path.relpath(path, project_path)}: {error}")
+            clean.pop(path, None)
+            continue
+        if status == 'repaired':
+            print(f"  ✅ Repaired: {os.path.relpath(path, project_path)}")
+            count += 1
+        if sha: clean[path] = sig + [sha]
+        else: clean.pop(path, None)
+
+    if use_cache and results:
+        save_json(cache_file, {"version": RULES_VERSION, "files": {p: e for p, e in clean.items() if os.path.exists(p)}})
+    print(f"\n✨ Sanitization complete. Fixed {count} files ({len(tasks)} checked, {skipped} known clean).")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="UKSFTA VFS Sanitizer")
+    parser.add_argument("project_path")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Check every file, ignoring the clean-file record")
+    args = parser.parse_args()
+    sanitize_project(args.project_path, args.jobs, use_cache=not args.no_cache)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: vfs_sanitizer.py <project_path>")
-        sys.exit(1)
-    sanitize_project(sys.argv[1])
+    main()
@@ -10,7 +10,7 @@ import shutil
 import urllib.request
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Soft-import rich for CI environments
 try:
@@ -100,11 +100,84 @@ def cmd_help(console):
 
 def cmd_lint(args):
     console = Console(force_terminal=True); print_banner(console)
-    subprocess.run(["npx", "--yes", "markdownlint-cli2", "**/*.md", "--config", ".github/linters/.markdownlint.json"])
-    for p in get_projects():
-        print(f"Auditing Project: {p.name}")
-        subprocess.run([sys.executable, "tools/config_style_checker.py", str(p)])
-        subprocess.run([sys.executable, "tools/sqf_validator.py", str(p)])
+    from lint_engine import run_lint
+    # Markdown is checked by the external markdownlint; let it run while the Python checkers work
+    only = None
+    md_targets = ["**/*.md"]
+    if args.changed:
+        from changed_files import select_changed
+        only = select_changed()
+        md_targets = [os.path.relpath(f) for f in only if f.lower().endswith(".md")]
+        print(f"Linting {len(only)} staged/dependent file(s)")
+    md_cmd = ["npx", "--yes", "markdownlint-cli2"] + md_targets + ["--config", ".github/linters/.markdownlint.json"] + (["--fix"] if args.fix else [])
+    md_proc = None
+    if md_targets:
+        try:
+            md_proc = subprocess.Popen(md_cmd)
+        except OSError:
+            print("⚠️  npx not found; skipping markdownlint.")
+    projects = get_projects()
+    if only is None: print(f"Linting {len(projects)} project(s): {', '.join(p.name for p in projects)}")
+    report, _ = run_lint(projects, jobs=args.jobs, use_cache=not args.no_cache, only=only)
+    md_status = md_proc.wait() if md_proc else 0
+    if report or md_status: sys.exit(1)
+
+def _build_project(project, build_args):
+    """Runs build.sh for one project with its output captured to .hemttout/workspace_build.log."""
+    start = datetime.now()
+    res = subprocess.run(["bash", "build.sh", "build"] + build_args, cwd=project, capture_output=True, text=True, errors="replace")
+    log = project / ".hemttout" / "workspace_build.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    log.write_text(res.stdout + res.stderr, encoding="utf-8")
+    return res.returncode, (datetime.now() - start).total_seconds(), log
+
+def cmd_build(args):
+    """
+    Builds all projects following the CfgPatches dependency graph.
+    Independent projects build concurrently; a dependant starts as soon as all of its
+    prerequisites succeeded and is skipped if one of them failed.
+    """
+    from dependency_graph import analyze_dependencies, topological_waves, strongly_connected_components
+    projects = {p.name: p for p in get_projects()}
+    graph = analyze_dependencies(list(projects.values()))
+    deps = {n: set(graph[n]["deps"]) & set(projects) for n in projects}
+    waves, blocked = topological_waves(deps)
+    for i, wave in enumerate(waves): print(f"🌊 Wave {i + 1}: {', '.join(wave)}")
+    if blocked:
+        # Members of a cycle cannot be ordered among themselves; drop only those edges
+        print(f"⚠️  Circular dependencies involving {', '.join(blocked)}. Building cycle members without mutual ordering.")
+        for scc in strongly_connected_components(deps):
+            for n in scc: deps[n] -= set(scc)
+
+    jobs = max(1, min(args.jobs, len(projects) or 1))
+    build_args = ["--incremental"] if args.incremental else []
+    # Split the cores between concurrent HEMTT instances instead of oversubscribing them
+    if jobs > 1: build_args += ["--threads", str(max(1, (os.cpu_count() or 2) // jobs))]
+
+    pending = dict(deps); done = set(); failed = set(); skipped = set(); running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for n in sorted(pending):
+                if pending[n] & (failed | skipped):
+                    del pending[n]; skipped.add(n)
+                    print(f"⏭️  {n}: skipped (prerequisite failed)")
+                elif pending[n] <= done:
+                    del pending[n]
+                    print(f"🔨 {n}: building...")
+                    running[pool.submit(_build_project, projects[n], build_args)] = n
+            if not running: break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                n = running.pop(fut)
+                status, seconds, log = fut.result()
+                if status == 0:
+                    done.add(n); print(f"✅ {n}: built in {seconds:.1f}s")
+                else:
+                    failed.add(n); print(f"❌ {n}: build failed (exit {status}) after {seconds:.1f}s. Log: {log}")
+                    print("\n".join("   " + l for l in log.read_text(encoding="utf-8").splitlines()[-15:]))
+
+    print(f"\nBuild summary: {len(done)} succeeded, {len(failed)} failed, {len(skipped)} skipped.")
+    if failed or skipped: sys.exit(1)
 
 def cmd_gh_runs(args):
     console = Console(force_terminal=True); print_banner(console)
@@ -151,11 +224,27 @@ def main():
     subparsers = parser.add_subparsers(dest="command")
     
     # Core registered commands
-    for cmd in ["status", "update", "gh-runs", "generate-catalog", "build", "release", "audit-security", "audit-performance", "audit-assets", "audit-signatures", "audit-keys", "audit-deps", "audit-strings", "audit-mission", "audit-updates", "apply-updates", "generate-manifest", "generate-preset", "generate-report", "generate-vscode", "generate-changelog", "fix-syntax", "check-env", "self-update", "help"]:
+    for cmd in ["status", "update", "gh-runs", "generate-catalog", "release", "audit-performance", "audit-assets", "audit-signatures", "audit-keys", "audit-deps", "audit-strings", "audit-updates", "apply-updates", "generate-manifest", "generate-preset", "generate-report", "generate-vscode", "generate-changelog", "fix-syntax", "check-env", "self-update", "help"]:
         subparsers.add_parser(cmd)
     
+    p_build = subparsers.add_parser("build")
+    p_build.add_argument("--incremental", action="store_true", help="Rebuild only changed addons")
+    p_build.add_argument("-j", "--jobs", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)), help="Projects built concurrently")
+
+    p_mission = subparsers.add_parser("audit-mission")
+    p_mission.add_argument("targets", nargs="*", default=["."], help="Mission PBOs, folders or glob patterns")
+    p_mission.add_argument("-j", "--jobs", type=int, help="Worker processes")
+    p_mission.add_argument("--json", help="Write the aggregated report as JSON")
+
+    p_security = subparsers.add_parser("audit-security")
+    p_security.add_argument("--staged", "--changed", dest="staged", action="store_true", help="Only scan files staged for commit")
+    p_security.add_argument("-j", "--jobs", type=int, help="Worker processes")
+
     p_lint = subparsers.add_parser("lint")
     p_lint.add_argument("--fix", action="store_true")
+    p_lint.add_argument("-j", "--jobs", type=int, help="Worker processes")
+    p_lint.add_argument("--no-cache", action="store_true", help="Relint every file")
+    p_lint.add_argument("--changed", action="store_true", help="Only lint staged files and the files that #include them")
     
     p_harvest = subparsers.add_parser("harvest-terrain")
     p_harvest.add_argument("image"); p_harvest.add_argument("name")
@@ -170,7 +259,7 @@ def main():
             for p in get_projects()
         ],
         "status": lambda a: [print(f"Project: {p.name}") for p in get_projects()],
-        "build": lambda a: [subprocess.run(["bash", "build.sh", "build"], cwd=p) for p in get_projects()],
+        "build": cmd_build,
         "release": lambda a: [subprocess.run([sys.executable, "tools/release.py"], cwd=p) for p in get_projects()],
         "generate-catalog": lambda a: subprocess.run([sys.executable, "tools/catalog_generator.py", "."]),
         "generate-manifest": lambda a: subprocess.run([sys.executable, "tools/manifest_generator.py", "."]),
@@ -178,14 +267,14 @@ def main():
         "generate-report": lambda a: subprocess.run([sys.executable, "tools/report_generator.py", "."]),
         "generate-vscode": lambda a: subprocess.run([sys.executable, "tools/vscode_task_generator.py", "."]),
         "generate-changelog": lambda a: subprocess.run([sys.executable, "tools/changelog_generator.py", "."]),
-        "audit-security": lambda a: subprocess.run([sys.executable, "tools/security_auditor.py", "."]),
+        "audit-security": lambda a: sys.exit(subprocess.run([sys.executable, "tools/security_auditor.py", "."] + (["--staged"] if a.staged else []) + (["--jobs", str(a.jobs)] if a.jobs else [])).returncode),
         "audit-performance": lambda a: subprocess.run([sys.executable, "tools/weight_reporter.py", "."]),
         "audit-assets": lambda a: subprocess.run([sys.executable, "tools/asset_auditor.py", "."]),
         "audit-signatures": lambda a: subprocess.run([sys.executable, "tools/key_auditor.py", "."]),
         "audit-keys": lambda a: subprocess.run([sys.executable, "tools/key_auditor.py", "."]),
         "audit-deps": lambda a: subprocess.run([sys.executable, "tools/dependency_graph.py", "."]),
         "audit-strings": lambda a: subprocess.run([sys.executable, "tools/string_auditor.py", "."]),
-        "audit-mission": lambda a: subprocess.run([sys.executable, "tools/mission_auditor.py", "."]),
+        "audit-mission": lambda a: sys.exit(subprocess.run([sys.executable, "tools/mission_auditor.py"] + a.targets + (["--jobs", str(a.jobs)] if a.jobs else []) + (["--json", a.json] if a.json else [])).returncode),
         "audit-updates": lambda a: subprocess.run([sys.executable, "tools/workshop_inspector.py", "."]),
         "apply-updates": lambda a: subprocess.run([sys.executable, "tools/import_wizard.py", "."]),
         "fix-syntax": lambda a: subprocess.run([sys.executable, "tools/syntax_fixer.py", "."]),